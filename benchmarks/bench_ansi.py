@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ANSI color conversion of large colored logs, whole and streamed.
+
+Times `ansi2html`, `ansi2latex`, `strip_ansi` and the streamed `iter_ansi2html` on a synthetic
+training log with bold, 16-color, 256-color and 24-bit codes, at a few sizes. The time per
+megabyte should stay flat as the log grows.
+
+    python benchmarks/bench_ansi.py [--sizes 1 4 16] [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+# nbconvert_dev lives under other/ and is not installed
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "other"))
+
+from nbconvert_dev.filters.ansi import ansi2html, ansi2latex, iter_ansi2html, strip_ansi  # noqa: E402
+
+CODES = (
+    "\x1b[0m", "\x1b[1m", "\x1b[22m", "\x1b[31m", "\x1b[1;32m", "\x1b[33;44m", "\x1b[39m",
+    "\x1b[49m", "\x1b[91m", "\x1b[38;5;208m", "\x1b[48;5;17m", "\x1b[38;5;250m",
+    "\x1b[38;2;255;128;0m", "\x1b[K",
+)
+
+
+def make_log(megabytes: float, seed: int = 0) -> str:
+    """A log of about ``megabytes`` MB, a few escape sequences per line."""
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    step = 0
+    while size < megabytes * 1024 * 1024:
+        step += 1
+        line = (
+            f"{rng.choice(CODES)}epoch {step // 1000:>3}{rng.choice(CODES)} step {step:>7} "
+            f"loss={rng.random():.5f}{rng.choice(CODES)} acc={rng.random():.4f} <{rng.random():.3f}>"
+            f"{rng.choice(CODES)} lr=3e-4\x1b[0m"
+        )
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16], help="log sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    filters = {
+        "ansi2html": ansi2html,
+        "ansi2latex": ansi2latex,
+        "strip_ansi": strip_ansi,
+        "iter_ansi2html": lambda log: sum(1 for _ in iter_ansi2html(log)),
+    }
+    print(f"{'MB':>6}  {'filter':<14} {'seconds':>9} {'s/MB':>7}")
+    for megabytes in args.sizes:
+        log = make_log(megabytes)
+        actual = len(log.encode("utf-8")) / (1024 * 1024)
+        for name, convert in filters.items():
+            seconds = min(timeit.repeat(lambda: convert(log), number=1, repeat=args.repeat))
+            print(f"{actual:>6.1f}  {name:<14} {seconds:>9.3f} {seconds / actual:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
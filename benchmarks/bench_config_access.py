@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nested config access: `Config` (Box) and `DotDict` against `FrozenConfig`.
+
+Measures `view.a.b.c`-style lookups at a few depths, and the cost of entering a temporary
+override the old way (a full `merge_dicts` copy) against a `FrozenConfig.merged` overlay.
+
+    python benchmarks/bench_config_access.py [--number N]
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from metaproj.utils.collection import Config, DotDict, FrozenConfig, as_nested_dict, merge_dicts
+
+
+def make_config(width: int, depth: int) -> dict:
+    if depth == 0:
+        return {f"key{i}": i for i in range(width)}
+    return {f"key{i}": make_config(width, depth - 1) for i in range(width)}
+
+
+def lookup(depth: int) -> str:
+    return "view." + ".".join(["key1"] * (depth + 1))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200_000)
+    parser.add_argument("--width", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'depth':>5}  {'impl':<12} {'ns/lookup':>10}")
+    for depth in (0, 2, 4):
+        raw = make_config(args.width, depth)
+        views = {
+            "Config": Config(raw),
+            "DotDict": as_nested_dict(raw, DotDict),
+            "FrozenConfig": FrozenConfig(raw),
+        }
+        stmt = lookup(depth)
+        for name, view in views.items():
+            seconds = min(timeit.repeat(stmt, globals={"view": view}, number=args.number, repeat=5))
+            print(f"{depth:>5}  {name:<12} {seconds / args.number * 1e9:>10.1f}")
+        path = stmt[len("view."):]
+        seconds = min(timeit.repeat(f"view.get_path({path!r})", globals={"view": views["FrozenConfig"]}, number=args.number, repeat=5))
+        print(f"{depth:>5}  {'get_path':<12} {seconds / args.number * 1e9:>10.1f}")
+
+    raw = make_config(args.width, 3)
+    override = {"key1": {"key2": {"key3": {"key4": -1}}}}
+    box, frozen = Config(raw), FrozenConfig(raw)
+    number = max(args.number // 1000, 10)
+    copy_seconds = min(timeit.repeat(lambda: merge_dicts(box, override), number=number, repeat=5))
+    overlay_seconds = min(timeit.repeat(lambda: frozen.merged(override), number=number, repeat=5))
+    print(f"\noverride of {args.width ** 4} keys: merge_dicts {copy_seconds / number * 1e6:.1f}us, "
+          f"FrozenConfig.merged {overlay_seconds / number * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,17 @@
 from __future__ import annotations
 
 import ast
+import hashlib
+import importlib.util
 import io
 import linecache
+import marshal
 import os
 import re
 import sys
 import types
 from importlib.abc import MetaPathFinder
+import IPython
 from IPython import get_ipython
 from IPython.core.interactiveshell import InteractiveShell
 from nbformat import read
@@ -21,6 +25,13 @@ from typing import Any
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Tuple
+
+try:
+    # parses everything but the outputs, which we never look at
+    from nbconvert_dev.utils.lazynb import read_notebook
+except ImportError:
+    read_notebook = None
 
 # To avoid re-running notebook computations during import,
 # we only import code cells that match this regular expression
@@ -71,6 +82,50 @@ def find_notebook(fullname: str, path: Optional[List[str]] = None) -> Optional[s
 
     return None
 
+def cache_path(nb_path: str) -> str:
+    """Return the path of the bytecode cache for the notebook at `nb_path`,
+    in a `__pycache__` directory next to it"""
+    directory, name = os.path.split(nb_path)
+    name = os.path.splitext(name)[0]
+    return os.path.join(directory, '__pycache__',
+                        f'{name}.{sys.implementation.cache_tag}.nbc')
+
+def cache_key(nb_path: str, data: bytes) -> bytes:
+    """Return the key of a notebook's cached code: it changes with the
+    notebook contents and path, the IPython and Python versions,
+    and the cells selected for import"""
+    h = hashlib.sha256(data)
+    for part in (os.path.abspath(nb_path), IPython.__version__, RE_CODE.pattern):
+        h.update(b'\0' + part.encode('utf-8'))
+    h.update(importlib.util.MAGIC_NUMBER)
+    return h.digest()
+
+def read_cache(nb_path: str, key: bytes) -> Optional[Tuple[List[str], List[types.CodeType]]]:
+    """Return the cached (source, code objects) of a notebook, if its key matches"""
+    try:
+        with open(cache_path(nb_path), 'rb') as f:
+            cached_key, source, codes = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if cached_key != key:
+        return None
+    return source, codes
+
+def write_cache(nb_path: str, key: bytes,
+                source: List[str], codes: List[types.CodeType]) -> None:
+    """Store the source and code objects of a notebook; errors are ignored"""
+    if sys.dont_write_bytecode:
+        return
+    path = cache_path(nb_path)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            marshal.dump((key, source, codes), f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
 class NotebookLoader:
     """Module Loader for Jupyter Notebooks"""
     def __init__(self, path: Optional[List[str]] = None) -> None:
@@ -87,9 +142,8 @@ class NotebookLoader:
 
         # print ("importing Jupyter notebook from %s" % path)
 
-        # load the notebook object
-        with io.open(path, 'r', encoding='utf-8') as f:
-            nb = read(f, 4)
+        # load the transformed and compiled code cells, from the cache if possible
+        source, codes = self.load_code(path)
 
         # create the module and add it to sys.modules
         # if name in sys.modules:
@@ -105,22 +159,11 @@ class NotebookLoader:
         save_user_ns = self.shell.user_ns
         self.shell.user_ns = mod.__dict__
 
-        codecells = [self.shell.input_transformer_manager.transform_cell(cell.source)
-                              for cell in nb.cells if cell.cell_type == 'code']
-        source = [code for code in codecells if do_import(code)]
-
-        lno = 1
-
         try:
-            for code in source:
-                parsed = ast.parse(code, filename=path, mode='exec')
-                ast.increment_lineno(parsed, n=lno - 1)
-                exec(compile(parsed, path, 'exec'), mod.__dict__)
-                lno += len(code.split('\n'))
+            for code in codes:
+                exec(code, mod.__dict__)
             self.lines[fullname] = '\n'.join(source)
-            p = len(self.lines[fullname].split('\n')) + 1
-            assert lno == p
-    
+
         finally:
             self.shell.user_ns = save_user_ns
             data = self.lines[fullname]
@@ -129,6 +172,41 @@ class NotebookLoader:
                                     fullname)
         return mod
 
+    def load_code(self, path: str) -> Tuple[List[str], List[types.CodeType]]:
+        """Return the source and compiled code of the code cells to import
+        from the notebook at `path`.  These are cached in `__pycache__`,
+        so unchanged notebooks are neither parsed nor transformed again."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        key = cache_key(path, data)
+        cached = read_cache(path, key)
+        if cached is not None:
+            return cached
+
+        # load the notebook object
+        if read_notebook is not None:
+            nb = read_notebook(path, 4)
+        else:
+            with io.open(path, 'r', encoding='utf-8') as f:
+                nb = read(f, 4)
+
+        codecells = [self.shell.input_transformer_manager.transform_cell(cell.source)
+                              for cell in nb.cells if cell.cell_type == 'code']
+        source = [code for code in codecells if do_import(code)]
+
+        codes = []
+        lno = 1
+        for code in source:
+            parsed = ast.parse(code, filename=path, mode='exec')
+            ast.increment_lineno(parsed, n=lno - 1)
+            codes.append(compile(parsed, path, 'exec'))
+            lno += len(code.split('\n'))
+        p = len('\n'.join(source).split('\n')) + 1
+        assert lno == p
+
+        write_cache(path, key, source, codes)
+        return source, codes
+
 class NotebookFinder(MetaPathFinder):
     """Module finder that locates Jupyter Notebooks"""
     def __init__(self) -> None:
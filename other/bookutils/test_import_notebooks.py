@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# Tests for the notebook code cache of import_notebooks
+
+import os
+import sys
+
+import nbformat
+import pytest
+from nbformat.v4 import new_code_cell, new_notebook
+
+from bookutils import import_notebooks
+from bookutils.import_notebooks import NotebookLoader, cache_key, cache_path
+
+def write_notebook(path: str, *sources: str) -> None:
+    nb = new_notebook(cells=[new_code_cell(source) for source in sources])
+    with open(path, 'w', encoding='utf-8') as f:
+        nbformat.write(nb, f)
+
+def fail(*args, **kwargs):
+    raise AssertionError("notebook parsed again")
+
+@pytest.fixture
+def notebook(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'dont_write_bytecode', False)
+    path = str(tmp_path / 'Cached.ipynb')
+    write_notebook(path, "def answer():\n    return 42", "answer()")
+    return path
+
+def test_second_load_skips_parsing(notebook, monkeypatch):
+    source, codes = NotebookLoader().load_code(notebook)
+    assert source == ["def answer():\n    return 42\n"]
+    assert os.path.isfile(cache_path(notebook))
+
+    monkeypatch.setattr(import_notebooks, 'read_notebook', fail)
+    monkeypatch.setattr(import_notebooks, 'read', fail)
+    cached_source, cached_codes = NotebookLoader().load_code(notebook)
+    assert cached_source == source
+    namespace = {}
+    for code in cached_codes:
+        exec(code, namespace)
+    assert namespace['answer']() == 42
+
+def test_edit_changes_key(notebook):
+    with open(notebook, 'rb') as f:
+        before = f.read()
+    NotebookLoader().load_code(notebook)
+
+    write_notebook(notebook, "def answer():\n    return 43")
+    with open(notebook, 'rb') as f:
+        after = f.read()
+    assert cache_key(notebook, before) != cache_key(notebook, after)
+
+    source, codes = NotebookLoader().load_code(notebook)
+    assert source == ["def answer():\n    return 43\n"]
+
+def test_dont_write_bytecode(notebook, monkeypatch):
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    source, codes = NotebookLoader().load_code(notebook)
+    assert source == ["def answer():\n    return 42\n"]
+    assert not os.path.exists(cache_path(notebook))
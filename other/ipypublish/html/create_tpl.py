@@ -13,6 +13,8 @@ from __future__ import annotations
 
 import logging
 
+from ipypublish.scripts import template_cache
+
 TPL_OUTLINE = r"""
 <!-- A html document -->
 <!-- {meta_docstring} -->
@@ -219,7 +221,26 @@ def create_tpl(tpl_dicts=(), outpath=None):
     outpath: str
         if not None, output template to file
 
+    composed templates are cached by the content of the tpl_dicts,
+    see ipypublish.scripts.template_cache
+
     """
+    tpl_dicts = list(tpl_dicts)
+    key = template_cache.segments_key(TPL_OUTLINE, tpl_dicts)
+    outline = template_cache.get_composed(key)
+    if outline is None:
+        outline = _compose(tpl_dicts)
+        template_cache.put_composed(key, outline)
+
+    if outpath is not None:
+        with open(outpath, 'w') as f:
+            f.write(outline)
+        return
+    return outline
+
+
+def _compose(tpl_dicts):
+    """ compose the template from tpl_dicts """
     outline = TPL_OUTLINE
     tpl_sections = {
         'meta_docstring': '',
@@ -320,10 +341,4 @@ def create_tpl(tpl_dicts=(), outpath=None):
             else:
                 tpl_sections[key] = tpl_sections[key] + '\n' + val
 
-    outline = outline.format(**tpl_sections)
-
-    if outpath is not None:
-        with open(outpath, 'w') as f:
-            f.write(outline)
-        return
-    return outline
+    return outline.format(**tpl_sections)
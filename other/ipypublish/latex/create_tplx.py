@@ -13,6 +13,8 @@ from __future__ import annotations
 
 import logging
 
+from ipypublish.scripts import template_cache
+
 # % filter_data_type returns the first available format in the data priority
 # ((* block execute_result scoped *))
 #     ((*- for type in output.data | filter_data_type -*))
@@ -183,7 +185,26 @@ def create_tplx(tplx_dicts=(), outpath=None):
     outpath: str
         if not None, output template to file
 
+    composed templates are cached by the content of the tplx_dicts,
+    see ipypublish.scripts.template_cache
+
     """
+    tplx_dicts = list(tplx_dicts)
+    key = template_cache.segments_key(TPLX_OUTLINE, tplx_dicts)
+    outline = template_cache.get_composed(key)
+    if outline is None:
+        outline = _compose(tplx_dicts)
+        template_cache.put_composed(key, outline)
+
+    if outpath is not None:
+        with open(outpath, 'w') as f:
+            f.write(outline)
+        return
+    return outline
+
+
+def _compose(tplx_dicts):
+    """ compose the template from tplx_dicts """
     outline = TPLX_OUTLINE
     tplx_sections = {
         'meta_docstring': '',
@@ -240,10 +261,4 @@ def create_tplx(tplx_dicts=(), outpath=None):
             else:
                 tplx_sections[key] = tplx_sections[key] + '\n' + val
 
-    outline = outline.format(**tplx_sections)
-
-    if outpath is not None:
-        with open(outpath, 'w') as f:
-            f.write(outline)
-        return
-    return outline
+    return outline.format(**tplx_sections)
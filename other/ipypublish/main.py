@@ -2,16 +2,18 @@ from __future__ import annotations
 
 #!/usr/bin/env python
 # import base64
+import hashlib
 import io
 import ipypublish
 import logging
 import os
+import pickle
 import re
 import shutil
 import time
 from ipypublish.scripts import export_plugins
 from ipypublish.scripts.nbexport import export_notebook
-from ipypublish.scripts.nbmerge import merge_notebooks
+from ipypublish.scripts.nbmerge import NotebookCache, merge_notebooks, notebook_paths
 from ipypublish.scripts.pdfexport import export_pdf
 
 # python 3 to 2 compatibility
@@ -24,13 +26,112 @@ try:
 except ImportError:
     import pathlib2 as pathlib
 
+# parsed notebooks are kept between calls to publish,
+# so a rebuild only reads the notebooks that changed
+_notebook_cache = NotebookCache(maxsize=1024)
+
+# bump when the stored builds of incremental publishing change
+_BUILD_VERSION = 1
+
+
+def substitute_refslides(body, refslide):
+    """ make references refer to the correct slides, in a single pass
+
+    Parameters
+    ----------
+    body: str
+    refslide: dict
+        {key: (column, row)}
+
+    """
+    if not refslide:
+        return body
+    links = {k: '#/{0}/{1}{2}'.format(col, row, k) for k, (col, row) in refslide.items()}
+    # longest keys first, so that "fig10" is not taken for "fig1"
+    keys = sorted(links, key=len, reverse=True)
+    pattern = re.compile(re.escape('{{id_home_prefix}}')
+                         + '(' + '|'.join(re.escape(k) for k in keys) + ')')
+    return pattern.sub(lambda match: links[match.group(1)], body)
+
+
+def referenced_paths(body, paths):
+    """ the paths that occur in body, found in a single scan of it
+
+    Parameters
+    ----------
+    body: str
+    paths: iterable of str
+
+    """
+    paths = set(paths)
+    if not paths:
+        return set()
+    prefix = os.path.commonprefix(list(paths))
+    rests = sorted((path[len(prefix):] for path in paths), key=len, reverse=True)
+    pattern = re.compile(re.escape(prefix)
+                         + '(?:' + '|'.join(re.escape(rest) for rest in rests) + ')')
+    found = set()
+    for match in set(pattern.findall(body)):
+        # the longest path matches, but shorter paths it starts with occur too
+        found.update(match[:end] for end in range(len(prefix), len(match) + 1)
+                     if match[:end] in paths)
+    return found
+
+
+def _configure(oplugin, meta_path, files_folder):
+    """ ensure file paths point towards the right folder """
+    oplugin['config'][
+        'ExtractOutputPreprocessor.output_filename_template'
+    ] = files_folder + '/{unique_key}_{cell_index}_{index}{extension}'
+    oplugin['config']['LatexDocLinks.metapath'] = str(meta_path)
+    oplugin['config']['LatexDocLinks.filesfolder'] = str(files_folder)
+    oplugin['config']['LatexDocHTML.metapath'] = str(meta_path)
+    oplugin['config']['LatexDocHTML.filesfolder'] = str(files_folder)
+
+
+def _build_key(paths, outformat, oplugin):
+    """ a hash of everything an export depends on: the chapters and the exporter """
+    key = hashlib.sha256()
+    for part in (ipypublish.__version__, _BUILD_VERSION, outformat,
+                 oplugin['oformat'], str(oplugin['template']),
+                 sorted((k, repr(v)) for k, v in oplugin['config'].items())):
+        key.update(repr(part).encode('utf-8'))
+    for ipath in paths:
+        key.update(repr((ipath.name, _notebook_cache.digest(ipath))).encode('utf-8'))
+    return key.hexdigest()
+
+
+def _load_build(build_path, key):
+    try:
+        with open(build_path, 'rb') as fh:
+            build = pickle.load(fh)
+    except (IOError, OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    if build.get('key') != key:
+        return None
+    return build
+
+
+def _save_build(build_path, build):
+    # outputs spilled to temporary files by ExtractOutputPreprocessor are stored by value
+    build = dict(build, internal_files={
+        path: bytes(fcontents) if hasattr(fcontents, 'path') else fcontents
+        for path, fcontents in build['internal_files'].items()})
+    tmp_path = '{}.{}.tmp'.format(build_path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as fh:
+            pickle.dump(build, fh, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, build_path)
+    except (IOError, OSError):
+        logging.warning('could not store the build at: {}'.format(build_path))
 
 
 def publish(ipynb_path,
             outformat='latex_ipypublish_main',
             outpath=None, dump_files=False,
             ignore_prefix='_', clear_files=False,
-            create_pdf=False, pdf_in_temp=False, pdf_debug=False):
+            create_pdf=False, pdf_in_temp=False, pdf_debug=False,
+            incremental=False):
     """ convert one or more Jupyter notebooks to a published format
 
     paths can be string of an existing file or folder,
@@ -58,6 +159,9 @@ def publish(ipynb_path,
         whether to run pdf conversion in a temporary folder
     pdf_debug: bool
         if True, run latexmk in interactive mode
+    incremental: bool
+        if True, store the export in outpath, and reuse it for as long as
+        no notebook (by content hash) and no export setting changed
 
     Returns
     --------
@@ -79,10 +183,6 @@ def publish(ipynb_path,
     logging.info('running for ipynb(s) at: {0}'.format(ipynb_path))
     logging.info('with conversion: {0}'.format(outformat))
 
-    final_nb, meta_path = merge_notebooks(ipynb_path,
-                                          ignore_prefix=ignore_prefix)
-    logging.debug('notebooks meta path: {}'.format(meta_path))
-
     logging.info('getting output format from exporter plugin')
     plugins = export_plugins.get()
     if outformat not in plugins:
@@ -92,40 +192,27 @@ def publish(ipynb_path,
                          + ", acceptable names: {}".format(list(plugins.keys())))
     oplugin = plugins[outformat]
 
-    # ensure file paths point towards the right folder
-    oplugin['config'][
-        'ExtractOutputPreprocessor.output_filename_template'
-    ] = files_folder + '/{unique_key}_{cell_index}_{index}{extension}'
-    oplugin['config']['LatexDocLinks.metapath'] = str(meta_path)
-    oplugin['config']['LatexDocLinks.filesfolder'] = str(files_folder)
-    oplugin['config']['LatexDocHTML.metapath'] = str(meta_path)
-    oplugin['config']['LatexDocHTML.filesfolder'] = str(files_folder)
-
-    logging.debug('{}'.format(oplugin['config']))
+    build = None
+    if incremental:
+        build_path = os.path.join(outdir, ipynb_name + '.nbpub.build')
+        paths = notebook_paths(ipynb_path, ignore_prefix)
+        if paths:
+            _configure(oplugin, paths[0], files_folder)
+        build_key = _build_key(paths, outformat, oplugin)
+        build = _load_build(build_path, build_key)
+        if build is not None:
+            logging.info('notebooks and settings unchanged, reusing: {}'.format(build_path))
 
-    # for debugging:
-    # tpath = os.path.join(outdir, ipynb_name+'.template.tpl')
-    # with open(tpath, "w") as fh:
-    #     fh.write(str(oplugin['template']))
+    if build is None:
+        build = _export(ipynb_path, ignore_prefix, oplugin, files_folder)
+        if incremental:
+            build['key'] = build_key
+            _save_build(build_path, build)
 
-    (body, resources), exe = export_notebook(final_nb,
-                                             oplugin['oformat'], oplugin['config'], oplugin['template'])
-
-    # reduce multiple blank lines to single
-    body = re.sub(r'\n\s*\n', '\n\n', body)
-    # make sure references refer to correct slides
-    if 'refslide' in resources:
-        for k, (col, row) in resources['refslide'].items():
-            body = body.replace('{{id_home_prefix}}{0}'.format(k), '#/{0}/{1}{2}'.format(col, row, k))
-
-    # filter internal files by those that are referenced in the document body
-    if resources['outputs']:
-        for path in list(resources['outputs'].keys()):
-            if path not in body:
-                resources['outputs'].pop(path)
-        internal_files = resources['outputs']
-    else:
-        internal_files = {}
+    body = build['body']
+    exe = build['exe']
+    internal_files = build['internal_files']
+    external_file_paths = build['external_file_paths']
 
     # output main file
     outpath = os.path.join(outdir, ipynb_name + exe)
@@ -145,9 +232,13 @@ def publish(ipynb_path,
             os.mkdir(outfilespath)
 
         for internal_path, fcontents in internal_files.items():
+            if hasattr(fcontents, 'path'):
+                # an output spilled to a temporary file by ExtractOutputPreprocessor
+                shutil.copyfile(fcontents.path, os.path.join(outdir, internal_path))
+                continue
             with open(os.path.join(outdir, internal_path), "wb") as fh:
                 fh.write(fcontents)
-        for external_path in resources['external_file_paths']:
+        for external_path in external_file_paths:
             shutil.copyfile(external_path,
                             os.path.join(outfilespath, os.path.basename(external_path)))
 
@@ -164,3 +255,48 @@ def publish(ipynb_path,
 
     logging.info('process finished successfully')
     return outpath
+
+
+def _export(ipynb_path, ignore_prefix, oplugin, files_folder):
+    """ merge and export the notebook(s)
+
+    Returns
+    -------
+    build: dict
+        the body, extension, internal files and external file paths
+
+    """
+    final_nb, meta_path = merge_notebooks(ipynb_path,
+                                          ignore_prefix=ignore_prefix,
+                                          cache=_notebook_cache)
+    logging.debug('notebooks meta path: {}'.format(meta_path))
+
+    _configure(oplugin, meta_path, files_folder)
+
+    logging.debug('{}'.format(oplugin['config']))
+
+    # for debugging:
+    # tpath = os.path.join(outdir, ipynb_name+'.template.tpl')
+    # with open(tpath, "w") as fh:
+    #     fh.write(str(oplugin['template']))
+
+    (body, resources), exe = export_notebook(final_nb,
+                                             oplugin['oformat'], oplugin['config'], oplugin['template'])
+
+    # reduce multiple blank lines to single
+    body = re.sub(r'\n\s*\n', '\n\n', body)
+    # make sure references refer to correct slides
+    body = substitute_refslides(body, resources.get('refslide'))
+
+    # filter internal files by those that are referenced in the document body
+    internal_files = {}
+    if resources['outputs']:
+        for path in referenced_paths(body, resources['outputs']):
+            internal_files[path] = resources['outputs'][path]
+
+    return {
+        'body': body,
+        'exe': exe,
+        'internal_files': internal_files,
+        'external_file_paths': list(resources['external_file_paths']),
+    }
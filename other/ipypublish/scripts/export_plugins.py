@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import ast
 import glob
 import imp
 import inspect
+import io
 import logging
 import os
+import threading
 import uuid
 import warnings
 from ipypublish import export_plugins
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
 # py 2/3 compatibility
 try:
     import pathlib
@@ -34,8 +42,119 @@ def _get_module_path(module):
     return pathlib.Path(os.path.dirname(os.path.abspath(inspect.getfile(module))))
 
 
-def _get_modules(path):
-    """ get modules from a directory
+def _plugin_paths(path):
+    """ get potential plugin python files from a directory """
+    if hasattr(path, 'glob'):
+        return path.glob('*.py')
+    return glob.glob(os.path.join(path, '*.py'))
+
+
+def _scan_source(source):
+    """ scan the source of a module, without importing it
+
+    Returns
+    -------
+    is_plugin: bool
+        whether the module defines (or may define) oformat, template and config
+    descript: str or None
+        the module doc string
+    oformat: str or None
+        the output format, if it is a literal string
+
+    """
+    tree = ast.parse(source)
+    names = set()
+    oformat = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign):
+            targets = [node.target]
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split('.')[0] for alias in node.names)
+            continue
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name):
+                names.add(target.id)
+                if target.id == 'oformat' and isinstance(node.value, ast.Constant) \
+                        and isinstance(node.value.value, str):
+                    oformat = node.value.value
+    is_plugin = '*' in names or {'oformat', 'template', 'config'} <= names
+    return is_plugin, ast.get_docstring(tree, clean=False), oformat
+
+
+class _Plugin(object):
+    """ an export plugin, indexed by scanning its source,
+    and imported when first used
+
+    the imported plugin is kept for as long as its file is unchanged;
+    each load returns its own copy of the plugin dict and its config,
+    which callers may change
+    """
+
+    def __init__(self, pypath, descript, oformat=None):
+        self.pypath = pypath
+        self.descript = descript
+        self.oformat = oformat
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._signature = None
+
+    def _current_signature(self):
+        if hasattr(self.pypath, 'maketemp'):
+            # MockPaths do not change
+            return None
+        try:
+            stat = os.stat(str(self.pypath))
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def load(self):
+        """ import the plugin (if needed)
+
+        Returns
+        -------
+        plugin: dict
+            with descript, oformat, template and config keys
+
+        """
+        signature = self._current_signature()
+        with self._lock:
+            if self._loaded is not None and signature == self._signature:
+                return self._copy()
+            logging.debug('loading export plugin: {}'.format(self.pypath))
+            # use uuid to ensure no conflicts in name space
+            mod_name = str(uuid.uuid4())
+            try:
+                with warnings.catch_warnings(record=True):
+                    warnings.filterwarnings("ignore", category=ImportWarning)
+
+                    # for MockPaths
+                    if hasattr(self.pypath, 'maketemp'):
+                        with self.pypath.maketemp() as fpath:
+                            module = load_source(mod_name, str(fpath))
+                    else:
+                        module = load_source(mod_name, str(self.pypath))
+                plugin = {'descript': getattr(module, '__doc__'),
+                          'oformat': getattr(module, 'oformat'),
+                          'template': getattr(module, 'template'),
+                          'config': getattr(module, 'config')}
+            except Exception as err:
+                logging.error('error loading export plugin {0}: {1}'.format(self.pypath, err))
+                raise IOError('error loading export plugin {0}: {1}'.format(self.pypath, err))
+            self._loaded = plugin
+            self._signature = signature
+            return self._copy()
+
+    def _copy(self):
+        return dict(self._loaded, config=dict(self._loaded['config']))
+
+
+def _scan_directory(path):
+    """ index the plugin modules of a directory, without importing them
 
     Properties
     ----------
@@ -43,56 +162,50 @@ def _get_modules(path):
 
     Returns
     -------
-    modules : list of modules
-    load_errors: list of str
+    plugins : dict of _Plugin
+    scan_errors: list of str
 
     Examples
     --------
     >>> from jsonextended.utils import MockPath
     >>> mod1 = MockPath('mod1.py', is_file=True,
-    ... content="name='modname1'")
+    ... content="oformat='Latex'\\ntemplate=''\\nconfig={}")
     >>> dir = MockPath(structure=[mod1])
-    >>> modules, errors = _get_modules(dir)
+    >>> plugins, errors = _scan_directory(dir)
     >>> errors
     []
-    >>> list(modules.keys())
+    >>> list(plugins.keys())
     ['mod1']
-    >>> modules['mod1'].name
-    'modname1'
+    >>> plugins['mod1'].load()['oformat']
+    'Latex'
 
     """
-    # get potential plugin python files
-    if hasattr(path, 'glob'):
-        pypaths = path.glob('*.py')
-    else:
-        pypaths = glob.glob(os.path.join(path, '*.py'))
-
-    modules = {}
-    load_errors = []
-    for pypath in pypaths:
-        # use uuid to ensure no conflicts in name space
-        mod_name = str(uuid.uuid4())
+    plugins = {}
+    scan_errors = []
+    for pypath in _plugin_paths(path):
         try:
             if hasattr(pypath, 'resolve'):
                 # Make the path absolute, resolving any symlinks
                 pypath = pypath.resolve()
 
-            with warnings.catch_warnings(record=True) as w:
-                warnings.filterwarnings("ignore", category=ImportWarning)
-
-                # for MockPaths
-                if hasattr(pypath, 'maketemp'):
-                    with pypath.maketemp() as fpath:
-                        module = load_source(mod_name, str(fpath))
-                    pypath = pypath.name
-                else:
-                    module = load_source(mod_name, str(pypath))
-            modules[os.path.splitext(os.path.basename(str(pypath)))[0]] = module
+            # for MockPaths
+            if hasattr(pypath, 'maketemp'):
+                with pypath.maketemp() as fpath:
+                    with io.open(str(fpath), encoding='utf-8') as f:
+                        source = f.read()
+            else:
+                with io.open(str(pypath), encoding='utf-8') as f:
+                    source = f.read()
+            is_plugin, descript, oformat = _scan_source(source)
         except Exception as err:
-            load_errors.append((str(pypath), 'Load Error: {}'.format(err)))
+            scan_errors.append((str(pypath), 'Scan Error: {}'.format(err)))
+            continue
+        if not is_plugin:
             continue
+        name = os.path.splitext(os.path.basename(str(getattr(pypath, 'name', pypath))))[0]
+        plugins[name] = _Plugin(pypath, descript, oformat)
 
-    return modules, load_errors
+    return plugins, scan_errors
 
 
 _plugins_dict = {}
@@ -101,38 +214,57 @@ _plugins_dict = {}
 def add_directory(path):
     """ add a directory of export plugin modules to the existing dict
 
-    plugins must have: oformat, template and config attributes and a doc string
+    plugins must have: oformat, template and config attributes and a doc string.
+    They are only imported when they are first used
 
     Properties
     ----------
     path : str or path-like
 
     """
-    modules, load_errors = _get_modules(path)
-    for mod_name, mod in modules.items():
-        try:
-            descript = getattr(mod, '__doc__')
-            oformat = getattr(mod, 'oformat')
-            template = getattr(mod, 'template')
-            config = getattr(mod, 'config')
-        except AttributeError:
-            continue
-        _plugins_dict[mod_name] = {'descript': descript,
-                                   'oformat': oformat,
-                                   'template': template,
-                                   'config': config}
-    return load_errors
+    plugins, scan_errors = _scan_directory(path)
+    _plugins_dict.update(plugins)
+    return scan_errors
 
 
-logging.debug('loading builtin plugins')
+class PluginsView(Mapping):
+    """ a read-only mapping of plugin names to plugins,
+    which imports a plugin when it is looked up
+
+    listing names (or checking if a name exists) imports nothing
+    """
+
+    def __init__(self, plugins):
+        self._plugins = dict(plugins)
+
+    def __getitem__(self, name):
+        return self._plugins[name].load()
+
+    def __contains__(self, name):
+        return name in self._plugins
+
+    def __iter__(self):
+        return iter(self._plugins)
+
+    def __len__(self):
+        return len(self._plugins)
+
+    def descriptions(self):
+        """ the doc string of each plugin, without importing them """
+        return {name: plugin.descript for name, plugin in self._plugins.items()}
+
+
+logging.debug('indexing builtin plugins')
 
 load_errors = add_directory(_get_module_path(export_plugins))
 if load_errors:
     raise IOError(
-        'errors in builtin plugins loading: {}'.format('\n'.join(['{0}: {1}'.format(a, b) for a, b in load_errors])))
+        'errors in builtin plugins scanning: {}'.format('\n'.join(['{0}: {1}'.format(a, b) for a, b in load_errors])))
 
 
 def get():
     """ return export plugins
+
+    plugins are imported when first looked up, and then kept
     """
-    return _plugins_dict.copy()
+    return PluginsView(_plugins_dict)
@@ -6,6 +6,8 @@ import nbconvert
 from jinja2 import DictLoader
 from traitlets.config import Config
 
+from ipypublish.scripts import template_cache
+
 
 def export_notebook(nb, format, config, template):
     """ exports a notebook in a particular format
@@ -28,7 +30,9 @@ def export_notebook(nb, format, config, template):
         the file extension of the exported format (e.g. .tex)
 
     """
-    jinja_template = DictLoader({'my_template': template})
+    # name the template by its content, so its compiled code can be cached
+    name = template_cache.template_name(template)
+    jinja_template = DictLoader({name: template})
     c = Config()
     for key, val in config.items():
         # TODO should probably not use exec, need to think of another way
@@ -40,11 +44,22 @@ def export_notebook(nb, format, config, template):
 
     class MyExporter(getattr(nbconvert, format + 'Exporter')):
         """override the default template"""
-        template_file = 'my_template'
+        template_file = name
+
+        def _create_environment(self):
+            environment = super(MyExporter, self)._create_environment()
+            environment.bytecode_cache = template_cache.bytecode_cache()
+            return environment
 
     logging.info('running nbconvert')
     exporter = MyExporter(
         config=c,
         extra_loaders=[jinja_template])
 
-    return exporter.from_notebook_node(nb), exporter.file_extension
+    body, resources = exporter.from_notebook_node(nb)
+    if not isinstance(body, str):
+        # the exporter streams its output (TemplateExporter.stream_output),
+        # but the body is post-processed as a whole
+        body = ''.join(body)
+
+    return (body, resources), exporter.file_extension
@@ -9,11 +9,15 @@ python nbmerge.py directory_name > merged.ipynb
 from __future__ import annotations
 from __future__ import print_function
 
+import collections
+import hashlib
 import logging
 import nbformat
 import os
 import re
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 # python 3 to 2 compatibility
 try:
@@ -39,8 +43,239 @@ def alphanumeric_sort(l):
     return sorted(l, key=alphanum_key)
 
 
+def _read_text(ipath):
+    with ipath.open('r', encoding='utf-8') as f:
+        data = f.read()
+    if hasattr(data, "decode"):
+        data = data.decode("utf-8")
+    return data
+
+
+def _parse(data, as_version):
+    return nbformat.reads(data, as_version=as_version)
+
+
+class NotebookCache(object):
+    """ parsed notebooks, by path, re-read only when their file changes
+
+    a file whose modification time or size changed is hashed,
+    and only parsed (and validated) again if its contents changed too.
+    Notebooks are shared between calls, so copy them before modifying them.
+
+    Parameters
+    ----------
+    maxsize: int or None
+        maximum number of notebooks kept, the least recently used are dropped
+
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        # (path, as_version) -> (signature, digest, notebook)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.parsed = 0
+
+    @staticmethod
+    def _signature(ipath):
+        try:
+            stat = ipath.stat()
+        except (AttributeError, NotImplementedError, OSError):
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def lookup(self, ipath, as_version=4):
+        """ the cached notebook at ipath, if it is unchanged
+
+        Returns
+        -------
+        notebook: NotebookNode or None
+        miss: tuple or None
+            if the notebook is not cached, what `store` needs:
+            the file text, its hash and its signature
+
+        """
+        key = (str(ipath), as_version)
+        signature = self._signature(ipath)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None and signature is not None and entry[0] == signature:
+            return entry[2], None
+
+        data = _read_text(ipath)
+        digest = hashlib.sha256(data.encode('utf-8')).hexdigest()
+        if entry is not None and entry[1] == digest:
+            with self._lock:
+                self._entries[key] = (signature, digest, entry[2])
+            return entry[2], None
+        return None, (data, digest, signature)
+
+    def digest(self, ipath, as_version=4):
+        """ the hash of the notebook file at ipath, without parsing it """
+        signature = self._signature(ipath)
+        with self._lock:
+            entry = self._entries.get((str(ipath), as_version))
+        if entry is not None and signature is not None and entry[0] == signature:
+            return entry[1]
+        return hashlib.sha256(_read_text(ipath).encode('utf-8')).hexdigest()
+
+    def store(self, ipath, as_version, miss, nb):
+        """ cache the notebook parsed from a lookup miss """
+        key = (str(ipath), as_version)
+        _, digest, signature = miss
+        with self._lock:
+            self.parsed += 1
+            self._entries[key] = (signature, digest, nb)
+            self._entries.move_to_end(key)
+            while self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def read(self, ipath, as_version=4):
+        """ the notebook at ipath, parsed only if it changed """
+        nb, miss = self.lookup(ipath, as_version)
+        if nb is None:
+            logging.debug('parsing notebook: {}'.format(ipath))
+            nb = _parse(miss[0], as_version)
+            self.store(ipath, as_version, miss, nb)
+        return nb
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def notebook_paths(ipynb_path, ignore_prefix='_'):
+    """ the notebook(s) at a path, in the order they are merged
+
+    Parameters
+    ----------
+    ipynb_path: str or path_like
+        notebook file or directory
+    ignore_prefix : str
+        ignore filename starting with this prefix
+
+    Returns
+    -------
+    paths: list of pathlib.Path
+
+    """
+    if isinstance(ipynb_path, basestring):
+        ipynb_path = pathlib.Path(ipynb_path)
+    if not ipynb_path.exists():
+        logging.error('the notebook path does not exist: {}'.format(ipynb_path))
+        raise IOError('the notebook path does not exist: {}'.format(ipynb_path))
+
+    if not ipynb_path.is_dir():
+        return [ipynb_path]
+    return [ipath for ipath in alphanumeric_sort(ipynb_path.glob('*.ipynb'))
+            if not os.path.basename(ipath.name).startswith(ignore_prefix)]
+
+
+def _process_pool(max_workers):
+    try:
+        return ProcessPoolExecutor(max_workers)
+    except (ImportError, NotImplementedError, OSError) as err:
+        logging.debug('reading notebooks serially: {}'.format(err))
+        return None
+
+
+def iter_notebooks(paths, as_version=4, cache=None, max_workers=None):
+    """ iterate over the notebooks at paths, in order
+
+    notebooks that are not cached are parsed and validated in parallel
+    worker processes, once at least two of them miss the cache (a single
+    notebook is parsed serially, without starting a pool); at most a few
+    notebooks per worker are read ahead, so a consumer that discards each
+    notebook keeps memory bounded
+
+    Parameters
+    ----------
+    paths: list of pathlib.Path
+    as_version: int
+        notebook format vesion
+    cache: NotebookCache or None
+        if given, unchanged notebooks are taken from the cache
+    max_workers: int or None
+        number of worker processes, by default one per cpu
+
+    Yields
+    ------
+    (path, notebook)
+
+    """
+    if cache is None:
+        cache = NotebookCache(maxsize=0)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    pool = None
+    misses = 0
+    pending = collections.deque()
+    paths = iter(paths)
+    try:
+        while True:
+            for ipath in paths:
+                nb, miss = cache.lookup(ipath, as_version)
+                if nb is None:
+                    misses += 1
+                    if misses == 2 and max_workers > 1:
+                        pool = _process_pool(max_workers)
+                        if pool is not None:
+                            # submit the miss that is still waiting
+                            pending = collections.deque(
+                                (p, pool.submit(_parse, m[0], as_version)
+                                 if m is not None and n is None else n, m)
+                                for p, n, m in pending)
+                    if pool is not None:
+                        nb = pool.submit(_parse, miss[0], as_version)
+                pending.append((ipath, nb, miss))
+                if len(pending) >= 2 * max_workers:
+                    break
+            if not pending:
+                return
+            ipath, nb, miss = pending.popleft()
+            if miss is not None:
+                if nb is None:
+                    logging.debug('parsing notebook: {}'.format(ipath))
+                    nb = _parse(miss[0], as_version)
+                else:
+                    nb = nb.result()
+                cache.store(ipath, as_version, miss, nb)
+            yield ipath, nb
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def iter_merged_cells(ipynb_path, ignore_prefix='_', as_version=4,
+                      cache=None, max_workers=None):
+    """ iterate over the cells of one or more ipynb's,
+    in the order merge_notebooks merges them,
+    without building the merged notebook
+
+    Parameters
+    ----------
+    ipynb_path: str or path_like
+    ignore_prefix : str
+        ignore filename starting with this prefix
+    as_version: int
+        notebook format vesion
+    cache: NotebookCache or None
+        if given, unchanged notebooks are taken from the cache
+    max_workers: int or None
+        number of processes parsing notebooks
+
+    """
+    paths = notebook_paths(ipynb_path, ignore_prefix)
+    for _, nb in iter_notebooks(paths, as_version, cache, max_workers):
+        for cell in nb.cells:
+            yield cell
+
+
 def merge_notebooks(ipynb_path, ignore_prefix='_',
-                    to_str=False, as_version=4):
+                    to_str=False, as_version=4,
+                    cache=None, max_workers=None):
     """ merge one or more ipynb's,
     if more than one, then the meta data is taken from the first
 
@@ -53,6 +288,11 @@ def merge_notebooks(ipynb_path, ignore_prefix='_',
         return as a string, else return nbformat object
     as_version: int
         notebook format vesion
+    cache: NotebookCache or None
+        if given, only notebooks that changed since the last merge are read
+        (the merged notebook then shares its cells with the cache)
+    max_workers: int or None
+        number of processes parsing notebooks
 
     Returns
     ------
@@ -61,43 +301,31 @@ def merge_notebooks(ipynb_path, ignore_prefix='_',
         path to notebook containing meta file
 
     """
-    meta_path = ''
     if isinstance(ipynb_path, basestring):
         ipynb_path = pathlib.Path(ipynb_path)
-    if not ipynb_path.exists():
-        logging.error('the notebook path does not exist: {}'.format(ipynb_path))
-        raise IOError('the notebook path does not exist: {}'.format(ipynb_path))
-
-    final_nb = None
+    paths = notebook_paths(ipynb_path, ignore_prefix)
     if ipynb_path.is_dir():
         logging.info('Merging all notebooks in directory')
-        for ipath in alphanumeric_sort(ipynb_path.glob('*.ipynb')):
-            if os.path.basename(ipath.name).startswith(ignore_prefix):
-                continue
-            with ipath.open('r', encoding='utf-8') as f:
-                if sys.version_info.major == 3 and sys.version_info.minor < 6 and "win" not in sys.platform:
-                    data = f.read()
-                    if hasattr(data, "decode"):
-                        data = data.decode("utf-8")
-                    nb = nbformat.reads(data, as_version=as_version)
-                else:
-                    nb = nbformat.read(f, as_version=as_version)
-            if final_nb is None:
-                meta_path = ipath
-                final_nb = nb
-            else:
-                final_nb.cells.extend(nb.cells)
     else:
         logging.info('Reading notebook')
-        with ipynb_path.open('r', encoding='utf-8') as f:
-            if sys.version_info.major == 3 and sys.version_info.minor < 6 and "win" not in sys.platform:
-                data = f.read()
-                if hasattr(data, "decode"):
-                    data = data.decode("utf-8")
-                final_nb = nbformat.reads(data, as_version=as_version)
-            else:
-                final_nb = nbformat.read(f, as_version=as_version)
-        meta_path = ipynb_path
+
+    meta_path = ''
+    final_nb = None
+    for ipath, nb in iter_notebooks(paths, as_version, cache, max_workers):
+        if final_nb is None:
+            meta_path = ipath
+            # a new notebook, so that a cached one is left unchanged
+            final_nb = nbformat.from_dict(
+                {k: v for k, v in nb.items() if k not in ('cells', 'metadata')})
+            final_nb.metadata = nbformat.from_dict(nb.metadata)
+            final_nb.cells = list(nb.cells)
+        else:
+            final_nb.cells.extend(nb.cells)
+
+    if final_nb is None:
+        logging.error('no acceptable notebooks found for path: {}'.format(ipynb_path.name))
+        raise IOError('no acceptable notebooks found for path: {}'.format(ipynb_path.name))
+
     if not hasattr(final_nb.metadata, 'name'):
         final_nb.metadata.name = ''
     final_nb.metadata.name += "_merged"
@@ -108,8 +336,4 @@ def merge_notebooks(ipynb_path, ignore_prefix='_',
         else:
             return nbformat.writes(final_nb).encode('utf-8')
 
-    if final_nb is None:
-        logging.error('no acceptable notebooks found for path: {}'.format(ipynb_path.name))
-        raise IOError('no acceptable notebooks found for path: {}'.format(ipynb_path.name))
-
     return final_nb, meta_path
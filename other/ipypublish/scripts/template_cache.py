@@ -0,0 +1,84 @@
+"""cache templates composed by create_tpl/create_tplx,
+and the Jinja code they (and the templates they extend) compile to
+
+composed templates are keyed by the outline and the content of the segment
+dicts they were composed from, so any change to a segment makes a new key.
+Composing is only string formatting, so they are kept in memory for the
+process; the compiled code is kept by nbconvert's TemplateBytecodeCache,
+persisted in cache_dir, so rebuilding with the same export plugin
+does not recompile
+
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+
+from nbconvert_dev.exporters.templateexporter import TemplateBytecodeCache
+
+_CACHE_VERSION = 1
+
+
+def _default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ipypublish', 'templates')
+
+
+# the directory compiled templates are persisted in, or None to keep them in memory only
+cache_dir = _default_cache_dir()
+
+_composed = {}
+_lock = threading.Lock()
+
+
+def segments_key(outline, segments):
+    """ a key for the template composed from segments into outline
+
+    Properties
+    ----------
+    outline: str
+    segments: list of dicts
+
+    Examples
+    --------
+    >>> segments_key('{a}', [{'a': 'x'}]) == segments_key('{a}', [{'a': 'x'}])
+    True
+    >>> segments_key('{a}', [{'a': 'x'}]) == segments_key('{a}', [{'a': 'y'}])
+    False
+
+    """
+    key = hashlib.sha256(repr((_CACHE_VERSION, outline)).encode('utf-8'))
+    for segment in segments:
+        key.update(repr(sorted(segment.items())).encode('utf-8'))
+    return key.hexdigest()
+
+
+def get_composed(key):
+    """ the template composed for key, or None """
+    with _lock:
+        return _composed.get(key)
+
+
+def put_composed(key, template):
+    """ store the template composed for key """
+    with _lock:
+        _composed[key] = template
+
+
+def template_name(template):
+    """ a name for a template, unique to its content """
+    return 'ipypublish_' + hashlib.sha256(template.encode('utf-8')).hexdigest()[:32]
+
+
+def bytecode_cache():
+    """ the Jinja bytecode cache shared by all exporters of the process,
+    persisted in cache_dir """
+    return TemplateBytecodeCache.for_directory(cache_dir)
+
+
+def clear():
+    """ remove all cached templates, in memory and in cache_dir """
+    with _lock:
+        _composed.clear()
+    bytecode_cache().clear()
@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 import shutil
 import tempfile
-from ipypublish.main import publish
+from ipypublish.main import publish, referenced_paths, substitute_refslides
 from ipypublish.scripts import nbexport
 from ipypublish.scripts import nbmerge
 from ipypublish.scripts import pdfexport
@@ -206,6 +206,30 @@ class TestMain(object):
         eq_(nb.metadata.test_name, "notebook2")
         eq_(len(nb.cells), 4)
 
+    def test_nbmerge_cache(self):
+        cache = nbmerge.NotebookCache()
+        nb1, path = nbmerge.merge_notebooks(self.directory, cache=cache)
+        nb2, path = nbmerge.merge_notebooks(self.directory, cache=cache)
+        eq_(cache.parsed, 2)
+        eq_(nb1, nb2)
+        eq_(nb2.metadata.name, "_merged")
+
+    def test_nbmerge_one_notebook_serial(self):
+        pools = []
+        process_pool = nbmerge._process_pool
+        nbmerge._process_pool = lambda max_workers: pools.append(max_workers)
+        try:
+            nb, path = nbmerge.merge_notebooks(self.file1, max_workers=4)
+        finally:
+            nbmerge._process_pool = process_pool
+        eq_(len(nb.cells), 2)
+        eq_(pools, [])
+
+    def test_nbmerge_iter_cells(self):
+        cells = list(nbmerge.iter_merged_cells(self.directory))
+        nb, path = nbmerge.merge_notebooks(self.directory)
+        eq_(cells, nb.cells)
+
     def test_nbexport_latex_empty(self):
         template = ''
         config = {}
@@ -310,6 +334,96 @@ test123
         finally:
             shutil.rmtree(out_folder)
 
+    def test_publish_file1_incremental(self):
+
+        out_folder = tempfile.mkdtemp()
+        tex_path = os.path.join(out_folder, '2test.tex')
+        build_path = os.path.join(out_folder, '2test.nbpub.build')
+        try:
+            publish(self.file1, outpath=out_folder, incremental=True)
+            assert os.path.exists(build_path)
+            with open(tex_path) as f:
+                first = f.read()
+            os.remove(tex_path)
+            publish(self.file1, outpath=out_folder, incremental=True)
+            with open(tex_path) as f:
+                eq_(f.read(), first)
+        finally:
+            shutil.rmtree(out_folder)
+
+    def test_substitute_refslides(self):
+        body = 'a {{id_home_prefix}}fig1 b {{id_home_prefix}}fig10'
+        eq_(substitute_refslides(body, {'fig1': (1, 2), 'fig10': (3, 4)}),
+            'a #/1/2fig1 b #/3/4fig10')
+
+    def test_referenced_paths(self):
+        body = 'x f/a_1_1.png.bak y f/a_2_1.png'
+        paths = ['f/a_1_1.png', 'f/a_1_1.png.bak', 'f/a_2_1.png', 'f/a_3_1.png']
+        eq_(referenced_paths(body, paths),
+            {'f/a_1_1.png', 'f/a_1_1.png.bak', 'f/a_2_1.png'})
+
+    def test_plugins_loaded_on_lookup(self):
+        from ipypublish.scripts import export_plugins
+        out_folder = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(out_folder, 'lazy_plugin.py'), 'w') as f:
+                f.write('"""a lazy plugin"""\n'
+                        'raise ImportError("imported")\n'
+                        'oformat = "Latex"\ntemplate = ""\nconfig = {}\n')
+            eq_(export_plugins.add_directory(out_folder), [])
+            plugins = export_plugins.get()
+            assert 'lazy_plugin' in plugins
+            eq_(plugins.descriptions()['lazy_plugin'], 'a lazy plugin')
+            try:
+                plugins['lazy_plugin']
+            except IOError:
+                pass
+            else:
+                raise AssertionError('plugin not imported on lookup')
+        finally:
+            export_plugins._plugins_dict.pop('lazy_plugin', None)
+            shutil.rmtree(out_folder)
+
+    def test_plugin_config_copied(self):
+        from ipypublish.scripts import export_plugins
+        out_folder = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(out_folder, 'copied_plugin.py'), 'w') as f:
+                f.write('"""a plugin"""\n'
+                        'oformat = "Latex"\ntemplate = ""\nconfig = {"a": 1}\n')
+            eq_(export_plugins.add_directory(out_folder), [])
+            plugins = export_plugins.get()
+            plugins['copied_plugin']['config']['a'] = 2
+            eq_(plugins['copied_plugin']['config'], {'a': 1})
+        finally:
+            export_plugins._plugins_dict.pop('copied_plugin', None)
+            shutil.rmtree(out_folder)
+
+    def test_template_cache(self):
+        from ipypublish.latex.create_tplx import TPLX_OUTLINE, create_tplx
+        from ipypublish.latex.standard import standard_packages
+        from ipypublish.scripts import template_cache
+        out_folder = tempfile.mkdtemp()
+        cache_dir = template_cache.cache_dir
+        template_cache.cache_dir = out_folder
+        try:
+            tplx = create_tplx([standard_packages.tplx_dict])
+            key = template_cache.segments_key(TPLX_OUTLINE, [standard_packages.tplx_dict])
+            eq_(template_cache.get_composed(key), tplx)
+            # composed templates are kept in memory, compiled ones on disk
+            eq_(os.listdir(out_folder), [])
+            nb, path = nbmerge.merge_notebooks(self.file1)
+            template = '((* block markdowncell scoped *))x((* endblock markdowncell *))'
+            nbexport.export_notebook(nb, 'Latex', {}, template)
+            assert os.listdir(out_folder)
+            template_cache.clear()
+            eq_(template_cache.get_composed(key), None)
+            eq_(os.listdir(out_folder), [])
+            eq_(create_tplx([standard_packages.tplx_dict]), tplx)
+        finally:
+            template_cache.cache_dir = cache_dir
+            shutil.rmtree(out_folder)
+
     def test_publish_file1_pdf(self):
 
         out_folder = tempfile.mkdtemp()
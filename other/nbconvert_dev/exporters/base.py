@@ -3,6 +3,8 @@
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import sys
+import threading
 import warnings
 
 import entrypoints
@@ -32,6 +34,22 @@ __all__ = [
 class ExporterNameError(NameError):
     pass
 
+# (sys.path, entry points by name, exporter classes loaded from them);
+# scanning the installed distributions is slow, so it is done once per sys.path
+_registry = (None, {}, {})
+_registry_lock = threading.Lock()
+
+
+def _exporter_registry():
+    """The `nbconvert.exporters` entry points by name, and the exporters
+    already loaded from them, for the current sys.path"""
+    global _registry
+    path = tuple(sys.path)
+    with _registry_lock:
+        if _registry[0] != path:
+            _registry = (path, entrypoints.get_group_named('nbconvert.exporters'), {})
+        return _registry[1], _registry[2]
+
 def export(exporter, nb, **kw):
     """
     Export a notebook object using specific exporter class.
@@ -89,16 +107,20 @@ def get_exporter(name):
     """Given an exporter name or import path, return a class ready to be instantiated
     
     Raises ValueError if exporter is not found
+
+    Entry points are looked up once per sys.path, and each exporter class
+    is loaded once; distributions installed later on the same sys.path
+    are not seen.
     """
 
-    try:
-        return entrypoints.get_single('nbconvert.exporters', name).load()
-    except entrypoints.NoSuchEntryPoint:
-        try:
-            return entrypoints.get_single('nbconvert.exporters', name.lower()).load()
-        except entrypoints.NoSuchEntryPoint:
-            pass
-        
+    entry_points, loaded = _exporter_registry()
+    for key in (name, name.lower()):
+        if key in loaded:
+            return loaded[key]
+        if key in entry_points:
+            cls = loaded[key] = entry_points[key].load()
+            return cls
+
     if '.' in name:
         try:
             return import_item(name)
@@ -116,4 +138,4 @@ def get_export_names():
     Exporters can be found in external packages by registering
     them as an nbconvert.exporter entrypoint.
     """
-    return sorted(entrypoints.get_group_named('nbconvert.exporters'))
+    return sorted(_exporter_registry()[0])
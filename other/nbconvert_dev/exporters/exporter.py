@@ -17,7 +17,7 @@ import nbformat
 
 from traitlets.config.configurable import LoggingConfigurable
 from traitlets.config import Config
-from traitlets import HasTraits, Unicode, List, TraitError
+from traitlets import HasTraits, Unicode, List, Bool, TraitError
 from traitlets.utils.importstring import import_item
 from ipython_genutils import text, py3compat
 
@@ -84,6 +84,14 @@ class Exporter(LoggingConfigurable):
         instance, or type."""
     ).tag(config=True)
 
+    lazy_outputs = Bool(False,
+        help="""Read notebook files with the outputs of code cells left unparsed
+        until something uses them, so outputs that are cleared or never
+        rendered cost nothing to load. The notebook is not validated on read,
+        and outputs that were never loaded are left out of the validation
+        after each preprocessor."""
+    ).tag(config=True)
+
     def __init__(self, config=None, **kw):
         """
         Public constructor
@@ -124,7 +132,8 @@ class Exporter(LoggingConfigurable):
           Ignored
 
         """
-        nb_copy = copy.deepcopy(nb)
+        from ..utils.lazynb import copy_notebook
+        nb_copy = copy_notebook(nb)
         resources = self._init_resources(resources)
 
         if 'language' in nb['metadata']:
@@ -169,6 +178,10 @@ class Exporter(LoggingConfigurable):
         modified_date = datetime.datetime.fromtimestamp(os.path.getmtime(filename))
         resources['metadata']['modified_date'] = modified_date.strftime(text.date_format)
 
+        if self.lazy_outputs:
+            from ..utils.lazynb import read_notebook
+            return self.from_notebook_node(read_notebook(filename), resources=resources, **kw)
+
         with io.open(filename, encoding='utf-8') as f:
             return self.from_file(f, resources=resources, **kw)
 
@@ -282,6 +295,32 @@ class Exporter(LoggingConfigurable):
         return resources
 
 
+    _pipeline_cached = (None, None)
+
+    #: ``(stage name, seconds)`` for each preprocessor stage of the last notebook
+    preprocess_timings = ()
+
+    def _pipeline(self):
+        """The stages running the preprocessors, compiled once per exporter
+
+        Compiled again when a preprocessor is registered, enabled or disabled.
+        """
+        # imported here like the default preprocessors, which are named by string
+        from ..preprocessors.base import compile_pipeline
+
+        key = tuple((id(p), getattr(p, 'enabled', True)) for p in self._preprocessors)
+        if self._pipeline_cached[0] != key:
+            self._pipeline_cached = (key, compile_pipeline(self._preprocessors))
+        return self._pipeline_cached[1]
+
+    def _validate_preprocessed(self, nb, stage):
+        from ..utils.lazynb import without_unloaded
+        try:
+            nbformat.validate(without_unloaded(nb), relax_add_props=True)
+        except nbformat.ValidationError:
+            self.log.error('Notebook is invalid after preprocessor %s', stage)
+            raise
+
     def _preprocess(self, nb, resources):
         """
         Preprocess the notebook before passing it into the Jinja engine.
@@ -299,18 +338,16 @@ class Exporter(LoggingConfigurable):
 
         # Do a copy.deepcopy first,
         # we are never safe enough with what the preprocessors could do.
-        nbc =  copy.deepcopy(nb)
+        from ..preprocessors.base import run_pipeline
+        from ..utils.lazynb import copy_notebook
+
+        nbc = copy_notebook(nb)
         resc = copy.deepcopy(resources)
 
         #Run each preprocessor on the notebook.  Carry the output along
-        #to each preprocessor
-        for preprocessor in self._preprocessors:
-            nbc, resc = preprocessor(nbc, resc)
-            try: 
-                nbformat.validate(nbc, relax_add_props=True)
-            except nbformat.ValidationError:
-                self.log.error('Notebook is invalid after preprocessor {}',
-                               preprocessor)
-                raise
+        #to each preprocessor. Consecutive per-cell preprocessors run
+        #fused, in a single pass over the cells.
+        nbc, resc, self.preprocess_timings = run_pipeline(
+            self._pipeline(), nbc, resc, validate=self._validate_preprocessed, log=self.log)
 
         return nbc, resc
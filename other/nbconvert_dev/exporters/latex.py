@@ -5,11 +5,14 @@
 
 import os
 
-from traitlets import Unicode, default
+from traitlets import Unicode, Bool, default
 from traitlets.config import Config
 
 from nbconvert.filters.highlight import Highlight2Latex
-from nbconvert.filters.filter_links import resolve_references
+from ..filters.filter_links import resolve_references
+from ..filters.citation import citation2latex
+from ..filters.strings import strip_files_prefix
+from ..utils.pandoc import pandoc_batch, PandocMissing
 from .templateexporter import TemplateExporter
 
 class LatexExporter(TemplateExporter):
@@ -44,6 +47,13 @@ class LatexExporter(TemplateExporter):
 
     output_mimetype = 'text/latex'
 
+    batch_pandoc = Bool(True,
+        help="""Convert the markdown cells of a notebook with a few pandoc runs
+        before rendering, instead of running pandoc once or twice per cell
+        while the template is rendered. Conversions the template makes
+        differently from the default templates still run per cell."""
+    ).tag(config=True)
+
     def default_filters(self):
         for x in super(LatexExporter, self).default_filters():
             yield x 
@@ -81,6 +91,29 @@ class LatexExporter(TemplateExporter):
                              Highlight2Latex(pygments_lexer=lexer, parent=self))
         return super(LatexExporter, self).from_notebook_node(nb, resources, **kw)
 
+    def _preprocess(self, nb, resources):
+        nb, resources = super(LatexExporter, self)._preprocess(nb, resources)
+        if self.batch_pandoc:
+            self._convert_markdown_cells(nb)
+        return nb, resources
+
+    def _convert_markdown_cells(self, nb):
+        """Put the conversions of the markdown cells into the pandoc cache
+
+        Mirrors the filter chain of the markdown cells in document_contents.tplx.
+        """
+        sources = [strip_files_prefix(citation2latex(cell.source))
+                   for cell in nb.cells if cell.cell_type == 'markdown']
+        if not sources:
+            return
+        try:
+            docs = pandoc_batch(sources, 'markdown+tex_math_double_backslash', 'json',
+                                extra_args=[])
+        except PandocMissing:
+            # raised again if the template really needs pandoc
+            return
+        pandoc_batch([resolve_references(doc) for doc in docs], 'json', 'latex')
+
     def _create_environment(self):
         environment = super(LatexExporter, self)._create_environment()
 
@@ -7,7 +7,7 @@ import subprocess
 import os
 import sys
 
-from ipython_genutils.py3compat import which, cast_bytes_py2, getcwd
+from ipython_genutils.py3compat import which, cast_bytes_py2, getcwd, string_types
 from traitlets import Integer, List, Bool, Instance, Unicode
 from testpath.tempdir import TemporaryWorkingDirectory
 from .latex import LatexExporter
@@ -161,6 +161,9 @@ class PDFExporter(LatexExporter):
         latex, resources = super(PDFExporter, self).from_notebook_node(
             nb, resources=resources, **kw
         )
+        if not isinstance(latex, string_types):
+            # stream_output: latex has to be run on the whole document anyway
+            latex = u''.join(latex)
         # set texinputs directory, so that local files will be found
         if resources and resources.get('metadata', {}).get('path'):
             self.texinputs = resources['metadata']['path']
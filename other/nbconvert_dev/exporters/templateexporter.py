@@ -7,7 +7,10 @@ that uses Jinja2 to export notebook files into different formats.
 
 from __future__ import print_function, absolute_import
 
+import errno
+import hashlib
 import os
+import threading
 import uuid
 import json
 
@@ -18,6 +21,7 @@ from ipython_genutils import py3compat
 from jinja2 import (
     TemplateNotFound, Environment, ChoiceLoader, FileSystemLoader, BaseLoader
 )
+from jinja2.bccache import BytecodeCache, Bucket
 
 from nbconvert_dev import filters
 from .exporter import Exporter
@@ -82,6 +86,116 @@ class ExtensionTolerantLoader(BaseLoader):
         return self.loader.list_templates()
 
 
+def _default_template_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'nbconvert', 'templates')
+
+
+class TemplateBytecodeCache(BytecodeCache):
+    """Compiled templates shared by all exporters of the process, and
+    optionally by all processes through a directory on disk.
+
+    Every exporter builds its own Jinja environment, and each environment
+    would compile the templates it loads again. Compiled code is kept
+    here instead, keyed by the template name and file, the settings of
+    the environment that affect compilation and the registered filter
+    names; a checksum of the template source rejects stale entries.
+    Use :meth:`for_directory` to get the cache of a directory.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, directory=None):
+        """The process-wide cache storing to `directory`, or only in memory if None"""
+        with cls._instances_lock:
+            cache = cls._instances.get(directory)
+            if cache is None:
+                cache = cls._instances[directory] = cls(directory)
+            return cache
+
+    def get_bucket(self, environment, name, filename, source):
+        key = self.get_cache_key(name, filename) + _environment_signature(environment)
+        bucket = Bucket(environment, key, self.get_source_checksum(source))
+        self.load_bytecode(bucket)
+        return bucket
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.cache')
+
+    def load_bytecode(self, bucket):
+        with self._lock:
+            entry = self._memory.get(bucket.key)
+        if entry is not None and entry[0] == bucket.checksum:
+            bucket.code = entry[1]
+            return
+        if not self.directory:
+            return
+        try:
+            with open(self._path(bucket.key), 'rb') as f:
+                bucket.load_bytecode(f)
+        except Exception:
+            # missing, or written by another version, or half written
+            bucket.reset()
+            return
+        if bucket.code is not None:
+            with self._lock:
+                self._memory[bucket.key] = (bucket.checksum, bucket.code)
+
+    def dump_bytecode(self, bucket):
+        with self._lock:
+            self._memory[bucket.key] = (bucket.checksum, bucket.code)
+        if not self.directory:
+            return
+        path = self._path(bucket.key)
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            try:
+                os.makedirs(self.directory)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            with open(tmp, 'wb') as f:
+                bucket.write_bytecode(f)
+            os.replace(tmp, path)
+        except OSError:
+            # the disk cache is an optimization only
+            pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith('.cache'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def _environment_signature(environment):
+    """A digest of the environment settings that change the compiled code of a template"""
+    settings = [
+        environment.block_start_string, environment.block_end_string,
+        environment.variable_start_string, environment.variable_end_string,
+        environment.comment_start_string, environment.comment_end_string,
+        environment.line_statement_prefix, environment.line_comment_prefix,
+        environment.trim_blocks, environment.lstrip_blocks,
+        environment.newline_sequence, environment.keep_trailing_newline,
+        environment.optimized, environment.autoescape,
+        sorted(environment.extensions), sorted(environment.filters), sorted(environment.tests),
+    ]
+    return '-' + hashlib.sha1(repr(settings).encode('utf-8')).hexdigest()[:16]
+
+
 class TemplateExporter(Exporter):
     """
     Exports notebooks into other file formats.  Uses Jinja 2 templating engine
@@ -207,7 +321,25 @@ class TemplateExporter(Exporter):
     exclude_unknown = Bool(False,
         help = "This allows you to exclude unknown cells from all templates if set to True."
         ).tag(config=True)
+
+    stream_output = Bool(False,
+        help = """Return the rendered template as an iterator of text chunks
+        instead of one string, so writers can write large outputs without
+        building the whole document in memory. FilesWriter and StdoutWriter
+        accept either form; PDFExporter joins the chunks, since LaTeX needs
+        the whole document."""
+        ).tag(config=True)
     
+    template_cache_dir = Unicode(
+        help="""Directory compiled templates are cached in, so new processes do
+        not compile the templates again. An empty string keeps compiled
+        templates in memory only."""
+    ).tag(config=True, affects_environment=True)
+
+    @default('template_cache_dir')
+    def _template_cache_dir_default(self):
+        return _default_template_cache_dir()
+
     extra_loaders = List(
         help="Jinja loaders to find templates. Will be tried in order "
              "before the default FileSystem ones.",
@@ -292,7 +424,10 @@ class TemplateExporter(Exporter):
                 }
 
         # Top level variables are passed to the template_exporter here.
-        output = self.template.render(nb=nb_copy, resources=resources)
+        if self.stream_output:
+            output = self.template.generate(nb=nb_copy, resources=resources)
+        else:
+            output = self.template.render(nb=nb_copy, resources=resources)
         return output, resources
 
     def _register_filter(self, environ, name, jinja_filter):
@@ -381,7 +516,8 @@ class TemplateExporter(Exporter):
         ]
         environment = Environment(
             loader=ChoiceLoader(loaders),
-            extensions=JINJA_EXTENSIONS
+            extensions=JINJA_EXTENSIONS,
+            bytecode_cache=TemplateBytecodeCache.for_directory(self.template_cache_dir or None),
             )
 
         environment.globals['uuid4'] = uuid.uuid4
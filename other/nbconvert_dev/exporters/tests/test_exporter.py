@@ -14,11 +14,20 @@ Module with tests for exporter.py
 # Imports
 #-----------------------------------------------------------------------------
 
+import io
+import os
+
+import nbformat
+from nbformat import v4
+from testpath.tempdir import TemporaryDirectory
 from traitlets.config import Config
 
 from .base import ExportersTestsBase
 from ...preprocessors.base import Preprocessor
+from ...utils import lazynb
 from ..exporter import Exporter
+from ..html import HTMLExporter
+from ..notebook import NotebookExporter
 
 
 #-----------------------------------------------------------------------------
@@ -57,3 +66,39 @@ class TestExporter(ExportersTestsBase):
         exporter = Exporter(config=config)
         (notebook, resources) = exporter.from_filename(self._get_notebook())
         self.assertEqual(notebook['pizza'], 'cheese')
+
+
+    def test_lazy_outputs_cleared(self):
+        """Are outputs that ClearOutputPreprocessor drops never parsed?"""
+        nb = v4.new_notebook(cells=[
+            v4.new_code_cell('1', outputs=[
+                v4.new_output('display_data', data={'text/plain': 'output-1 ' * 1000}),
+            ]),
+            v4.new_code_cell('2', outputs=[v4.new_output('stream', text='2\n')],
+                             metadata={'tags': ['hide']}),
+            v4.new_code_cell('3'),
+        ])
+        config = Config({
+            'ClearOutputPreprocessor': {'enabled': True},
+            'TagRemovePreprocessor': {'remove_cell_tags': ['hide']},
+            'Exporter': {'lazy_outputs': True},
+        })
+        parsed = []
+
+        def parse_outputs(data):
+            parsed.append(data)
+            return parse_outputs_orig(data)
+
+        with TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'outputs.ipynb')
+            with io.open(filename, 'w', encoding='utf-8') as f:
+                nbformat.write(nb, f)
+            parse_outputs_orig = lazynb._parse_outputs
+            lazynb._parse_outputs = parse_outputs
+            try:
+                for exporter_class in (NotebookExporter, HTMLExporter):
+                    output, resources = exporter_class(config=config).from_filename(filename)
+                    assert 'output-1' not in output
+            finally:
+                lazynb._parse_outputs = parse_outputs_orig
+        self.assertEqual(parsed, [])
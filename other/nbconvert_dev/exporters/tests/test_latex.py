@@ -6,9 +6,11 @@
 import os.path
 import textwrap
 import re
+import subprocess
 
 from .base import ExportersTestsBase
 from ..latex import LatexExporter
+from ...utils import pandoc
 from nbformat import write
 from nbformat import v4
 from ipython_genutils.testing.decorators import onlyif_cmds_exist
@@ -101,6 +103,40 @@ class TestLatexExporter(ExportersTestsBase):
             (output, resources) = LatexExporter(template_file='article').from_filename(nbfile)
             assert len(output) > 0
 
+    @onlyif_cmds_exist('pandoc')
+    def test_batch_pandoc(self):
+        """
+        Does the template find the markdown cells converted by the batch in the cache?
+        """
+        events = []
+
+        class BatchExporter(LatexExporter):
+            def _convert_markdown_cells(self, nb):
+                super(BatchExporter, self)._convert_markdown_cells(nb)
+                events.append('batch')
+
+        def popen(cmd, *args, **kwargs):
+            if cmd[0] == 'pandoc':
+                events.append('run')
+            return popen_orig(cmd, *args, **kwargs)
+
+        nb = v4.new_notebook(cells=[
+            v4.new_markdown_cell("# Title\n\nSome *text* and a [link](#Title)."),
+            v4.new_code_cell("print(1)"),
+            v4.new_markdown_cell("* a list\n* with $x^2$"),
+        ])
+        pandoc.clean_cache()
+        popen_orig = subprocess.Popen
+        subprocess.Popen = popen
+        try:
+            output, resources = BatchExporter().from_notebook_node(nb)
+        finally:
+            subprocess.Popen = popen_orig
+        assert 'batch' in events
+        # no pandoc runs while rendering the template
+        self.assertEqual(events[-1], 'batch')
+        assert 'Some \\emph{text}' in output
+
     @onlyif_cmds_exist('pandoc')
     def test_prompt_number_color(self):
         """
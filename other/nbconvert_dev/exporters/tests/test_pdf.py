@@ -39,3 +39,15 @@ class TestPDF(ExportersTestsBase):
             self.assertIsInstance(output, bytes)
             assert len(output) > 0
 
+
+    @dec.onlyif_cmds_exist('xelatex')
+    @dec.onlyif_cmds_exist('pandoc')
+    def test_export_stream_output(self):
+        """Does PDFExporter accept streamed LaTeX?"""
+        with tempdir.TemporaryDirectory() as td:
+            newpath = os.path.join(td, os.path.basename(self._get_notebook()))
+            shutil.copy(self._get_notebook(), newpath)
+            exporter = self.exporter_class(latex_count=1, stream_output=True)
+            (output, resources) = exporter.from_filename(newpath)
+            self.assertIsInstance(output, bytes)
+            assert len(output) > 0
@@ -8,12 +8,12 @@ Module with tests for templateexporter.py
 import os
 
 from traitlets.config import Config
-from jinja2 import DictLoader, TemplateNotFound
+from jinja2 import DictLoader, Environment, TemplateNotFound
 from nbformat import v4
 
 from .base import ExportersTestsBase
 from .cheese import CheesePreprocessor
-from ..templateexporter import TemplateExporter
+from ..templateexporter import TemplateExporter, TemplateBytecodeCache
 from ..html import HTMLExporter
 from ..markdown import MarkdownExporter
 from testpath import tempdir
@@ -52,6 +52,18 @@ class TestExporter(ExportersTestsBase):
         assert len(resources['outputs']) > 0
 
 
+    def test_stream_output(self):
+        """
+        Does stream_output render the same document in chunks?
+        """
+        exporter = self._make_exporter()
+        (output, resources) = exporter.from_filename(self._get_notebook())
+        exporter = self._make_exporter(config=Config({'TemplateExporter': {'stream_output': True}}))
+        (chunks, resources) = exporter.from_filename(self._get_notebook())
+        assert not isinstance(chunks, str)
+        assert ''.join(chunks) == output
+
+
     def test_preprocessor_class(self):
         """
         Can a preprocessor be added to the preprocessors list by class type?
@@ -258,6 +270,35 @@ class TestExporter(ExportersTestsBase):
         assert "cell is just markdown testing whether" not in nb
         assert "(100,)" not in nb
 
+    def test_bytecode_cache_shared(self):
+        """Do environments sharing a bytecode cache compile a template once?"""
+        loader = DictLoader({'t.tpl': '{{ x | upper }}'})
+        cache = TemplateBytecodeCache()
+        first = Environment(loader=loader, bytecode_cache=cache)
+        assert first.get_template('t.tpl').render(x='a') == 'A'
+        assert len(cache._memory) == 1
+
+        second = Environment(loader=loader, bytecode_cache=cache)
+        bucket = cache.get_bucket(second, 't.tpl', None, '{{ x | upper }}')
+        assert bucket.code is not None
+        # other syntax settings compile differently
+        third = Environment(loader=loader, bytecode_cache=cache, variable_start_string='(((')
+        assert cache.get_bucket(third, 't.tpl', None, '{{ x | upper }}').code is None
+
+    def test_bytecode_cache_on_disk(self):
+        """Are compiled templates reused by a new process?"""
+        loader = DictLoader({'t.tpl': '{{ x }}'})
+        with tempdir.TemporaryDirectory() as td:
+            env = Environment(loader=loader, bytecode_cache=TemplateBytecodeCache(td))
+            env.get_template('t.tpl')
+            assert len(os.listdir(td)) == 1
+
+            # a fresh cache, as in a new process
+            cache = TemplateBytecodeCache(td)
+            env = Environment(loader=loader, bytecode_cache=cache)
+            assert cache.get_bucket(env, 't.tpl', None, '{{ x }}').code is not None
+            assert env.get_template('t.tpl').render(x=1) == '1'
+
     def _make_exporter(self, config=None):
         # Create the exporter instance, make sure to set a template name since
         # the base TemplateExporter doesn't have a template associated with it.
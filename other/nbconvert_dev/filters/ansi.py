@@ -3,13 +3,16 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import itertools
 import re
 import jinja2
 
 __all__ = [
     'strip_ansi',
     'ansi2html',
-    'ansi2latex'
+    'ansi2latex',
+    'iter_ansi2html',
+    'iter_ansi2latex',
 ]
 
 _ANSI_RE = re.compile('\x1b\\[(.*?)([@-~])')
@@ -74,6 +77,55 @@ def ansi2latex(text):
     return _ansi2anything(text, _latexconverter)
 
 
+def iter_ansi2html(text, chunk_size=65536):
+    """
+    Convert ANSI colors to HTML colors, in pieces of about `chunk_size`
+    characters, so that large outputs can be written out as they are
+    converted. The pieces join to ``ansi2html(text)``.
+
+    Parameters
+    ----------
+    text : unicode
+        Text containing ANSI colors to convert to HTML
+    chunk_size : int
+        The minimum length of each piece but the last
+
+    """
+    text = jinja2.utils.escape(text)
+    return _chunked(_iter_ansi(text, _htmlconverter), chunk_size)
+
+
+def iter_ansi2latex(text, chunk_size=65536):
+    """
+    Convert ANSI colors to LaTeX colors, in pieces of about `chunk_size`
+    characters, see :func:`iter_ansi2html`.
+
+    Parameters
+    ----------
+    text : unicode
+        Text containing ANSI colors to convert to LaTeX
+    chunk_size : int
+        The minimum length of each piece but the last
+
+    """
+    return _chunked(_iter_ansi(text, _latexconverter), chunk_size)
+
+
+def _chunked(pieces, size):
+    """Join consecutive `pieces` into strings of at least `size` characters"""
+    chunk = []
+    length = 0
+    for piece in pieces:
+        chunk.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield ''.join(chunk)
+            chunk = []
+            length = 0
+    if chunk:
+        yield ''.join(chunk)
+
+
 def _htmlconverter(fg, bg, bold):
     """
     Return start and end tags for given foreground/background/bold.
@@ -163,37 +215,56 @@ def _ansi2anything(text, converter):
     Ideally, this should have the same behavior as the function
     fixConsole() in notebook/notebook/static/base/js/utils.js.
 
+    """
+    return ''.join(_iter_ansi(text, converter))
+
+
+def _iter_ansi(text, converter):
+    """
+    Yield the converted pieces of `text`, see :func:`_ansi2anything`.
+
+    The text is walked once with `finditer`, so the time taken is linear
+    in its length, and the markup of each color state is computed once.
     """
     fg, bg = None, None
     bold = False
-    numbers = []
-    out = []
+    tags = {}
+    pos = 0
+    end = len(text)
 
-    while text:
-        m = _ANSI_RE.search(text)
-        if m:
-            if m.group(2) == 'm':
-                try:
-                    numbers = [int(n) if n else 0
-                               for n in m.group(1).split(';')]
-                except ValueError:
-                    pass  # Invalid color specification
-            else:
-                pass  # Not a color code
-            chunk, text = text[:m.start()], text[m.end():]
+    for m in itertools.chain(_ANSI_RE.finditer(text), (None,)):
+        if m is None:
+            chunk_end = end
         else:
-            chunk, text = text, ''
+            chunk_end = m.start()
 
-        if chunk:
+        if chunk_end > pos:
             if bold and fg in range(8):
                 fg += 8
-            starttag, endtag = converter(fg, bg, bold)
-            out.append(starttag)
-            out.append(chunk)
-            out.append(endtag)
-
-        while numbers:
-            n = numbers.pop(0)
+            state = (fg, bg, bold)
+            try:
+                starttag, endtag = tags[state]
+            except KeyError:
+                starttag, endtag = tags[state] = converter(fg, bg, bold)
+            yield starttag
+            yield text[pos:chunk_end]
+            yield endtag
+
+        if m is None:
+            break
+        pos = m.end()
+        if m.group(2) != 'm':
+            continue  # Not a color code
+        try:
+            numbers = [int(n) if n else 0
+                       for n in m.group(1).split(';')]
+        except ValueError:
+            continue  # Invalid color specification
+
+        i = 0
+        while i < len(numbers):
+            n = numbers[i]
+            i += 1
             if n == 0:
                 fg = bg = None
                 bold = False
@@ -205,18 +276,18 @@ def _ansi2anything(text, converter):
                 fg = n - 30
             elif n == 38:
                 try:
-                    fg = _get_extended_color(numbers)
+                    fg, i = _get_extended_color(numbers, i)
                 except ValueError:
-                    numbers.clear()
+                    break
             elif n == 39:
                 fg = None
             elif 40 <= n <= 47:
                 bg = n - 40
             elif n == 48:
                 try:
-                    bg = _get_extended_color(numbers)
+                    bg, i = _get_extended_color(numbers, i)
                 except ValueError:
-                    numbers.clear()
+                    break
             elif n == 49:
                 bg = None
             elif 90 <= n <= 97:
@@ -225,26 +296,29 @@ def _ansi2anything(text, converter):
                 bg = n - 100 + 8
             else:
                 pass  # Unknown codes are ignored
-    return ''.join(out)
 
 
-def _get_extended_color(numbers):
-    n = numbers.pop(0)
-    if n == 2 and len(numbers) >= 3:
+def _get_extended_color(numbers, i):
+    """Parse an extended color from numbers[i:], return it and the next index"""
+    if i >= len(numbers):
+        raise ValueError()
+    n = numbers[i]
+    i += 1
+    if n == 2 and len(numbers) - i >= 3:
         # 24-bit RGB
-        r = numbers.pop(0)
-        g = numbers.pop(0)
-        b = numbers.pop(0)
+        r, g, b = numbers[i:i + 3]
+        i += 3
         if not all(0 <= c <= 255 for c in (r, g, b)):
             raise ValueError()
-    elif n == 5 and len(numbers) >= 1:
+    elif n == 5 and len(numbers) - i >= 1:
         # 256 colors
-        idx = numbers.pop(0)
+        idx = numbers[i]
+        i += 1
         if idx < 0:
             raise ValueError()
         elif idx < 16:
             # 16 default terminal colors
-            return idx
+            return idx, i
         elif idx < 232:
             # 6x6x6 color cube, see http://stackoverflow.com/a/27165165/500098
             r = (idx - 16) // 36
@@ -260,4 +334,4 @@ def _get_extended_color(numbers):
             raise ValueError()
     else:
         raise ValueError()
-    return r, g, b
+    return (r, g, b), i
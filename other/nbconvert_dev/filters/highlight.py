@@ -10,6 +10,10 @@ from within Jinja templates.
 # because errors should be raised at runtime if it's actually needed,
 # not import time, when it may not be needed.
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 from nbconvert.utils.base import NbConvertBase
 from warnings import warn
 
@@ -22,6 +26,77 @@ __all__ = [
     'Highlight2Latex'
 ]
 
+
+class HighlightCache(object):
+    """
+    Lexers, formatters and highlighted sources shared by all highlight filters.
+
+    Exporters create new highlight filters for every notebook, so the cache
+    lives at module level: lexers are resolved once per language, formatters
+    are built once per configuration, and the last `maxsize` highlighted
+    sources are kept, keyed by a hash of the source, the language and the
+    formatter.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._lexers = {}
+        self._formatters = {}
+        self._formatter_keys = {}
+        self._results = OrderedDict()
+        self.hits = self.misses = 0
+
+    def lexer(self, language):
+        lexer = self._lexers.get(language)
+        if lexer is None:
+            lexer = self._lexers[language] = _get_lexer(language)
+        return lexer
+
+    def formatter(self, formatter_class, **options):
+        key = (formatter_class, tuple(sorted(options.items())))
+        formatter = self._formatters.get(key)
+        if formatter is None:
+            formatter = self._formatters[key] = formatter_class(**options)
+            # formatters stay referenced by the cache, so their ids are stable
+            self._formatter_keys[id(formatter)] = key
+        return formatter
+
+    def highlight(self, source, formatter, language):
+        from pygments import highlight
+
+        formatter_key = self._formatter_keys.get(id(formatter))
+        if formatter_key is None:
+            # a formatter we did not build; its options are unknown
+            return highlight(source, self.lexer(language), formatter)
+        key = (hashlib.sha1(source.encode('utf-8')).hexdigest(), language, formatter_key)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        result = highlight(source, self.lexer(language), formatter)
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._lexers.clear()
+            self._formatters.clear()
+            self._formatter_keys.clear()
+            self._results.clear()
+            self.hits = self.misses = 0
+
+
+#: The cache used by the highlight filters
+highlight_cache = HighlightCache()
+
+
 class Highlight2HTML(NbConvertBase):
     def __init__(self, pygments_lexer=None, **kwargs):
         self.pygments_lexer = pygments_lexer or 'ipython3'
@@ -53,7 +128,7 @@ class Highlight2HTML(NbConvertBase):
 
         return _pygments_highlight(source if len(source) > 0 else ' ',
                                    # needed to help post processors:
-                                   HtmlFormatter(cssclass=" highlight hl-"+language),
+                                   highlight_cache.formatter(HtmlFormatter, cssclass=" highlight hl-"+language),
                                    language, metadata)
 
 
@@ -87,7 +162,8 @@ class Highlight2Latex(NbConvertBase):
         if not language:
             language=self.pygments_lexer
 
-        latex = _pygments_highlight(source, LatexFormatter(), language, metadata)
+        latex = _pygments_highlight(source, highlight_cache.formatter(LatexFormatter),
+                                    language, metadata)
         if strip_verbatim:
             latex = latex.replace(r'\begin{Verbatim}[commandchars=\\\{\}]' + '\n', '')
             return latex.replace('\n\\end{Verbatim}\n', '')
@@ -110,10 +186,6 @@ def _pygments_highlight(source, output_formatter, language='ipython', metadata=N
     metadata : NotebookNode cell metadata
         metadata of the cell to highlight
     """
-    from pygments import highlight
-    from pygments.lexers import get_lexer_by_name
-    from pygments.util import ClassNotFound
-
     # If the cell uses a magic extension language,
     # use the magic language instead.
     if language.startswith('ipython') \
@@ -122,6 +194,14 @@ def _pygments_highlight(source, output_formatter, language='ipython', metadata=N
 
         language = metadata['magics_language']
 
+    return highlight_cache.highlight(source, output_formatter, language)
+
+
+def _get_lexer(language):
+    """Return a pygments lexer for `language`, falling back to plain text"""
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+
     lexer = None
     if language == 'ipython2':
         try:
@@ -148,5 +228,4 @@ def _pygments_highlight(source, output_formatter, language='ipython', metadata=N
             from pygments.lexers.special import TextLexer
             lexer = TextLexer()
 
-
-    return highlight(source, lexer, output_formatter)
+    return lexer
@@ -1,4 +1,4 @@
-from nbconvert.utils.pandoc import pandoc
+from ..utils.pandoc import pandoc
 
 
 def convert_pandoc(source, from_format, to_format, extra_args=None):
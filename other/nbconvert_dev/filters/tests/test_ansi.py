@@ -9,7 +9,7 @@ Module with tests for ansi filters
 from __future__ import unicode_literals
 
 from ...tests.base import TestsBase
-from ..ansi import strip_ansi, ansi2html, ansi2latex
+from ..ansi import strip_ansi, ansi2html, ansi2latex, iter_ansi2html, iter_ansi2latex
 
 
 class TestAnsi(TestsBase):
@@ -65,3 +65,29 @@ class TestAnsi(TestsBase):
 
         for inval, outval in correct_outputs.items():
             self.assertEqual(outval, ansi2latex(inval))
+
+    def test_incomplete_extended_color(self):
+        """Extended color codes without a color are ignored"""
+        self.assertEqual(ansi2html('\x1b[38mhello'), 'hello')
+        self.assertEqual(ansi2latex('\x1b[1;48mhello'), r'\textbf{hello}')
+
+    def test_large_output(self):
+        """Multi-megabyte colored logs convert like their lines do"""
+        line = '\x1b[1;32mepoch {0}\x1b[0m loss=\x1b[31m0.{0:04d}\x1b[0m acc=\x1b[38;5;208m<0.9>\x1b[0m\n'
+        lines = [line.format(i) for i in range(40000)]
+        log = ''.join(lines)
+        self.assertGreater(len(log), 2 * 1024 * 1024)
+        for convert in (ansi2html, ansi2latex):
+            # every line ends in a reset, so the lines convert independently
+            self.assertEqual(convert(log), ''.join(convert(l) for l in lines))
+
+    def test_streamed(self):
+        """Are large outputs converted in pieces that join to the whole?"""
+        line = '\x1b[1;32mepoch {0}\x1b[0m <loss>=\x1b[31m0.{0:04d}\x1b[0m\n'
+        log = ''.join(line.format(i) for i in range(2000))
+        for stream, convert in ((iter_ansi2html, ansi2html), (iter_ansi2latex, ansi2latex)):
+            pieces = list(stream(log, chunk_size=4096))
+            self.assertGreater(len(pieces), 1)
+            self.assertTrue(all(len(piece) >= 4096 for piece in pieces[:-1]))
+            self.assertEqual(''.join(pieces), convert(log))
+        self.assertEqual(list(iter_ansi2html('')), [])
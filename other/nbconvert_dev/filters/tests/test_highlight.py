@@ -15,8 +15,9 @@ Module with tests for Highlight
 #-----------------------------------------------------------------------------
 
 from ...tests.base import TestsBase
-from ..highlight import Highlight2HTML, Highlight2Latex
+from ..highlight import Highlight2HTML, Highlight2Latex, HighlightCache, highlight_cache
 from traitlets.config import Config
+from pygments.formatters import HtmlFormatter
 import xml
 
 #-----------------------------------------------------------------------------
@@ -88,3 +89,21 @@ class TestHighlight(TestsBase):
         results = method(test)
         for token in tokens:
             assert token in results
+
+    def test_cached(self):
+        """Are highlighted sources served from the cache?"""
+        highlight_cache.clear()
+        first = highlight2html(self.tests[0])
+        self.assertEqual(highlight_cache.misses, 1)
+        self.assertEqual(highlight2html(self.tests[0]), first)
+        self.assertEqual(highlight_cache.hits, 1)
+        # another language is another entry
+        self.assertNotEqual(highlight2html_ruby(self.tests[0]), first)
+        self.assertEqual(highlight_cache.misses, 2)
+
+    def test_cache_bounded(self):
+        cache = HighlightCache(maxsize=2)
+        formatter = cache.formatter(HtmlFormatter)
+        for source in ('a', 'b', 'c'):
+            cache.highlight(source, formatter, 'python')
+        self.assertEqual(len(cache._results), 2)
@@ -13,12 +13,14 @@ import logging
 import sys
 import os
 import glob
+import time
+import traceback
 
 from jupyter_core.application import JupyterApp, base_aliases, base_flags
 from traitlets.config import catch_config_error, Configurable
 from traitlets import (
-    Unicode, List, Instance, DottedObjectName, Type, Bool,
-    default, observe,
+    Unicode, List, Instance, DottedObjectName, Type, Bool, Integer,
+    default, observe, validate, TraitError,
 )
 
 from traitlets.utils.importstring import import_item
@@ -56,6 +58,7 @@ nbconvert_aliases.update({
     'output-dir': 'FilesWriter.build_directory',
     'reveal-prefix': 'SlidesExporter.reveal_url_prefix',
     'nbformat': 'NotebookExporter.nbformat_version',
+    'jobs': 'NbConvertApp.jobs',
 })
 
 nbconvert_flags = {}
@@ -262,6 +265,19 @@ class NbConvertApp(JupyterApp):
     ).tag(config=True)
     from_stdin = Bool(False, help="read a single notebook from stdin.").tag(config=True)
 
+    jobs = Integer(1, help="""Number of worker processes used to convert
+                   multiple notebooks. 0 uses one worker per CPU.
+                   Parallel conversion is not used when reading from stdin,
+                   writing to stdout or with a postprocessor.
+                   """
+    ).tag(config=True)
+
+    @validate('jobs')
+    def _validate_jobs(self, proposal):
+        if proposal['value'] < 0:
+            raise TraitError("jobs must be 0 (one per CPU) or a positive number")
+        return proposal['value']
+
     @catch_config_error
     def initialize(self, argv=None):
         """Initialize application, notebooks, writer, and postprocessor"""
@@ -488,14 +504,98 @@ class NbConvertApp(JupyterApp):
             sys.exit(-1)
 
         # convert each notebook
-        if not self.from_stdin:
+        if not self.from_stdin and self._use_parallel_conversion():
+            self.convert_notebooks_parallel()
+        elif not self.from_stdin:
             for notebook_filename in self.notebooks:
                 self.convert_single_notebook(notebook_filename)
         else:
             input_buffer = unicode_stdin_stream()
             # default name when conversion from stdin
             self.convert_single_notebook("notebook.ipynb", input_buffer=input_buffer)
-            
+
+    def _use_parallel_conversion(self):
+        """Whether the notebooks can be converted by worker processes"""
+        if self.jobs == 1 or len(self.notebooks) < 2:
+            return False
+        if self.postprocessor is not None:
+            # postprocessors like `serve` block, and expect to run once per notebook in order
+            return False
+        # output written to stdout by several workers would interleave
+        return not isinstance(self.writer, writers.StdoutWriter)
+
+    def convert_notebooks_parallel(self):
+        """Convert ``self.notebooks`` with a pool of worker processes
+
+        Every worker builds its own exporter, writer and postprocessor once,
+        from this application's config. Results are logged in the order of
+        ``self.notebooks`` together with the time each conversion took.
+        A notebook that fails to convert is logged and does not stop the
+        others; the application exits with status 1 once all are done.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        jobs = min(self.jobs or os.cpu_count() or 1, len(self.notebooks))
+        self.log.info("Converting %d notebooks to %s with %d workers",
+                      len(self.notebooks), self.export_format, jobs)
+        start = time.time()
+        failed = []
+        with ProcessPoolExecutor(
+                max_workers=jobs,
+                initializer=_init_conversion_worker,
+                initargs=(type(self), self.config, self.export_format)) as pool:
+            for notebook_filename, seconds, error in pool.map(_convert_in_worker, self.notebooks):
+                if error is None:
+                    self.log.info("Converted notebook %s to %s in %.2fs",
+                                  notebook_filename, self.export_format, seconds)
+                else:
+                    failed.append(notebook_filename)
+                    self.log.error("Error while converting '%s' after %.2fs\n%s",
+                                   notebook_filename, seconds, error)
+        self.log.info("Converted %d of %d notebooks in %.2fs",
+                      len(self.notebooks) - len(failed), len(self.notebooks), time.time() - start)
+        if failed:
+            self.log.error("Failed to convert: %s", ", ".join(failed))
+            self.exit(1)
+
+
+#-----------------------------------------------------------------------------
+# Parallel conversion workers
+#-----------------------------------------------------------------------------
+
+# The application each worker process converts its notebooks with.
+_worker_app = None
+
+def _init_conversion_worker(app_class, config, export_format):
+    """Set up a worker once, so each notebook reuses its exporter
+
+    Building the exporter loads the template environment, filters and
+    preprocessors; that is done once per worker rather than per notebook.
+    """
+    global _worker_app
+    app = app_class(config=config)
+    # The parent logs progress in notebook order; workers only log problems.
+    app.log_level = logging.WARN
+    app.export_format = export_format
+    app.init_writer()
+    app.init_postprocessor()
+    app.exporter = get_exporter(export_format)(config=config)
+    _worker_app = app
+
+def _convert_in_worker(notebook_filename):
+    """Convert one notebook in a worker
+
+    Returns ``(notebook_filename, seconds, traceback)``; the traceback is
+    None on success. Failures, including the ``exit`` of a failed export,
+    are caught so the rest of the batch still runs.
+    """
+    start = time.time()
+    try:
+        _worker_app.convert_single_notebook(notebook_filename)
+    except (Exception, SystemExit):
+        return notebook_filename, time.time() - start, traceback.format_exc()
+    return notebook_filename, time.time() - start, None
+
 #-----------------------------------------------------------------------------
 # Main entry point
 #-----------------------------------------------------------------------------
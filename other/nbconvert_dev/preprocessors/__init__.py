@@ -9,6 +9,7 @@ from .csshtmlheader import CSSHTMLHeaderPreprocessor
 from .highlightmagics import HighlightMagicsPreprocessor
 from .clearoutput import ClearOutputPreprocessor
 from .execute import ExecutePreprocessor, CellExecutionError
+from .kernelpool import KernelPool
 from .regexremove import RegexRemovePreprocessor
 from .tagremove import TagRemovePreprocessor
 
@@ -0,0 +1,249 @@
+"""Module containing an asyncio based preprocessor that executes the code
+cells of many notebooks concurrently in one event loop"""
+
+# Copyright (c) IPython Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+
+from traitlets import default, validate, TraitError
+
+from nbformat import from_dict
+from .execute import ExecutePreprocessor, CellExecutionError
+
+
+class MessagePump(object):
+    """
+    Reads the shell and IOPub channels of one kernel client and routes
+    each message to the execution it belongs to, by parent msg_id.
+
+    Replies resolve a future per execution; IOPub messages are queued per
+    execution. Messages for executions nobody waits for are dropped.
+    """
+
+    def __init__(self, kc, log):
+        self.kc = kc
+        self.log = log
+        self._replies = {}
+        self._outputs = {}
+        self._tasks = []
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._pump(self.kc.get_shell_msg, self._on_shell_msg)),
+            loop.create_task(self._pump(self.kc.get_iopub_msg, self._on_iopub_msg)),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def execute(self, code, **kwargs):
+        """Send an execute request; return its msg_id, reply future and IOPub queue"""
+        msg_id = self.kc.execute(code, **kwargs)
+        # Nothing is read before the next await, so no message can be missed.
+        reply = self._replies[msg_id] = asyncio.get_running_loop().create_future()
+        outputs = self._outputs[msg_id] = asyncio.Queue()
+        return msg_id, reply, outputs
+
+    def forget(self, msg_id):
+        self._replies.pop(msg_id, None)
+        self._outputs.pop(msg_id, None)
+
+    async def _pump(self, get_msg, dispatch):
+        try:
+            while True:
+                dispatch(await get_msg(timeout=None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The channel is gone; nothing waiting on this kernel will get an answer.
+            for future in self._replies.values():
+                if not future.done():
+                    future.set_exception(e)
+            raise
+
+    def _on_shell_msg(self, msg):
+        future = self._replies.get(msg['parent_header'].get('msg_id'))
+        if future is not None and not future.done():
+            future.set_result(msg)
+
+    def _on_iopub_msg(self, msg):
+        queue = self._outputs.get(msg['parent_header'].get('msg_id'))
+        if queue is not None:
+            queue.put_nowait(msg)
+
+
+class AsyncExecutePreprocessor(ExecutePreprocessor):
+    """
+    Executes all the cells in a notebook with an asyncio kernel client.
+
+    Shell replies and IOPub output are read by a :class:`MessagePump`
+    instead of blocking polls, so many notebooks, each with their own
+    preprocessor and kernel, can execute concurrently in one event loop
+    (see :func:`execute_notebooks_async`). Timeouts, interrupts, the
+    execution cache and display_id updates behave as in
+    `ExecutePreprocessor`.
+    """
+
+    @default('kernel_manager_class')
+    def _km_default(self):
+        try:
+            from jupyter_client import AsyncKernelManager
+        except ImportError:
+            raise ImportError("`AsyncExecutePreprocessor` requires jupyter_client 6.1 or later: "
+                              "`pip install -U jupyter_client`")
+        return AsyncKernelManager
+
+    @validate('kernel_pool')
+    def _validate_kernel_pool(self, proposal):
+        if proposal['value'] is not None:
+            # pooled kernels are blocking clients, checked out by threads
+            raise TraitError("AsyncExecutePreprocessor starts a kernel per notebook and does not "
+                             "take kernels from a kernel_pool; bound the number of kernels with "
+                             "execute_notebooks_async(max_concurrency=...) instead")
+        return proposal['value']
+
+    def preprocess(self, nb, resources):
+        """Execute `nb`, running an event loop until it is done. See :meth:`async_preprocess`."""
+        return asyncio.run(self.async_preprocess(nb, resources))
+
+    async def async_preprocess(self, nb, resources):
+        """
+        Preprocess notebook executing each code cell.
+
+        The input argument `nb` is modified in-place.
+        See `ExecutePreprocessor.preprocess` for the parameters.
+        """
+        path = resources.get('metadata', {}).get('path', '') or None
+        self._display_id_map = {}
+
+        kernel_name = nb.metadata.get('kernelspec', {}).get('name', 'python')
+        if self.kernel_name:
+            kernel_name = self.kernel_name
+
+        self._cached_cells = {}
+        self._cache_keys = {}
+        if self.execution_cache is not None and self._load_cached_outputs(nb, kernel_name):
+            self.log.info("Using cached outputs for all cells")
+            return nb, resources
+
+        self.log.info("Executing notebook with kernel: %s" % kernel_name)
+        self.km = self.kernel_manager_class(kernel_name=kernel_name)
+        await self.km.start_kernel(extra_arguments=self.extra_arguments, cwd=path)
+        self.kc = self.km.client()
+        self.kc.start_channels()
+        self.pump = MessagePump(self.kc, self.log)
+        try:
+            await self.kc.wait_for_ready(timeout=self.startup_timeout)
+            self.kc.allow_stdin = False
+            self.pump.start()
+            self.nb = nb
+            for index, cell in enumerate(nb.cells):
+                nb.cells[index], resources = await self.async_preprocess_cell(cell, resources, index)
+        finally:
+            await self.pump.stop()
+            self.kc.stop_channels()
+            await self.km.shutdown_kernel(now=self.shutdown_kernel == 'immediate')
+            if hasattr(self, 'nb'):
+                delattr(self, 'nb')
+
+        return nb, resources
+
+    async def async_preprocess_cell(self, cell, resources, cell_index):
+        """Executes a single code cell. See `ExecutePreprocessor.preprocess_cell`."""
+        if cell.cell_type != 'code':
+            return cell, resources
+
+        cached = self._cached_cells.get(cell_index)
+        if cached is not None:
+            if self.replay_cached_cells:
+                reply, _ = await self.async_run_cell(cell, cell_index, collect_outputs=False)
+                if reply is not None and reply['content']['status'] == 'error':
+                    raise CellExecutionError.from_cell_and_msg(cell, reply['content'])
+            cell.outputs = [from_dict(out) for out in cached['outputs']]
+            cell.execution_count = cached['execution_count']
+            return cell, resources
+
+        reply, outputs = await self.async_run_cell(cell, cell_index)
+        return self._finish_cell(cell, resources, cell_index, reply, outputs)
+
+    async def _async_wait_for_reply(self, reply, cell):
+        timeout = self._cell_timeout(cell)
+        try:
+            return await asyncio.wait_for(asyncio.shield(reply), timeout)
+        except asyncio.TimeoutError:
+            self.log.error(
+                "Timeout waiting for execute reply (%is)." % self.timeout)
+            if self.interrupt_on_timeout:
+                self.log.error("Interrupting kernel")
+                await self.km.interrupt_kernel()
+                return None
+            raise TimeoutError("Cell execution timed out")
+
+    async def async_run_cell(self, cell, cell_index=0, collect_outputs=True):
+        msg_id, reply, messages = self.pump.execute(cell.source)
+        self.log.debug("Executing cell:\n%s", cell.source)
+        try:
+            exec_reply = await self._async_wait_for_reply(reply, cell)
+
+            outs = []
+            if collect_outputs:
+                cell.outputs = outs
+            while True:
+                try:
+                    msg = await asyncio.wait_for(messages.get(), self.iopub_timeout)
+                except asyncio.TimeoutError:
+                    self.log.warn("Timeout waiting for IOPub output")
+                    if self.raise_on_iopub_timeout:
+                        raise RuntimeError("Timeout waiting for IOPub output")
+                    break
+                if not collect_outputs:
+                    if msg['msg_type'] == 'status' and msg['content']['execution_state'] == 'idle':
+                        break
+                    continue
+                if self.process_iopub_msg(msg, cell, cell_index, outs):
+                    break
+        finally:
+            self.pump.forget(msg_id)
+
+        return exec_reply, outs
+
+
+async def execute_notebooks_async(nbs, cwd=None, max_concurrency=8, **kwargs):
+    """Execute several notebooks concurrently in the running event loop.
+
+    Each notebook gets its own AsyncExecutePreprocessor and kernel; at most
+    `max_concurrency` kernels run at the same time. Returns the executed
+    notebooks in the order of `nbs`. The first error is re-raised once all
+    notebooks are done.
+
+    Parameters
+    ----------
+    nbs : list of NotebookNode
+      The notebook objects to be executed
+    cwd : str, optional
+      If supplied, the kernels will run in this directory
+    max_concurrency : int
+      The number of notebooks executing at the same time
+    kwargs :
+      Any other options for AsyncExecutePreprocessor, e.g. timeout, kernel_name
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def execute(nb):
+        resources = {}
+        if cwd is not None:
+            resources['metadata'] = {'path': cwd}
+        async with semaphore:
+            ep = AsyncExecutePreprocessor(**kwargs)
+            return (await ep.async_preprocess(nb, resources))[0]
+
+    results = await asyncio.gather(*(execute(nb) for nb in nbs), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
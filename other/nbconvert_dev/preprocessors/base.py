@@ -3,6 +3,8 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import time
+
 from ..utils.base import NbConvertBase
 from traitlets import Bool
 
@@ -88,3 +90,102 @@ class Preprocessor(NbConvertBase):
         raise NotImplementedError('should be implemented by subclass')
         return cell, resources
 
+
+
+def _cell_function(preprocessor):
+    """The per-cell function of `preprocessor`, or None if it needs the whole notebook"""
+    function = getattr(preprocessor, 'cell_function', None)
+    if function is not None:
+        # a function wrapped by coalescestreams.cell_preprocessor
+        return function
+    cls = type(preprocessor)
+    if (isinstance(preprocessor, Preprocessor)
+            and cls.__call__ is Preprocessor.__call__
+            and cls.preprocess is Preprocessor.preprocess):
+        return preprocessor.preprocess_cell
+    return None
+
+
+class CellPipeline(object):
+    """
+    Several cell-local preprocessors fused into one pass over the cells.
+
+    Each cell goes through all the preprocessors in order before the next
+    cell is processed, so the notebook is walked once instead of once per
+    preprocessor.
+    """
+
+    def __init__(self, preprocessors):
+        self.preprocessors = list(preprocessors)
+        self._functions = [_cell_function(p) for p in self.preprocessors]
+
+    @property
+    def name(self):
+        return '+'.join(_stage_name(p) for p in self.preprocessors)
+
+    def __call__(self, nb, resources):
+        functions = self._functions
+        for index, cell in enumerate(nb.cells):
+            for function in functions:
+                cell, resources = function(cell, resources, index)
+            nb.cells[index] = cell
+        return nb, resources
+
+
+def _stage_name(stage):
+    return getattr(stage, 'name', None) or getattr(stage, '__name__', None) \
+        or stage.__class__.__name__
+
+
+def compile_pipeline(preprocessors):
+    """Plan the stages that apply `preprocessors` to a notebook.
+
+    Disabled preprocessors are dropped. Runs of consecutive cell-local
+    preprocessors, the ones that only implement `preprocess_cell`, are
+    fused into a :class:`CellPipeline`. Preprocessors that look at the
+    whole notebook, by overriding `preprocess` or `__call__`, stay
+    separate stages and act as barriers between fused runs.
+
+    Returns a list of ``(name, stage)`` pairs; every stage is called
+    like a preprocessor, with the notebook and resources.
+    """
+    stages = []
+    run = []
+
+    def flush():
+        if len(run) == 1:
+            stages.append((_stage_name(run[0]), run[0]))
+        elif run:
+            pipeline = CellPipeline(run)
+            stages.append((pipeline.name, pipeline))
+        del run[:]
+
+    for preprocessor in preprocessors:
+        if not getattr(preprocessor, 'enabled', True):
+            continue
+        if _cell_function(preprocessor) is not None:
+            run.append(preprocessor)
+        else:
+            flush()
+            stages.append((_stage_name(preprocessor), preprocessor))
+    flush()
+    return stages
+
+
+def run_pipeline(stages, nb, resources, validate=None, log=None):
+    """Apply the stages of :func:`compile_pipeline` to a notebook
+
+    Calls ``validate(nb, name)`` after each stage. Returns the notebook,
+    the resources and a list of ``(name, seconds)`` timings per stage.
+    """
+    timings = []
+    for name, stage in stages:
+        started = time.time()
+        nb, resources = stage(nb, resources)
+        elapsed = time.time() - started
+        timings.append((name, elapsed))
+        if log is not None:
+            log.debug("Preprocessor stage %s took %.3fs", name, elapsed)
+        if validate is not None:
+            validate(nb, name)
+    return nb, resources, timings
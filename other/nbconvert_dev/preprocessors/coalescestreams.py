@@ -29,6 +29,8 @@ def cell_preprocessor(function):
         for index, cell in enumerate(nb.cells):
             nb.cells[index], resources = function(cell, resources, index)
         return nb, resources
+    # lets exporters fuse this with other per-cell preprocessors
+    wrappedfunc.cell_function = function
     return wrappedfunc
 
 cr_pat = re.compile(r'.*\r(?=[^\n])')
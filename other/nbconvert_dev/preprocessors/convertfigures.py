@@ -4,10 +4,11 @@ one format to another.
 
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
-
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 from .base import Preprocessor
-from traitlets import Unicode
+from traitlets import Integer, Unicode
 
 
 class ConvertFiguresPreprocessor(Preprocessor):
@@ -18,6 +19,11 @@ class ConvertFiguresPreprocessor(Preprocessor):
     from_format = Unicode(help='Format the converter accepts').tag(config=True)
     to_format = Unicode(help='Format the converter writes').tag(config=True)
 
+    max_workers = Integer(0,
+        help="""The number of figures converted at the same time.
+        0 uses one worker per CPU, 1 converts the figures one by one."""
+    ).tag(config=True)
+
     def __init__(self, **kw):
         """
         Public constructor
@@ -29,20 +35,58 @@ class ConvertFiguresPreprocessor(Preprocessor):
         raise NotImplementedError()
 
 
-    def preprocess_cell(self, cell, resources, cell_index):
+    def convert_figures(self, data_format, figures):
         """
-        Apply a transformation on each cell,
-        
-        See base.py
+        Convert several figures, returning the converted data in order.
+
+        The default calls :meth:`convert_figure` for each figure, from a
+        pool of `max_workers` threads. Subclasses whose converter accepts
+        many inputs at once can override this to batch them.
         """
+        workers = min(self.max_workers or os.cpu_count() or 1, len(figures))
+        if workers <= 1:
+            return [self.convert_figure(data_format, data) for data in figures]
+        with ThreadPoolExecutor(workers) as pool:
+            return list(pool.map(lambda data: self.convert_figure(data_format, data), figures))
 
-        # Loop through all of the datatypes of the outputs in the cell.
+
+    def _pending_outputs(self, cell):
         for output in cell.get('outputs', []):
             if output.output_type in {'execute_result', 'display_data'} \
                     and self.from_format in output.data \
                     and self.to_format not in output.data:
+                yield output
+
+
+    def preprocess(self, nb, resources):
+        """
+        Convert the figures of all cells with one call to :meth:`convert_figures`.
 
-                output.data[self.to_format] = self.convert_figure(
-                            self.from_format, output.data[self.from_format])
+        Identical figures are converted once.
+        """
+        pending = {}
+        for cell in nb.cells:
+            for output in self._pending_outputs(cell):
+                pending.setdefault(output.data[self.from_format], []).append(output)
+        if pending:
+            figures = list(pending)
+            converted = self.convert_figures(self.from_format, figures)
+            for data, result in zip(figures, converted):
+                for output in pending[data]:
+                    output.data[self.to_format] = result
+        return nb, resources
+
+
+    def preprocess_cell(self, cell, resources, cell_index):
+        """
+        Apply a transformation on each cell,
+        
+        See base.py
+        """
+
+        # Loop through all of the datatypes of the outputs in the cell.
+        for output in self._pending_outputs(cell):
+            output.data[self.to_format] = self.convert_figure(
+                        self.from_format, output.data[self.from_format])
 
         return cell, resources
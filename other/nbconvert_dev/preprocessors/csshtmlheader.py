@@ -6,8 +6,10 @@
 
 import os
 import io
+import json
 import hashlib
-from . import resources
+import threading
+from .. import resources as nbconvert_resources
 from traitlets import Unicode
 from ipython_genutils.py3compat import str_to_bytes
 from .base import Preprocessor
@@ -19,6 +21,13 @@ except ImportError:
     DEFAULT_STATIC_FILES_PATH = None
 
 
+# Headers by (stylesheet, mtime, pygments style, highlight class, custom.css hash),
+# and file hashes by (path, mtime, size); shared by all preprocessor instances.
+_header_cache = {}
+_hash_cache = {}
+_cache_lock = threading.Lock()
+
+
 class CSSHTMLHeaderPreprocessor(Preprocessor):
     """
     Preprocessor used to pre-process notebook for HTML output.  Adds IPython notebook
@@ -28,6 +37,24 @@ class CSSHTMLHeaderPreprocessor(Preprocessor):
                               help="CSS highlight class identifier"
     ).tag(config=True)
 
+    style = Unicode('default',
+                    help="Name of the pygments style to use"
+    ).tag(config=True)
+
+    css_filename = Unicode('',
+        help="""Write the CSS to this file, relative to the output directory,
+        and link it from the page instead of inlining it. `{hash}` is replaced
+        by a hash of the CSS, so pages converted with different CSS do not
+        share a file, and an existing file is not written again.
+        The default inlines the CSS into every page."""
+    ).tag(config=True)
+
+    cache_dir = Unicode('',
+        help="""Directory to keep generated headers in, so other processes
+        (e.g. parallel conversions) reuse them. Headers are always cached
+        in memory."""
+    ).tag(config=True)
+
     def __init__(self, *pargs, **kwargs):
         Preprocessor.__init__(self, *pargs, **kwargs)
         self._default_css_hash = None
@@ -48,9 +75,74 @@ class CSSHTMLHeaderPreprocessor(Preprocessor):
             preprocessors to pass variables into the Jinja engine.
         """
         resources['inlining'] = {}
-        resources['inlining']['css'] = self._generate_header(resources)
+        header = self._cached_header(resources)
+        if not self.css_filename:
+            resources['inlining']['css'] = header
+            return nb, resources
+
+        css = u'\n'.join(header).encode('utf-8')
+        digest = hashlib.sha256(css).hexdigest()
+        filename = self.css_filename.format(hash=digest[:16])
+        if not isinstance(resources['outputs'], dict):
+            resources['outputs'] = {}
+        resources['outputs'][filename] = css
+        if '{hash' in self.css_filename:
+            resources.setdefault('output_digests', {})[filename] = digest
+        resources['inlining']['css'] = []
+        resources['inlining']['css_files'] = [filename]
         return nb, resources
 
+    def _cached_header(self, resources):
+        """The header of :meth:`_generate_header`, generated once per set of inputs"""
+        sheet_filename = self._sheet_filename()
+        custom_css_filename = os.path.join(resources['config_dir'], 'custom', 'custom.css')
+        key = (
+            sheet_filename, os.path.getmtime(sheet_filename),
+            self.style, self.highlight_class,
+            self._file_hash(custom_css_filename).hex()
+            if os.path.isfile(custom_css_filename) else None,
+        )
+        with _cache_lock:
+            header = _header_cache.get(key)
+        if header is not None:
+            return list(header)
+
+        path = None
+        if self.cache_dir:
+            name = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+            path = os.path.join(self.cache_dir, 'cssheader-%s.json' % name)
+            try:
+                with io.open(path, encoding='utf-8') as f:
+                    header = json.load(f)
+            except (IOError, OSError, ValueError):
+                header = None
+
+        if header is None:
+            header = self._generate_header(resources)
+            if path is not None:
+                self._save_header(path, header)
+        with _cache_lock:
+            _header_cache[key] = header
+        return list(header)
+
+    def _save_header(self, path, header):
+        tmp = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            with io.open(tmp, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(header))
+            os.replace(tmp, path)
+        except OSError:
+            self.log.warning("Could not cache the CSS header in %s", self.cache_dir, exc_info=True)
+
+    def _sheet_filename(self):
+        # Construct path to Jupyter CSS
+        return os.path.join(
+            os.path.dirname(nbconvert_resources.__file__),
+            'style.min.css',
+        )
+
     def _generate_header(self, resources):
         """ 
         Fills self.header with lines of CSS extracted from IPython 
@@ -59,18 +151,12 @@ class CSSHTMLHeaderPreprocessor(Preprocessor):
         from pygments.formatters import HtmlFormatter
         header = []
         
-        # Construct path to Jupyter CSS
-        sheet_filename = os.path.join(
-            os.path.dirname(nbconvert.resources.__file__),
-            'style.min.css',
-        )
-        
         # Load style CSS file.
-        with io.open(sheet_filename, encoding='utf-8') as f:
+        with io.open(self._sheet_filename(), encoding='utf-8') as f:
             header.append(f.read())
 
         # Add pygments CSS
-        formatter = HtmlFormatter()
+        formatter = HtmlFormatter(style=self.style)
         pygments_css = formatter.get_style_defs(self.highlight_class)
         header.append(pygments_css)
 
@@ -122,12 +208,24 @@ class CSSHTMLHeaderPreprocessor(Preprocessor):
         custom_css_filename = os.path.join(config_dir, 'custom', 'custom.css')
         if os.path.isfile(custom_css_filename):
             if DEFAULT_STATIC_FILES_PATH and self._default_css_hash is None:
-                self._default_css_hash = self._hash(os.path.join(DEFAULT_STATIC_FILES_PATH, 'custom', 'custom.css'))
-            if self._hash(custom_css_filename) != self._default_css_hash:
+                self._default_css_hash = self._file_hash(os.path.join(DEFAULT_STATIC_FILES_PATH, 'custom', 'custom.css'))
+            if self._file_hash(custom_css_filename) != self._default_css_hash:
                 with io.open(custom_css_filename, encoding='utf-8') as f:
                     header.append(f.read())
         return header
 
+    def _file_hash(self, filename):
+        """:meth:`_hash` of a file, computed again only when the file changes"""
+        st = os.stat(filename)
+        key = (filename, st.st_mtime, st.st_size)
+        with _cache_lock:
+            digest = _hash_cache.get(key)
+        if digest is None:
+            digest = self._hash(filename)
+            with _cache_lock:
+                _hash_cache[key] = digest
+        return digest
+
     def _hash(self, filename):
         """Compute the hash of a file."""
         md5 = hashlib.md5()
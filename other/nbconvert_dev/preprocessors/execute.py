@@ -11,10 +11,13 @@ try:
 except ImportError:
     from Queue import Empty  # Py 2
 
-from traitlets import List, Unicode, Bool, Enum, Any, Type, Dict, default
+from traitlets import List, Unicode, Bool, Enum, Any, Type, Dict, Instance, default
 
+from nbformat import from_dict
 from nbformat.v4 import output_from_msg
 from .base import Preprocessor
+from .executecache import ExecutionCache
+from .kernelpool import KernelPool
 from ..utils.exceptions import ConversionException
 from traitlets import Integer
 
@@ -191,6 +194,51 @@ class ExecutePreprocessor(Preprocessor):
             raise ImportError("`nbconvert --execute` requires the jupyter_client package: `pip install jupyter_client`")
         return KernelManager
 
+    kernel_pool = Instance(KernelPool, allow_none=True,
+        help=dedent(
+            """
+            A `KernelPool` to take the kernel from instead of starting a new
+            one. The kernel is returned to the pool afterwards, and recycled
+            if executing the notebook raised an error.
+            """
+        )
+    )
+
+    execution_cache = Instance(ExecutionCache, allow_none=True,
+        help=dedent(
+            """
+            An `ExecutionCache` of cell outputs. When every code cell of a
+            notebook is cached, the outputs are served without starting a
+            kernel. Otherwise execution starts at the first cell that is not
+            cached, see `replay_cached_cells`.
+            """
+        )
+    )
+
+    cache_fingerprint = Unicode('',
+        help=dedent(
+            """
+            A fingerprint of everything the notebook depends on besides its
+            cells (input data, installed packages, ...). It is part of the
+            execution cache keys, so changing it invalidates cached outputs.
+            A notebook can add to it with the `execution_cache.fingerprint`
+            key of its metadata.
+            """
+        )
+    ).tag(config=True)
+
+    replay_cached_cells = Bool(True,
+        help=dedent(
+            """
+            If `True` (default), cached cells before the first changed cell
+            are still run in the kernel to rebuild its state, and only their
+            outputs are taken from the cache. If `False`, execution starts at
+            the first changed cell in a fresh kernel, which is only correct
+            when later cells do not depend on the state of earlier ones.
+            """
+        )
+    ).tag(config=True)
+
     # mapping of locations of outputs with a given display_id
     # tracks cell index and output index within cell.outputs for
     # each appearance of the display_id
@@ -249,7 +297,17 @@ class ExecutePreprocessor(Preprocessor):
         kernel_name = nb.metadata.get('kernelspec', {}).get('name', 'python')
         if self.kernel_name:
             kernel_name = self.kernel_name
+
+        self._cached_cells = {}
+        self._cache_keys = {}
+        if self.execution_cache is not None and self._load_cached_outputs(nb, kernel_name):
+            self.log.info("Using cached outputs for all cells")
+            return nb, resources
+
         self.log.info("Executing notebook with kernel: %s" % kernel_name)
+        if self.kernel_pool is not None:
+            return self._preprocess_with_pooled_kernel(nb, resources, kernel_name, path)
+
         self.km, self.kc = start_new_kernel(
             startup_timeout=self.startup_timeout,
             kernel_name=kernel_name,
@@ -268,6 +326,60 @@ class ExecutePreprocessor(Preprocessor):
 
         return nb, resources
 
+    def _preprocess_with_pooled_kernel(self, nb, resources, kernel_name, path):
+        """Execute `nb` with a kernel checked out from `self.kernel_pool`"""
+        kernel = self.kernel_pool.acquire(
+            self.kernel_manager_class, kernel_name, cwd=path,
+            extra_arguments=self.extra_arguments,
+            startup_timeout=self.startup_timeout)
+        self.km, self.kc = kernel.km, kernel.kc
+        self.nb = nb
+
+        healthy = False
+        try:
+            nb, resources = super(ExecutePreprocessor, self).preprocess(nb, resources)
+            healthy = True
+        finally:
+            self.kernel_pool.release(kernel, healthy=healthy)
+            del self.km, self.kc
+
+        delattr(self, 'nb')
+
+        return nb, resources
+
+    def _load_cached_outputs(self, nb, kernel_name):
+        """Look up the cached outputs of the code cells of `nb`
+
+        Cells of the longest cached prefix go to `self._cached_cells`;
+        the keys of the others to `self._cache_keys`. Returns True when
+        every code cell was cached, after filling in their outputs.
+        """
+        fingerprint = u'{}\0{}'.format(
+            self.cache_fingerprint,
+            nb.metadata.get('execution_cache', {}).get('fingerprint', ''))
+        keys = self.execution_cache.key_chain(nb, kernel_name, fingerprint)
+        for position, (cell_index, key) in enumerate(keys):
+            entry = self.execution_cache.get(key)
+            if entry is None:
+                self._cache_keys = dict(keys[position:])
+                self.log.info("Executing from cell %d, %d cached cells before it",
+                              cell_index, position)
+                return False
+            self._cached_cells[cell_index] = entry
+
+        for cell_index, entry in self._cached_cells.items():
+            cell = nb.cells[cell_index]
+            cell.outputs = [from_dict(out) for out in entry['outputs']]
+            cell.execution_count = entry['execution_count']
+        return True
+
+    def _replay_cell(self, cell):
+        """Run a cached cell to rebuild kernel state, discarding its output"""
+        msg_id = self.kc.execute(cell.source)
+        reply = self._wait_for_reply(msg_id, cell)
+        if reply is not None and reply['content']['status'] == 'error':
+            raise CellExecutionError.from_cell_and_msg(cell, reply['content'])
+
     def preprocess_cell(self, cell, resources, cell_index):
         """
         Executes a single code cell. See base.py for details.
@@ -277,9 +389,25 @@ class ExecutePreprocessor(Preprocessor):
         if cell.cell_type != 'code':
             return cell, resources
 
+        cached = getattr(self, '_cached_cells', {}).get(cell_index)
+        if cached is not None:
+            if self.replay_cached_cells:
+                self._replay_cell(cell)
+            cell.outputs = [from_dict(out) for out in cached['outputs']]
+            cell.execution_count = cached['execution_count']
+            return cell, resources
+
         reply, outputs = self.run_cell(cell, cell_index)
+        return self._finish_cell(cell, resources, cell_index, reply, outputs)
+
+    def _finish_cell(self, cell, resources, cell_index, reply, outputs):
+        """Store the outputs of an executed cell, and raise on its errors"""
         cell.outputs = outputs
 
+        key = getattr(self, '_cache_keys', {}).get(cell_index)
+        if key is not None and reply is not None and reply['content']['status'] == 'ok':
+            self.execution_cache.put(key, cell)
+
         if not self.allow_errors:
             for out in outputs:
                 if out.output_type == 'error':
@@ -310,18 +438,22 @@ class ExecutePreprocessor(Preprocessor):
                 outputs[output_idx]['data'] = out['data']
                 outputs[output_idx]['metadata'] = out['metadata']
 
+    def _cell_timeout(self, cell):
+        """The time to wait for the reply to `cell`, None to wait forever"""
+        if self.timeout_func is not None:
+            timeout = self.timeout_func(cell)
+        else:
+            timeout = self.timeout
+
+        if not timeout or timeout < 0:
+            timeout = None
+        return timeout
+
     def _wait_for_reply(self, msg_id, cell):
         # wait for finish, with timeout
         while True:
             try:
-                if self.timeout_func is not None:
-                    timeout = self.timeout_func(cell)
-                else:
-                    timeout = self.timeout
-
-                if not timeout or timeout < 0:
-                    timeout = None
-                msg = self.kc.shell_channel.get_msg(timeout=timeout)
+                msg = self.kc.shell_channel.get_msg(timeout=self._cell_timeout(cell))
             except Empty:
                 self.log.error(
                     "Timeout waiting for execute reply (%is)." % self.timeout)
@@ -342,6 +474,58 @@ class ExecutePreprocessor(Preprocessor):
                 # not our reply
                 continue
 
+    def process_iopub_msg(self, msg, cell, cell_index, outs):
+        """Apply an IOPub message of the execution of `cell` to `outs`
+
+        Returns True once the kernel reports it is idle again, that is when
+        all the output of the execution has been received.
+        """
+        msg_type = msg['msg_type']
+        self.log.debug("output: %s", msg_type)
+        content = msg['content']
+
+        # set the prompt number for the input and the output
+        if 'execution_count' in content:
+            cell['execution_count'] = content['execution_count']
+
+        if msg_type == 'status':
+            return content['execution_state'] == 'idle'
+        elif msg_type == 'execute_input':
+            return False
+        elif msg_type == 'clear_output':
+            outs[:] = []
+            # clear display_id mapping for this cell
+            for display_id, cell_map in self._display_id_map.items():
+                if cell_index in cell_map:
+                    cell_map[cell_index] = []
+            return False
+        elif msg_type.startswith('comm'):
+            return False
+        
+        display_id = None
+        if msg_type in {'execute_result', 'display_data', 'update_display_data'}:
+            display_id = msg['content'].get('transient', {}).get('display_id', None)
+            if display_id:
+                self._update_display_id(display_id, msg)
+            if msg_type == 'update_display_data':
+                # update_display_data doesn't get recorded
+                return False
+
+        try:
+            out = output_from_msg(msg)
+        except ValueError:
+            self.log.error("unhandled iopub msg: " + msg_type)
+            return False
+        if display_id:
+            # record output index in:
+            #   _display_id_map[display_id][cell_idx]
+            cell_map = self._display_id_map.setdefault(display_id, {})
+            output_idx_list = cell_map.setdefault(cell_index, [])
+            output_idx_list.append(len(outs))
+
+        outs.append(out)
+        return False
+
     def run_cell(self, cell, cell_index=0):
         msg_id = self.kc.execute(cell.source)
         self.log.debug("Executing cell:\n%s", cell.source)
@@ -366,54 +550,8 @@ class ExecutePreprocessor(Preprocessor):
             if msg['parent_header'].get('msg_id') != msg_id:
                 # not an output from our execution
                 continue
-
-            msg_type = msg['msg_type']
-            self.log.debug("output: %s", msg_type)
-            content = msg['content']
-
-            # set the prompt number for the input and the output
-            if 'execution_count' in content:
-                cell['execution_count'] = content['execution_count']
-
-            if msg_type == 'status':
-                if content['execution_state'] == 'idle':
-                    break
-                else:
-                    continue
-            elif msg_type == 'execute_input':
-                continue
-            elif msg_type == 'clear_output':
-                outs[:] = []
-                # clear display_id mapping for this cell
-                for display_id, cell_map in self._display_id_map.items():
-                    if cell_index in cell_map:
-                        cell_map[cell_index] = []
-                continue
-            elif msg_type.startswith('comm'):
-                continue
-            
-            display_id = None
-            if msg_type in {'execute_result', 'display_data', 'update_display_data'}:
-                display_id = msg['content'].get('transient', {}).get('display_id', None)
-                if display_id:
-                    self._update_display_id(display_id, msg)
-                if msg_type == 'update_display_data':
-                    # update_display_data doesn't get recorded
-                    continue
-
-            try:
-                out = output_from_msg(msg)
-            except ValueError:
-                self.log.error("unhandled iopub msg: " + msg_type)
-                continue
-            if display_id:
-                # record output index in:
-                #   _display_id_map[display_id][cell_idx]
-                cell_map = self._display_id_map.setdefault(display_id, {})
-                output_idx_list = cell_map.setdefault(cell_index, [])
-                output_idx_list.append(len(outs))
-
-            outs.append(out)
+            if self.process_iopub_msg(msg, cell, cell_index, outs):
+                break
 
         return exec_reply, outs
 
@@ -438,3 +576,40 @@ def executenb(nb, cwd=None, **kwargs):
         resources['metadata'] = {'path': cwd}
     ep = ExecutePreprocessor(**kwargs)
     return ep.preprocess(nb, resources)[0]
+
+
+def execute_notebooks(nbs, cwd=None, kernel_pool=None, **kwargs):
+    """Execute several notebooks concurrently with kernels from a pool.
+
+    Notebooks are executed in up to ``kernel_pool.pool_size`` threads, each
+    with its own ExecutePreprocessor, and reuse the pool's warm kernels.
+    The executed notebooks are returned in the order of `nbs`; the first
+    error raised while executing any of them is re-raised once all are done.
+
+    Parameters
+    ----------
+    nbs : list of NotebookNode
+      The notebook objects to be executed
+    cwd : str, optional
+      If supplied, the kernels will run in this directory
+    kernel_pool : KernelPool, optional
+      The pool to take kernels from. If not supplied, a pool is created
+      for this call and its kernels are shut down when it returns.
+    kwargs :
+      Any other options for ExecutePreprocessor, e.g. timeout, kernel_name
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    own_pool = kernel_pool is None
+    if own_pool:
+        kernel_pool = KernelPool()
+    try:
+        with ThreadPoolExecutor(max_workers=kernel_pool.pool_size) as executor:
+            futures = [
+                executor.submit(executenb, nb, cwd=cwd, kernel_pool=kernel_pool, **kwargs)
+                for nb in nbs
+            ]
+            return [future.result() for future in futures]
+    finally:
+        if own_pool:
+            kernel_pool.shutdown_all()
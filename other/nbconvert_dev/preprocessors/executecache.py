@@ -0,0 +1,161 @@
+"""An on-disk cache of code cell outputs for ExecutePreprocessor"""
+
+# Copyright (c) IPython Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import errno
+import hashlib
+import io
+import json
+import os
+import threading
+from textwrap import dedent
+
+from traitlets import Integer, Unicode, default
+from traitlets.config import LoggingConfigurable
+
+
+def _default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'nbconvert', 'execute')
+
+
+class ExecutionCache(LoggingConfigurable):
+    """
+    Stores the outputs of executed code cells, keyed by a hash chain.
+
+    The key of a code cell hashes its source together with the key of the
+    code cell before it; the first key starts from the kernel name and a
+    dependency fingerprint. A cell's key therefore only matches when the
+    cell and everything executed before it are unchanged.
+
+    Entries are JSON files below `cache_dir`. When the cache grows past
+    `max_size` bytes the least recently used entries are removed.
+    """
+
+    cache_dir = Unicode(
+        help="The directory cached outputs are stored in."
+    ).tag(config=True)
+
+    @default('cache_dir')
+    def _cache_dir_default(self):
+        return _default_cache_dir()
+
+    max_size = Integer(256 * 1024 * 1024,
+        help=dedent(
+            """
+            The maximum size (in bytes) of all cached outputs. The least
+            recently used entries are evicted when it is exceeded.
+            """
+        )
+    ).tag(config=True)
+
+    def __init__(self, **kw):
+        super(ExecutionCache, self).__init__(**kw)
+        self._lock = threading.Lock()
+        # key -> [size, last use]; loaded from disk on first use
+        self._index = None
+        self._size = 0
+
+    @staticmethod
+    def key_chain(nb, kernel_name, fingerprint=''):
+        """Return ``[(cell_index, key), ...]`` for the code cells of `nb`"""
+        previous = hashlib.sha256(
+            u'{}\0{}'.format(kernel_name, fingerprint).encode('utf-8')).hexdigest()
+        keys = []
+        for index, cell in enumerate(nb.cells):
+            if cell.cell_type != 'code':
+                continue
+            h = hashlib.sha256(previous.encode('ascii'))
+            h.update(cell.source.encode('utf-8'))
+            previous = h.hexdigest()
+            keys.append((index, previous))
+        return keys
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    st = os.stat(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+                self._index[name[:-len('.json')]] = [st.st_size, st.st_mtime]
+                self._size += st.st_size
+
+    def get(self, key):
+        """Return the cached ``{'outputs', 'execution_count'}`` of `key`, or None"""
+        path = self._path(key)
+        try:
+            with io.open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        with self._lock:
+            if self._index is not None and key in self._index:
+                self._index[key][1] = os.path.getmtime(path)
+        return entry
+
+    def put(self, key, cell):
+        """Store the outputs of an executed `cell` under `key`"""
+        data = json.dumps({
+            'outputs': cell.get('outputs', []),
+            'execution_count': cell.get('execution_count'),
+        }, sort_keys=True)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path))
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        # threads of one process share the cache, and may store the same key
+        tmp = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+        with io.open(tmp, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self._load_index()
+            old = self._index.get(key)
+            if old is not None:
+                self._size -= old[0]
+            self._index[key] = [size, os.path.getmtime(path)]
+            self._size += size
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        by_age = sorted(self._index.items(), key=lambda item: item[1][1])
+        for key, (size, _) in by_age:
+            if self._size <= self.max_size:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del self._index[key]
+            self._size -= size
+            self.log.debug("Evicted cached outputs %s (%d bytes)", key, size)
+
+    def clear(self):
+        with self._lock:
+            self._load_index()
+            for key in list(self._index):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._index = {}
+            self._size = 0
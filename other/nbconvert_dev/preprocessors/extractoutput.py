@@ -6,12 +6,14 @@ notebook file.  The extracted outputs are returned in the 'resources' dictionary
 # Distributed under the terms of the Modified BSD License.
 
 from binascii import a2b_base64
+import hashlib
 import sys
 import os
 from mimetypes import guess_extension
 
-from traitlets import Unicode, Set
+from traitlets import Unicode, Set, Integer, Bool
 from .base import Preprocessor
+from ..utils.io import SpilledOutput
 
 def guess_extension_without_jpe(mimetype):
     """
@@ -25,6 +27,16 @@ def guess_extension_without_jpe(mimetype):
         ext=".jpeg"
     return ext
 
+def content_digest(data):
+    """The sha256 hex digest of extracted output bytes or a SpilledOutput"""
+    if not isinstance(data, SpilledOutput):
+        return hashlib.sha256(data).hexdigest()
+    h = hashlib.sha256()
+    with open(data.path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
 class ExtractOutputPreprocessor(Preprocessor):
     """
     Extracts all of the outputs from the notebook file.  The extracted 
@@ -32,13 +44,56 @@ class ExtractOutputPreprocessor(Preprocessor):
     """
 
     output_filename_template = Unicode(
-        "{unique_key}_{cell_index}_{index}{extension}"
+        "{unique_key}_{cell_index}_{index}{extension}",
+        help="""The name of extracted output files. Besides the default fields,
+        `{hash}` is replaced by the sha256 digest of the output's bytes."""
+    ).tag(config=True)
+
+    content_addressed = Bool(False,
+        help="""Name extracted outputs by the digest of their contents,
+        `{hash}{extension}`, instead of `output_filename_template`. Identical
+        outputs then share one file, within a notebook and across notebooks
+        converted into the same output files directory, and FilesWriter does
+        not rewrite files that already exist."""
     ).tag(config=True)
 
     extract_output_types = Set(
         {'image/png', 'image/jpeg', 'image/svg+xml', 'application/pdf'}
     ).tag(config=True)
 
+    spill_threshold = Integer(-1,
+        help="""Outputs larger than this many bytes are decoded into temporary
+        files instead of being held in memory; writers then move them into
+        place without reading them back. -1 keeps every output in memory."""
+    ).tag(config=True)
+
+    spill_directory = Unicode('',
+        help="""The directory spilled outputs are kept in until they are written.
+        Defaults to the system's temporary directory."""
+    ).tag(config=True)
+
+    def _decode(self, mime_type, data):
+        """Return the bytes of an output, or a SpilledOutput for large ones"""
+        binary = mime_type in {'image/png', 'image/jpeg', 'application/pdf'}
+        # base64 takes four characters for every three bytes
+        size = len(data) * 3 // 4 if binary else len(data)
+        spill = 0 <= self.spill_threshold < size
+        directory = self.spill_directory or None
+
+        #Binary files are base64-encoded, SVG is already XML
+        if binary:
+            # data is b64-encoded as text (str, unicode),
+            # we want the original bytes
+            if spill:
+                return SpilledOutput.from_base64(data, directory)
+            return a2b_base64(data)
+        if sys.platform == 'win32':
+            data = data.replace('\n', '\r\n')
+        data = data.encode("UTF-8")
+        if spill:
+            return SpilledOutput.from_bytes(data, directory)
+        return data
+
     def preprocess_cell(self, cell, resources, cell_index):
         """
         Apply a transformation on each cell,
@@ -71,27 +126,25 @@ class ExtractOutputPreprocessor(Preprocessor):
             #Get the output in data formats that the template needs extracted
             for mime_type in self.extract_output_types:
                 if mime_type in out.data:
-                    data = out.data[mime_type]
-
-                    #Binary files are base64-encoded, SVG is already XML
-                    if mime_type in {'image/png', 'image/jpeg', 'application/pdf'}:
-                        # data is b64-encoded as text (str, unicode),
-                        # we want the original bytes
-                        data = a2b_base64(data)
-                    elif sys.platform == 'win32':
-                        data = data.replace('\n', '\r\n').encode("UTF-8")
-                    else:
-                        data = data.encode("UTF-8")
-                    
+                    data = self._decode(mime_type, out.data[mime_type])
+
                     ext = guess_extension_without_jpe(mime_type)
                     if ext is None:
                         ext = '.' + mime_type.rsplit('/')[-1]
                     
-                    filename = self.output_filename_template.format(
+                    if self.content_addressed:
+                        template = u'{hash}{extension}'
+                    else:
+                        template = self.output_filename_template
+                    digest = None
+                    if '{hash' in template:
+                        digest = content_digest(data)
+                    filename = template.format(
                                     unique_key=unique_key,
                                     cell_index=cell_index,
                                     index=index,
-                                    extension=ext)
+                                    extension=ext,
+                                    hash=digest)
 
                     # On the cell, make the figure available via
                     #   cell.outputs[i].metadata.filenames['mime/type']
@@ -105,5 +158,8 @@ class ExtractOutputPreprocessor(Preprocessor):
                     #In the resources, make the figure available via
                     #   resources['outputs']['filename'] = data
                     resources['outputs'][filename] = data
+                    if digest is not None:
+                        # lets writers skip files that already hold this content
+                        resources.setdefault('output_digests', {})[filename] = digest
 
         return cell, resources
@@ -0,0 +1,227 @@
+"""A pool of warm kernels shared by ExecutePreprocessor instances"""
+
+# Copyright (c) IPython Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+import threading
+import time
+from textwrap import dedent
+
+try:
+    from queue import Empty  # Py 3
+except ImportError:
+    from Queue import Empty  # Py 2
+
+from traitlets import Integer, Unicode, Enum
+from traitlets.config import LoggingConfigurable
+
+# Runs in a returned kernel before it is handed out again. `reset` with
+# `new_session` clears the user namespace, the history and the execution
+# count, so the next notebook's prompts start at 1 again.
+DEFAULT_RESET_CODE = (
+    "__import__('os').chdir({cwd!r})\n"
+    "get_ipython().reset(new_session=True, aggressive=True)"
+)
+
+
+class PooledKernel(object):
+    """A kernel manager and client owned by a :class:`KernelPool`"""
+
+    def __init__(self, key, km, kc, cwd):
+        self.key = key
+        self.km = km
+        self.kc = kc
+        self.cwd = cwd
+        self.uses = 0
+
+
+class KernelPool(LoggingConfigurable):
+    """
+    Keeps started kernels around so executing many small notebooks does
+    not pay for a kernel startup each time.
+
+    Kernels are keyed by kernel name, working directory and extra
+    arguments. A kernel that is released in good health has its namespace
+    reset and is handed to the next notebook with the same key; a kernel
+    that saw an error, or was used `max_uses` times, is shut down instead.
+
+    At most `pool_size` kernels are checked out at once, so several
+    notebooks can execute concurrently from different threads::
+
+        pool = KernelPool(pool_size=4)
+        try:
+            executed = execute_notebooks(notebooks, kernel_pool=pool)
+        finally:
+            pool.shutdown_all()
+    """
+
+    pool_size = Integer(4,
+        help=dedent(
+            """
+            The maximum number of kernels checked out at the same time.
+            Further requests block until a kernel is released.
+            """
+        )
+    ).tag(config=True)
+
+    max_uses = Integer(20,
+        help=dedent(
+            """
+            The number of notebooks a kernel executes before it is shut down
+            and replaced by a fresh one. 0 never recycles healthy kernels.
+            """
+        )
+    ).tag(config=True)
+
+    max_idle = Integer(4,
+        help="The maximum number of idle kernels kept for each kernel name and path."
+    ).tag(config=True)
+
+    reset_code = Unicode(DEFAULT_RESET_CODE,
+        help=dedent(
+            """
+            Code executed in a released kernel to reset its state before it is
+            reused; `{cwd}` is replaced by the kernel's working directory.
+            Only kernels whose language is python are reset and reused, other
+            kernels are shut down on release. An empty string disables reuse.
+            """
+        )
+    ).tag(config=True)
+
+    reset_timeout = Integer(10,
+        help="The time to wait (in seconds) for the reset of a released kernel."
+    ).tag(config=True)
+
+    shutdown_kernel = Enum(['graceful', 'immediate'],
+        default_value='graceful',
+        help="How kernels are shut down when they are recycled or the pool is closed."
+    ).tag(config=True)
+
+    def __init__(self, **kw):
+        super(KernelPool, self).__init__(**kw)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._idle = {}
+        self._busy = set()
+        self.started = 0
+        self.reused = 0
+
+    def acquire(self, kernel_manager_class, kernel_name, cwd=None,
+                extra_arguments=(), startup_timeout=60):
+        """Check out a kernel, starting one if no idle kernel matches
+
+        Returns a :class:`PooledKernel`; hand it back with :meth:`release`.
+        """
+        key = (kernel_manager_class, kernel_name, cwd, tuple(extra_arguments))
+        self._slots.acquire()
+        try:
+            with self._lock:
+                idle = self._idle.get(key)
+                kernel = idle.pop() if idle else None
+            if kernel is not None and not kernel.km.is_alive():
+                self._shutdown(kernel)
+                kernel = None
+            if kernel is None:
+                kernel = self._start(key, kernel_manager_class, kernel_name, cwd,
+                                     extra_arguments, startup_timeout)
+            else:
+                self.reused += 1
+            with self._lock:
+                self._busy.add(kernel)
+        except BaseException:
+            self._slots.release()
+            raise
+        kernel.uses += 1
+        return kernel
+
+    def release(self, kernel, healthy=True):
+        """Return a kernel checked out with :meth:`acquire`
+
+        Unhealthy and worn out kernels are shut down; the others are reset
+        and kept for the next notebook with the same key.
+        """
+        with self._lock:
+            self._busy.discard(kernel)
+        try:
+            reusable = (
+                healthy
+                and not (self.max_uses and kernel.uses >= self.max_uses)
+                and len(self._idle.get(kernel.key, ())) < self.max_idle
+                and self._reset(kernel)
+            )
+            if reusable:
+                with self._lock:
+                    self._idle.setdefault(kernel.key, []).append(kernel)
+            else:
+                self._shutdown(kernel)
+        finally:
+            self._slots.release()
+
+    def shutdown_all(self):
+        """Shut down every idle kernel, and every kernel still checked out"""
+        with self._lock:
+            kernels = [k for idle in self._idle.values() for k in idle]
+            kernels.extend(self._busy)
+            self._idle.clear()
+            self._busy.clear()
+        for kernel in kernels:
+            self._shutdown(kernel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown_all()
+
+    def _start(self, key, kernel_manager_class, kernel_name, cwd,
+               extra_arguments, startup_timeout):
+        km = kernel_manager_class(kernel_name=kernel_name)
+        km.start_kernel(extra_arguments=list(extra_arguments), cwd=cwd)
+        kc = km.client()
+        kc.start_channels()
+        try:
+            kc.wait_for_ready(timeout=startup_timeout)
+        except RuntimeError:
+            kc.stop_channels()
+            km.shutdown_kernel()
+            raise
+        kc.allow_stdin = False
+        self.started += 1
+        # Kernels started without a cwd run in ours; remember it for the reset
+        return PooledKernel(key, km, kc, cwd or os.getcwd())
+
+    def _reset(self, kernel):
+        """Reset the state of a kernel before reuse; return whether it worked"""
+        if not self.reset_code:
+            return False
+        spec = getattr(kernel.km, 'kernel_spec', None)
+        if spec is None or spec.language != 'python':
+            return False
+        kc = kernel.kc
+        msg_id = kc.execute(self.reset_code.format(cwd=kernel.cwd), silent=True, store_history=False)
+        deadline = time.time() + self.reset_timeout
+        try:
+            while True:
+                reply = kc.get_shell_msg(timeout=max(deadline - time.time(), 0))
+                if reply['parent_header'].get('msg_id') == msg_id:
+                    break
+            if reply['content']['status'] != 'ok':
+                return False
+            # Drain the iopub messages of the reset, up to its idle status
+            while True:
+                msg = kc.get_iopub_msg(timeout=max(deadline - time.time(), 0))
+                if (msg['parent_header'].get('msg_id') == msg_id
+                        and msg['msg_type'] == 'status'
+                        and msg['content']['execution_state'] == 'idle'):
+                    return True
+        except Empty:
+            self.log.warning("Timeout resetting kernel %s, recycling it", kernel.key[1])
+            return False
+
+    def _shutdown(self, kernel):
+        try:
+            kernel.kc.stop_channels()
+            kernel.km.shutdown_kernel(now=self.shutdown_kernel == 'immediate')
+        except Exception:
+            self.log.warning("Error shutting down kernel %s", kernel.key[1], exc_info=True)
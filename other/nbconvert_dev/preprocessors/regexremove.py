@@ -49,14 +49,21 @@ class RegexRemovePreprocessor(Preprocessor):
         True means cell should *not* be removed.
         """
 
-        # Compile all the patterns into one: each pattern is first wrapped
-        # by a non-capturing group to ensure the correct order of precedence
-        # and the patterns are joined with a logical or
-        pattern = re.compile('|'.join('(?:%s)' % pattern
-                             for pattern in self.patterns))
-
         # Filter out cells that meet the pattern and have no outputs
-        return cell.get('outputs') or not pattern.match(cell.source)
+        return cell.get('outputs') or not self._compiled_pattern().match(cell.source)
+
+    _compiled = (None, None)
+
+    def _compiled_pattern(self):
+        """The patterns compiled into one regex, recompiled only when they change"""
+        patterns = tuple(self.patterns)
+        if self._compiled[0] != patterns:
+            # Compile all the patterns into one: each pattern is first wrapped
+            # by a non-capturing group to ensure the correct order of precedence
+            # and the patterns are joined with a logical or
+            self._compiled = (patterns, re.compile('|'.join('(?:%s)' % pattern
+                                                            for pattern in patterns)))
+        return self._compiled[1]
 
     def preprocess(self, nb, resources):
         """
@@ -2,15 +2,21 @@
 NBConvert Preprocessor for sanitizing HTML rendering of notebooks.
 """
 
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
 from bleach import (
     ALLOWED_ATTRIBUTES,
     ALLOWED_STYLES,
     ALLOWED_TAGS,
-    clean,
+    Cleaner,
 )
 from traitlets import (
     Any,
     Bool,
+    Integer,
     List,
     Set,
     Unicode,
@@ -18,6 +24,70 @@ from traitlets import (
 from .base import Preprocessor
 
 
+# Cleaners by configuration; a Cleaner is not safe to share between threads.
+_cleaners = threading.local()
+
+_tag_re = re.compile(r'<!--.*?(?:-->|\Z)|<(/?)([a-zA-Z][^\s/>]*)[^>]*?(/?)>', re.DOTALL)
+
+# Elements with raw text content, which a tag scanner cannot see into
+_rawtext_re = re.compile(
+    r'<(script|style|textarea|title|xmp|iframe|noembed|noframes|noscript|plaintext)\b',
+    re.IGNORECASE)
+
+_void_elements = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr',
+])
+
+
+def _freeze(value):
+    """A hashable version of a bleach attributes/tags/styles setting"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(value)
+    return value
+
+
+def _top_level_chunks(html, size):
+    """Split `html` into pieces of about `size` characters, between top-level elements.
+
+    Pieces are only cut right after an element closing at the top level,
+    so each is a complete fragment that cleans the same on its own. Text
+    that cannot be split safely (raw text elements, end tags that do not
+    match the open element, elements left open, comments that are not
+    closed or that a parser would end early) is returned whole.
+    """
+    if len(html) <= size or _rawtext_re.search(html):
+        return [html]
+    chunks = []
+    start = 0
+    open_elements = []
+    for m in _tag_re.finditer(html):
+        closing, name, self_closing = m.groups()
+        if name is None:
+            comment = m.group()
+            if (not comment.endswith('-->') or len(comment) < 7
+                    or comment.startswith(('<!-->', '<!--->')) or '--!>' in comment):
+                return [html]
+            continue
+        name = name.lower()
+        if self_closing or name in _void_elements:
+            continue
+        if not closing:
+            open_elements.append(name)
+            continue
+        if not open_elements or open_elements.pop() != name:
+            return [html]
+        if not open_elements and m.end() - start >= size:
+            chunks.append(html[start:m.end()])
+            start = m.end()
+    if open_elements:
+        return [html]
+    chunks.append(html[start:])
+    return chunks
+
+
 class SanitizeHTML(Preprocessor):
 
     # Bleach config.
@@ -49,6 +119,17 @@ class SanitizeHTML(Preprocessor):
         help="If True, strip comments from escaped HTML",
     )
 
+    cache_size = Integer(
+        config=True,
+        default_value=1024,
+        help="The number of sanitized strings kept, so repeated outputs are cleaned once",
+    )
+    chunk_size = Integer(
+        config=True,
+        default_value=256 * 1024,
+        help="Outputs longer than this are cleaned in pieces of about this many characters",
+    )
+
     # Display data config.
     safe_output_keys = Set(
         config=True,
@@ -71,6 +152,12 @@ class SanitizeHTML(Preprocessor):
         help="Cell output types to display after escaping with Bleach.",
     )
 
+    def __init__(self, **kw):
+        super(SanitizeHTML, self).__init__(**kw)
+        # LRU of cleaned strings by (configuration, hash of the input)
+        self._results = OrderedDict()
+        self._results_lock = threading.Lock()
+
     def preprocess_cell(self, cell, resources, cell_index):
         """
         Sanitize potentially-dangerous contents of the cell.
@@ -113,26 +200,63 @@ class SanitizeHTML(Preprocessor):
                 if key in self.safe_output_keys:
                     continue
                 elif key in self.sanitized_output_types:
-                    self.log.info("Sanitizing %s" % key)
+                    self.log.debug("Sanitizing %s", key)
                     data[key] = self.sanitize_html_tags(data[key])
                 else:
                     # Mark key for removal. (Python doesn't allow deletion of
                     # keys from a dict during iteration)
                     to_remove.append(key)
             for key in to_remove:
-                self.log.info("Removing %s" % key)
+                self.log.debug("Removing %s", key)
                 del data[key]
         return outputs
 
+    def _config_key(self):
+        return (
+            _freeze(self.tags), _freeze(self.attributes), _freeze(self.styles),
+            self.strip, self.strip_comments,
+        )
+
+    def _cleaner(self, key):
+        """The Cleaner for configuration `key`, built once per thread"""
+        cleaners = getattr(_cleaners, 'by_config', None)
+        if cleaners is None:
+            cleaners = _cleaners.by_config = {}
+        cleaner = cleaners.get(key)
+        if cleaner is None:
+            cleaner = cleaners[key] = Cleaner(
+                tags=self.tags,
+                attributes=self.attributes,
+                styles=self.styles,
+                strip=self.strip,
+                strip_comments=self.strip_comments,
+            )
+        return cleaner
+
     def sanitize_html_tags(self, html_str):
         """
         Sanitize a string containing raw HTML tags.
         """
-        return clean(
-            html_str,
-            tags=self.tags,
-            attributes=self.attributes,
-            styles=self.styles,
-            strip=self.strip,
-            strip_comments=self.strip_comments,
-        )
+        key = self._config_key()
+        cleaner = self._cleaner(key)
+        if self.chunk_size > 0:
+            chunks = _top_level_chunks(html_str, self.chunk_size)
+        else:
+            chunks = [html_str]
+        return u''.join(self._clean(cleaner, key, chunk) for chunk in chunks)
+
+    def _clean(self, cleaner, key, html_str):
+        if self.cache_size <= 0:
+            return cleaner.clean(html_str)
+        digest = (key, hashlib.sha1(html_str.encode('utf-8', 'surrogatepass')).digest())
+        with self._results_lock:
+            cleaned = self._results.get(digest)
+            if cleaned is not None:
+                self._results.move_to_end(digest)
+                return cleaned
+        cleaned = cleaner.clean(html_str)
+        with self._results_lock:
+            self._results[digest] = cleaned
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return cleaned
@@ -6,6 +6,8 @@ one format to another.
 # Distributed under the terms of the Modified BSD License.
 
 import base64
+import errno
+import hashlib
 import io
 import os
 import sys
@@ -27,6 +29,11 @@ if sys.platform == "win32":
         import _winreg as winreg
 
 
+def _default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'nbconvert', 'svg2pdf')
+
+
 class SVG2PDFPreprocessor(ConvertFiguresPreprocessor):
     """
     Converts all of the outputs in a notebook from SVG to PDF.
@@ -55,6 +62,28 @@ class SVG2PDFPreprocessor(ConvertFiguresPreprocessor):
         return self.inkscape + \
                ' --without-gui --export-pdf="{to_filename}" "{from_filename}"'
     
+    batch_command = Unicode('',
+        help="""A command converting many SVG files to PDF in one call
+
+        This string is a template, which will be formatted with the keys
+        inkscape and from_filenames (the quoted input files). Each PDF must
+        be written next to its SVG, with the .svg extension replaced by
+        .pdf, e.g. for Inkscape 1.0 or later::
+
+            {inkscape} --export-type=pdf {from_filenames}
+
+        If empty, `command` is called once per figure.
+        """).tag(config=True)
+
+    cache_dir = Unicode(
+        help="""The directory converted figures are cached in, by a hash of
+        the SVG and the conversion command. An empty string disables the cache.
+        """).tag(config=True)
+
+    @default('cache_dir')
+    def _cache_dir_default(self):
+        return _default_cache_dir()
+
     inkscape = Unicode(help="The path to Inkscape, if necessary").tag(config=True)
     @default('inkscape')
     def _inkscape_default(self):
@@ -72,19 +101,102 @@ class SVG2PDFPreprocessor(ConvertFiguresPreprocessor):
         return "inkscape"
 
 
+    def _cache_path(self, data):
+        if not self.cache_dir:
+            return None
+        h = hashlib.sha256((self.batch_command or self.command).encode('utf-8'))
+        h.update(b'\0')
+        h.update(cast_unicode_py2(data).encode('utf-8'))
+        key = h.hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + '.pdf')
+
+    def _cache_get(self, data):
+        path = self._cache_path(data)
+        if path is None or not os.path.isfile(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _cache_put(self, data, pdf):
+        path = self._cache_path(data)
+        if path is None:
+            return
+        tmp = '{}.{}.{}.tmp'.format(path, os.getpid(), id(pdf))
+        try:
+            try:
+                os.makedirs(os.path.dirname(path))
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            with open(tmp, 'wb') as f:
+                f.write(pdf)
+            os.replace(tmp, path)
+        except OSError:
+            # the cache is an optimization only, e.g. HOME may be read-only
+            pass
+
+    def _write_svg(self, filename, data):
+        # SVG data is unicode text
+        with io.open(filename, 'w', encoding='utf8') as f:
+            f.write(cast_unicode_py2(data))
+
+    def _read_pdf(self, filename):
+        # return value expects a filename
+        if os.path.isfile(filename):
+            with open(filename, 'rb') as f:
+                return f.read()
+        else:
+            raise TypeError("Inkscape svg to pdf conversion failed")
+
     def convert_figure(self, data_format, data):
         """
         Convert a single SVG figure to PDF.  Returns converted data.
         """
+        pdf = self._cache_get(data)
+        if pdf is None:
+            pdf = self._convert(data)
+            self._cache_put(data, pdf)
+        # PDF is a nb supported binary, data type, so base64 encode.
+        return base64.encodebytes(pdf)
+
+    def convert_figures(self, data_format, figures):
+        """
+        Convert several SVG figures to PDF, with one call of `batch_command`
+        for the figures that are not cached, if it is set.
+        """
+        if not self.batch_command:
+            return super(SVG2PDFPreprocessor, self).convert_figures(data_format, figures)
+
+        pdfs = [self._cache_get(data) for data in figures]
+        missing = [i for i, pdf in enumerate(pdfs) if pdf is None]
+        if missing:
+            with TemporaryDirectory() as tmpdir:
+                input_filenames = []
+                for i in missing:
+                    input_filename = os.path.join(tmpdir, 'figure%d.svg' % i)
+                    self._write_svg(input_filename, figures[i])
+                    input_filenames.append(input_filename)
+                shell = self.batch_command.format(
+                    inkscape=self.inkscape,
+                    from_filenames=' '.join('"%s"' % name for name in input_filenames))
+                subprocess.call(shell, shell=True) #Shell=True okay since input is trusted.
+                for i, input_filename in zip(missing, input_filenames):
+                    pdfs[i] = self._read_pdf(input_filename[:-len('.svg')] + '.pdf')
+                    self._cache_put(figures[i], pdfs[i])
+        return [base64.encodebytes(pdf) for pdf in pdfs]
+
+    def _convert(self, data):
+        """Convert `data` with `command`, returning the PDF bytes"""
 
         #Work in a temporary directory
         with TemporaryDirectory() as tmpdir:
             
             #Write fig to temp file
             input_filename = os.path.join(tmpdir, 'figure.svg')
-            # SVG data is unicode text
-            with io.open(input_filename, 'w', encoding='utf8') as f:
-                f.write(cast_unicode_py2(data))
+            self._write_svg(input_filename, data)
 
             #Call conversion application
             output_filename = os.path.join(tmpdir, 'figure.pdf')
@@ -93,10 +205,4 @@ class SVG2PDFPreprocessor(ConvertFiguresPreprocessor):
             subprocess.call(shell, shell=True) #Shell=True okay since input is trusted.
 
             #Read output from drive
-            # return value expects a filename
-            if os.path.isfile(output_filename):
-                with open(output_filename, 'rb') as f:
-                    # PDF is a nb supported binary, data type, so base64 encode.
-                    return base64.encodestring(f.read())
-            else:
-                raise TypeError("Inkscape svg to pdf conversion failed")
+            return self._read_pdf(output_filename)
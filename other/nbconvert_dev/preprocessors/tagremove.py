@@ -93,7 +93,7 @@ class TagRemovePreprocessor(ClearOutputPreprocessor):
                 'remove_source': True
                 }
 
-        if cell.get('outputs', []):
+        if self.remove_single_output_tags and cell.get('outputs', []):
             cell.outputs = [output
                             for output_index, output in enumerate(cell.outputs)
                             if self.check_output_conditions(output,
@@ -45,3 +45,30 @@ class TestCSSHTMLHeader(PreprocessorTestsBase):
         preprocessor = self.build_preprocessor()
         nb, res = preprocessor(nb, res)
         assert 'css' in res['inlining'] 
+
+
+    def test_cached(self):
+        """Is the header generated once for the same inputs?"""
+        preprocessor = self.build_preprocessor()
+        preprocessor(self.build_notebook(), self.build_resources())
+        calls = []
+        generate = preprocessor._generate_header
+        preprocessor._generate_header = lambda res: calls.append(res) or generate(res)
+        nb, res = preprocessor(self.build_notebook(), self.build_resources())
+        self.assertEqual(calls, [])
+        preprocessor.style = 'emacs'
+        nb, res2 = preprocessor(self.build_notebook(), self.build_resources())
+        self.assertEqual(len(calls), 1)
+        self.assertNotEqual(res['inlining']['css'], res2['inlining']['css'])
+
+
+    def test_css_file(self):
+        """Is the CSS written to a linked file when css_filename is set?"""
+        preprocessor = self.build_preprocessor()
+        preprocessor.css_filename = 'style-{hash}.css'
+        nb, res = preprocessor(self.build_notebook(), self.build_resources())
+        self.assertEqual(res['inlining']['css'], [])
+        filename, = res['inlining']['css_files']
+        self.assertTrue(filename.startswith('style-'))
+        self.assertIn(b'.highlight', res['outputs'][filename])
+        self.assertIn(filename, res['output_digests'])
@@ -8,20 +8,26 @@ Module with tests for the execute preprocessor.
 # Distributed under the terms of the Modified BSD License.
 
 from base64 import b64encode, b64decode
+import asyncio
 import copy
 import glob
 import io
 import os
 import re
+import tempfile
 
 import nbformat
 import sys
 import pytest
 
 from .base import PreprocessorTestsBase
-from ..execute import ExecutePreprocessor, CellExecutionError, executenb
+from ..execute import ExecutePreprocessor, CellExecutionError, executenb, execute_notebooks
+from ..kernelpool import KernelPool
+from ..executecache import ExecutionCache
+from ..asyncexecute import AsyncExecutePreprocessor, execute_notebooks_async
 
 from nbconvert.filters import strip_ansi
+from traitlets import TraitError
 from testpath import modified_env
 from ipython_genutils.py3compat import string_types
 
@@ -250,3 +256,150 @@ class TestExecute(PreprocessorTestsBase):
         original = copy.deepcopy(input_nb)
         executed = executenb(original, os.path.dirname(filename))
         self.assert_notebooks_equal(original, executed)
+
+    def test_kernel_pool_reuses_kernels(self):
+        """Pooled kernels are reused, with a fresh namespace for every notebook"""
+        def build(i):
+            return nbformat.v4.new_notebook(cells=[
+                nbformat.v4.new_code_cell("print('leaked' in dir())\nleaked = %d" % i),
+            ])
+
+        with KernelPool(pool_size=2) as pool:
+            executed = execute_notebooks([build(i) for i in range(6)], kernel_pool=pool,
+                                         kernel_name='python')
+            assert pool.started <= 2
+            assert pool.reused >= 4
+        for nb in executed:
+            cell = nb.cells[0]
+            assert cell.outputs[0]['text'] == 'False\n'
+            assert cell.execution_count == 1
+
+    def test_kernel_pool_recycles_on_error(self):
+        """A kernel whose notebook raised is shut down instead of reused"""
+        failing = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("1/0")])
+        passing = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("1")])
+        with KernelPool(pool_size=1) as pool:
+            with pytest.raises(CellExecutionError):
+                executenb(failing, kernel_pool=pool, kernel_name='python')
+            executenb(passing, kernel_pool=pool, kernel_name='python')
+            assert pool.started == 2
+            assert pool.reused == 0
+
+    def test_execution_cache(self):
+        """Cached outputs are served without a kernel, changed cells are re-executed"""
+        def build(last):
+            return nbformat.v4.new_notebook(cells=[
+                nbformat.v4.new_code_cell("x = 3\nprint(x)"),
+                nbformat.v4.new_code_cell(last),
+            ])
+
+        cache = ExecutionCache(cache_dir=tempfile.mkdtemp())
+        executed = executenb(build("x * 2"), execution_cache=cache, kernel_name='python')
+        assert executed.cells[1].outputs[0]['data']['text/plain'] == '6'
+
+        # A kernel manager that cannot be instantiated proves no kernel is started
+        cached = executenb(build("x * 2"), execution_cache=cache, kernel_name='python',
+                           kernel_manager_class=object)
+        self.assert_notebooks_equal(executed, cached)
+        self.assertEqual(cached.cells[1].execution_count, 2)
+
+        changed = executenb(build("x * 3"), execution_cache=cache, kernel_name='python')
+        assert changed.cells[0].outputs[0]['text'] == '3\n'
+        assert changed.cells[1].outputs[0]['data']['text/plain'] == '9'
+
+    def test_execution_cache_timeout(self):
+        """A cell interrupted on timeout is not cached"""
+        def build():
+            return nbformat.v4.new_notebook(cells=[
+                nbformat.v4.new_code_cell("import time\nprint('start')\ntime.sleep(3)\nprint('done')"),
+            ])
+
+        cache = ExecutionCache(cache_dir=tempfile.mkdtemp())
+        executenb(build(), execution_cache=cache, kernel_name='python',
+                  timeout=1, interrupt_on_timeout=True, allow_errors=True)
+        rerun = executenb(build(), execution_cache=cache, kernel_name='python', timeout=30)
+        text = ''.join(out.get('text', '') for out in rerun.cells[0].outputs)
+        self.assertEqual(text, 'start\ndone\n')
+
+    def test_execution_cache_eviction(self):
+        """The cache stays below its size limit"""
+        cell = nbformat.v4.new_code_cell("1", outputs=[
+            nbformat.v4.new_output("stream", name="stdout", text="x" * 100)])
+        cache = ExecutionCache(cache_dir=tempfile.mkdtemp(), max_size=500)
+        for i in range(10):
+            cache.put('%064x' % i, cell)
+        assert cache._size <= 500
+        assert cache.get('%064x' % 9) is not None
+        assert cache.get('%064x' % 0) is None
+
+    def test_async_matches_sync(self):
+        """The asyncio engine produces the same outputs, display updates and interrupts"""
+        for name, opts in [
+                ('HelloWorld.ipynb', {}),
+                ('update-display-id.ipynb', {}),
+                ('Interrupt.ipynb', dict(timeout=1, interrupt_on_timeout=True, allow_errors=True)),
+        ]:
+            filename = os.path.join(current_dir, 'files', name)
+            res = self.build_resources()
+            res['metadata']['path'] = os.path.dirname(filename)
+            _, expected = self.run_notebook(filename, opts, res)
+
+            with io.open(filename) as f:
+                input_nb = nbformat.read(f, 4)
+            with modified_env({'COLUMNS': '80', 'LINES': '24'}):
+                actual, _ = AsyncExecutePreprocessor(**opts).preprocess(input_nb, res)
+            self.assert_notebooks_equal(expected, actual)
+
+    def test_async_timeout(self):
+        """Timeouts raise from the asyncio engine too"""
+        nb = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("import time; time.sleep(10)")])
+        with pytest.raises(TimeoutError):
+            AsyncExecutePreprocessor(timeout=1, kernel_name='python').preprocess(nb, {})
+
+    def test_async_kernel_pool(self):
+        """The asyncio engine rejects a kernel pool instead of ignoring it"""
+        with KernelPool(pool_size=1) as pool:
+            with pytest.raises(TraitError):
+                AsyncExecutePreprocessor(kernel_pool=pool)
+
+    def test_async_cleanup_once(self):
+        """A kernel that never becomes ready is shut down once"""
+        shutdowns = []
+
+        class Client(object):
+            def start_channels(self):
+                pass
+
+            def stop_channels(self):
+                shutdowns.append('channels')
+
+            async def wait_for_ready(self, timeout):
+                raise RuntimeError("Kernel didn't respond in %d seconds" % timeout)
+
+        class Manager(object):
+            def __init__(self, **kwargs):
+                pass
+
+            async def start_kernel(self, **kwargs):
+                pass
+
+            def client(self):
+                return Client()
+
+            async def shutdown_kernel(self, now=False):
+                shutdowns.append('kernel')
+
+        nb = nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("1")])
+        ep = AsyncExecutePreprocessor(kernel_manager_class=Manager, kernel_name='python')
+        with pytest.raises(RuntimeError):
+            ep.preprocess(nb, {})
+        assert shutdowns == ['channels', 'kernel']
+
+    def test_async_concurrent_notebooks(self):
+        """Many notebooks execute concurrently in one event loop"""
+        nbs = [
+            nbformat.v4.new_notebook(cells=[nbformat.v4.new_code_cell("x = %d\nprint(x)" % i)])
+            for i in range(4)
+        ]
+        executed = asyncio.run(execute_notebooks_async(nbs, max_concurrency=4, kernel_name='python'))
+        assert [nb.cells[0].outputs[0]['text'] for nb in executed] == ['%d\n' % i for i in range(4)]
@@ -3,6 +3,9 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import hashlib
+import os
+
 from .base import PreprocessorTestsBase
 from ..extractoutput import ExtractOutputPreprocessor
 
@@ -56,3 +59,40 @@ class TestExtractOutput(PreprocessorTestsBase):
         # Verify pdf output
         self.assertIn(pdf_filename, res['outputs'])
         self.assertEqual(res['outputs'][pdf_filename], b'h')
+
+    def test_spilled_output(self):
+        """Are outputs above spill_threshold kept in temporary files?"""
+        nb = self.build_notebook()
+        res = self.build_resources()
+        preprocessor = self.build_preprocessor()
+        preprocessor.spill_threshold = 0
+        nb, res = preprocessor(nb, res)
+
+        png_filename = nb.cells[0].outputs[6].metadata.filenames['image/png']
+        spilled = res['outputs'][png_filename]
+        self.assertTrue(os.path.isfile(spilled.path))
+        self.assertEqual(len(spilled), 1)
+        self.assertEqual(spilled, b'g')
+        self.assertEqual(bytes(spilled), b'g')
+
+        # the temporary file goes away with the last reference to it
+        path = spilled.path
+        del spilled, res
+        self.assertFalse(os.path.exists(path))
+
+    def test_content_addressed(self):
+        """Are content addressed outputs named by their digest?"""
+        nb = self.build_notebook()
+        # the same image twice
+        nb.cells[0].outputs.append(nb.cells[0].outputs[6])
+        res = self.build_resources()
+        preprocessor = self.build_preprocessor()
+        preprocessor.content_addressed = True
+        nb, res = preprocessor(nb, res)
+
+        first = nb.cells[0].outputs[6].metadata.filenames['image/png']
+        second = nb.cells[0].outputs[-1].metadata.filenames['image/png']
+        self.assertEqual(first, hashlib.sha256(b'g').hexdigest() + '.png')
+        self.assertEqual(first, second)
+        self.assertEqual(res['outputs'][first], b'g')
+        self.assertEqual(res['output_digests'][first], hashlib.sha256(b'g').hexdigest())
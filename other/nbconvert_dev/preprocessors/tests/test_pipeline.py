@@ -0,0 +1,58 @@
+"""
+Module with tests for the fused preprocessor pipeline in base.py
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+
+from .base import PreprocessorTestsBase
+from ..base import CellPipeline, compile_pipeline, run_pipeline
+from ..clearoutput import ClearOutputPreprocessor
+from ..coalescestreams import coalesce_streams
+from ..extractoutput import ExtractOutputPreprocessor
+from ..highlightmagics import HighlightMagicsPreprocessor
+from ..regexremove import RegexRemovePreprocessor
+
+
+class TestPipeline(PreprocessorTestsBase):
+    """Contains test functions for compile_pipeline and run_pipeline"""
+
+    def build_preprocessors(self):
+        extract = ExtractOutputPreprocessor(enabled=True)
+        extract.extract_output_types = {'text/plain', 'image/png', 'application/pdf'}
+        return [
+            coalesce_streams,
+            RegexRemovePreprocessor(enabled=True),
+            HighlightMagicsPreprocessor(enabled=True),
+            extract,
+            ClearOutputPreprocessor(enabled=False),
+        ]
+
+    def test_stages(self):
+        """Are cell-local preprocessors fused between barriers?"""
+        preprocessors = self.build_preprocessors()
+        stages = compile_pipeline(preprocessors)
+        # the disabled ClearOutputPreprocessor is dropped
+        self.assertEqual([stage for _, stage in stages][:2], preprocessors[:2])
+        self.assertEqual(len(stages), 3)
+        fused = stages[2][1]
+        self.assertIsInstance(fused, CellPipeline)
+        self.assertEqual(fused.preprocessors, preprocessors[2:4])
+        self.assertEqual(stages[2][0], 'HighlightMagicsPreprocessor+ExtractOutputPreprocessor')
+
+    def test_same_result(self):
+        """Does the fused pipeline produce what the preprocessors do one by one?"""
+        nb = self.build_notebook()
+        res = self.build_resources()
+        res['outputs'] = {}
+        expected_nb, expected_res = copy.deepcopy(nb), copy.deepcopy(res)
+        for preprocessor in self.build_preprocessors():
+            expected_nb, expected_res = preprocessor(expected_nb, expected_res)
+
+        stages = compile_pipeline(self.build_preprocessors())
+        nb, res, timings = run_pipeline(stages, nb, res)
+        self.assertEqual(nb, expected_nb)
+        self.assertEqual(res, expected_res)
+        self.assertEqual([name for name, _ in timings], [name for name, _ in stages])
@@ -1,7 +1,7 @@
 """Tests for the HTMLSanitize preprocessor"""
 
 from .base import PreprocessorTestsBase
-from ..sanitize import SanitizeHTML
+from ..sanitize import SanitizeHTML, _top_level_chunks
 from nbformat import v4 as nbformat
 
 
@@ -206,3 +206,42 @@ class TestSanitizer(PreprocessorTestsBase):
             ),
             '_A_ <em>few</em> &lt;script&gt;tags&lt;/script&gt;'
         )
+
+    def test_cached(self):
+        """Are repeated sources cleaned once?"""
+        preprocessor = self.build_preprocessor()
+        source = '<table><tr><td onclick="x()">1</td></tr></table>'
+        first = preprocessor.sanitize_html_tags(source)
+        cleaner = preprocessor._cleaner(preprocessor._config_key())
+        calls = []
+        clean = cleaner.clean
+        cleaner.clean = lambda text: calls.append(text) or clean(text)
+        try:
+            self.assertEqual(preprocessor.sanitize_html_tags(source), first)
+            self.assertEqual(calls, [])
+            preprocessor.strip = True
+            self.assertNotEqual(preprocessor.sanitize_html_tags(source), first)
+            self.assertEqual(len(preprocessor._results), 2)
+        finally:
+            cleaner.clean = clean
+
+    def test_chunks(self):
+        """Are large outputs cleaned in pieces with the same result?"""
+        row = '<div class="r"><b>x</b><br><script>y</script></div>\n'
+        html = row.replace('<script>y</script>', '') * 200 + '<i>tail'
+        self.assertEqual(_top_level_chunks(html, 1000), [html])
+        html = html.replace('<i>tail', '<i>tail</i>')
+        chunks = _top_level_chunks(html, 1000)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), html)
+        self.assertEqual(_top_level_chunks(row * 200, 1000), [row * 200])
+        # a stray end tag leaves <b> open, an unclosed comment hides the rest
+        for broken in ('<b>x</p>' + html, html + '<!-- ' + html, html + '<!--> ' + html):
+            self.assertEqual(_top_level_chunks(broken, 1000), [broken])
+
+        html += '<p onclick="z()">end</p>'
+        whole = self.build_preprocessor()
+        whole.chunk_size = 0
+        chunked = self.build_preprocessor()
+        chunked.chunk_size = 1000
+        self.assertEqual(chunked.sanitize_html_tags(html), whole.sanitize_html_tags(html))
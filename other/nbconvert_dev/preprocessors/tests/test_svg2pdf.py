@@ -3,7 +3,13 @@
 # Copyright (c) IPython Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import base64
+import copy
+import os
+import sys
+
 from ipython_genutils.testing import decorators as dec
+from testpath.tempdir import TemporaryDirectory
 from nbformat import v4 as nbformat
 
 from .base import PreprocessorTestsBase
@@ -71,3 +77,69 @@ class Testsvg2pdf(PreprocessorTestsBase):
         preprocessor = self.build_preprocessor()
         nb, res = preprocessor(nb, res)
         self.assertIn('application/pdf', nb.cells[0].outputs[0].data)
+
+
+    def build_converter(self, tmpdir):
+        """Write a stand-in converter that copies the SVG and logs each call"""
+        script = os.path.join(tmpdir, 'convert.py')
+        with open(script, 'w') as f:
+            f.write(
+                "import shutil, sys\n"
+                "with open(sys.argv[1], 'a') as log: log.write('x')\n"
+                "for name in sys.argv[2:]: shutil.copy(name, name[:-4] + '.pdf')\n"
+            )
+        return '"{}" "{}" "{}"'.format(
+            sys.executable, script, os.path.join(tmpdir, 'calls'))
+
+
+    def count_calls(self, tmpdir):
+        with open(os.path.join(tmpdir, 'calls')) as f:
+            return len(f.read())
+
+
+    def test_batch_cached(self):
+        """Are uncached figures converted in one batch call, and cached?"""
+        with TemporaryDirectory() as tmpdir:
+            nb = self.build_notebook()
+            nb.cells.append(copy.deepcopy(nb.cells[0]))
+            nb.cells[1].outputs[0].data['image/svg+xml'] += '<!-- other -->'
+            preprocessor = self.build_preprocessor()
+            preprocessor.cache_dir = os.path.join(tmpdir, 'cache')
+            preprocessor.batch_command = self.build_converter(tmpdir) + ' {from_filenames}'
+            nb, res = preprocessor(nb, self.build_resources())
+            self.assertEqual(self.count_calls(tmpdir), 1)
+            pdf = base64.decodebytes(nb.cells[1].outputs[0].data['application/pdf'])
+            self.assertTrue(pdf.endswith(b'<!-- other -->'))
+
+            nb, res = preprocessor(self.build_notebook(), self.build_resources())
+            self.assertEqual(self.count_calls(tmpdir), 1)
+            self.assertIn('application/pdf', nb.cells[0].outputs[0].data)
+
+
+    def test_cache_unwritable(self):
+        """Are figures still converted when the cache cannot be written?"""
+        with TemporaryDirectory() as tmpdir:
+            blocker = os.path.join(tmpdir, 'file')
+            open(blocker, 'w').close()
+            preprocessor = self.build_preprocessor()
+            preprocessor.cache_dir = os.path.join(blocker, 'cache')
+            preprocessor.command = self.build_converter(tmpdir) + ' "{from_filename}"'
+            nb, res = preprocessor(self.build_notebook(), self.build_resources())
+            self.assertIn('application/pdf', nb.cells[0].outputs[0].data)
+
+
+    def test_parallel(self):
+        """Are figures converted one call each, with duplicates converted once?"""
+        with TemporaryDirectory() as tmpdir:
+            nb = self.build_notebook()
+            nb.cells.append(copy.deepcopy(nb.cells[0]))
+            nb.cells.append(copy.deepcopy(nb.cells[0]))
+            nb.cells[2].outputs[0].data['image/svg+xml'] += '<!-- other -->'
+            preprocessor = self.build_preprocessor()
+            preprocessor.cache_dir = ''
+            preprocessor.max_workers = 2
+            preprocessor.command = self.build_converter(tmpdir) + ' "{from_filename}"'
+            nb, res = preprocessor(nb, self.build_resources())
+            self.assertEqual(self.count_calls(tmpdir), 2)
+            for cell in nb.cells:
+                self.assertIn('application/pdf', cell.outputs[0].data)
@@ -17,6 +17,9 @@
 <script src="https://cdnjs.cloudflare.com/ajax/libs/require.js/2.1.10/require.min.js"></script>
 <script src="https://cdnjs.cloudflare.com/ajax/libs/jquery/2.0.3/jquery.min.js"></script>
 
+{% for css_file in resources.inlining.css_files -%}
+    <link rel="stylesheet" type="text/css" href="{{ css_file | posix_path }}">
+{% endfor %}
 {% for css in resources.inlining.css -%}
     <style type="text/css">
     {{ css }}
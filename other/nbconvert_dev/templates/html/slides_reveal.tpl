@@ -75,6 +75,9 @@ if( window.location.search.match( /print-pdf/gi ) ) {
 <!-- Get Font-awesome from cdn -->
 <link rel="stylesheet" href="{{resources.reveal.font_awesome_url}}">
 
+{% for css_file in resources.inlining.css_files -%}
+    <link rel="stylesheet" type="text/css" href="{{ css_file | posix_path }}">
+{% endfor %}
 {% for css in resources.inlining.css -%}
     <style type="text/css">
     {{ css }}
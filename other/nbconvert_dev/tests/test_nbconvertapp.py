@@ -69,6 +69,25 @@ class TestNbConvertApp(TestsBase):
             assert os.path.isfile('notebook1.py')
             assert os.path.isfile('notebook2.py')
 
+    def test_parallel_jobs(self):
+        """--jobs converts multiple notebooks with worker processes"""
+        with self.create_temp_cwd(['notebook*.ipynb']):
+            _, err = self.nbconvert('--to python --jobs 2 notebook1.ipynb notebook2.ipynb')
+            assert os.path.isfile('notebook1.py')
+            assert os.path.isfile('notebook2.py')
+            assert err.index('notebook1.ipynb to python in') < err.index('notebook2.ipynb to python in')
+
+    def test_parallel_failure_is_isolated(self):
+        """One notebook failing to convert does not stop the others"""
+        with self.create_temp_cwd(['notebook*.ipynb']):
+            with io.open('bad.ipynb', 'w') as f:
+                f.write(u'{not a notebook')
+            _, err = self.nbconvert('--to python --jobs 2 notebook1.ipynb bad.ipynb notebook2.ipynb',
+                                    ignore_return_code=True)
+            assert os.path.isfile('notebook1.py')
+            assert os.path.isfile('notebook2.py')
+            assert "Error while converting 'bad.ipynb'" in err
+
     def test_convert_full_qualified_name(self):
         """
         Test that nbconvert can convert file using a full qualified name for a
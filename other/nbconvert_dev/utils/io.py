@@ -4,8 +4,13 @@
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import binascii
 import codecs
+import filecmp
+import os
 import sys
+import tempfile
+import weakref
 from ipython_genutils.py3compat import PY3
 
 
@@ -51,3 +56,104 @@ def unicode_stdin_stream():
         stream_b = stream
 
     return codecs.getreader('utf-8')(stream_b)
+
+
+class SpilledOutput(object):
+    """Binary output data kept in a temporary file instead of in memory.
+
+    `ExtractOutputPreprocessor` stores these in ``resources['outputs']``
+    in place of bytes when spilling is enabled. Writers that know about
+    them link the file into place; everything else can call :meth:`read`
+    (or ``bytes()``) to get the data. The file is removed when the object
+    is garbage collected.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._finalizer = weakref.finalize(self, _remove_quietly, path)
+
+    @classmethod
+    def from_base64(cls, text, directory, chunk_size=1 << 20):
+        """Decode base64 `text` into a new file in `directory`, a chunk at a time"""
+        fd, path = _mkstemp(directory)
+        carry = ''
+        with os.fdopen(fd, 'wb') as f:
+            for start in range(0, len(text), chunk_size):
+                chunk = carry + ''.join(text[start:start + chunk_size].split())
+                usable = len(chunk) - len(chunk) % 4
+                f.write(binascii.a2b_base64(chunk[:usable]))
+                carry = chunk[usable:]
+            if carry:
+                # let binascii complain about the incomplete tail
+                f.write(binascii.a2b_base64(carry))
+        return cls(path)
+
+    @classmethod
+    def from_bytes(cls, data, directory):
+        fd, path = _mkstemp(directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return cls(path)
+
+    def __len__(self):
+        return self.size
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    __bytes__ = read
+
+    def __eq__(self, other):
+        if isinstance(other, SpilledOutput):
+            return filecmp.cmp(self.path, other.path, shallow=False)
+        if isinstance(other, bytes):
+            return self.size == len(other) and self.read() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<SpilledOutput %s (%d bytes)>' % (self.path, self.size)
+
+
+_umask = None
+
+
+def _default_file_mode():
+    """The mode files are created with by default: 0666 less the umask"""
+    global _umask
+    if _umask is None:
+        # the umask can only be read by setting it
+        _umask = os.umask(0o022)
+        os.umask(_umask)
+    return 0o666 & ~_umask
+
+
+def _mkstemp(directory):
+    """A new temporary file in `directory`, with the default file mode
+
+    mkstemp creates files readable by their owner only; spilled outputs
+    are linked or copied into place with their mode, and must be as
+    readable as any other written file.
+    """
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.bin')
+    try:
+        os.chmod(path, _default_file_mode())
+    except BaseException:
+        os.close(fd)
+        _remove_quietly(path)
+        raise
+    return fd, path
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,347 @@
+# coding: utf-8
+"""Read notebooks without parsing their outputs until they are used"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import io
+import json
+import mmap
+import re
+import threading
+
+import nbformat
+from nbformat import NotebookNode, from_dict
+from nbformat.v4.rwbase import rejoin_lines, strip_transient
+
+__all__ = ['LazyOutputs', 'read_notebook', 'materialize', 'copy_notebook',
+           'without_unloaded']
+
+_ws = re.compile(br'[ \t\n\r]*')
+_structural = re.compile(br'["\[\]{}]')
+_scalar = re.compile(br'[^,\]}\s]+')
+
+_QUOTE, _BACKSLASH, _OPEN = ord('"'), ord('\\'), (ord('['), ord('{'))
+
+
+def _skip_ws(buf, pos):
+    return _ws.match(buf, pos).end()
+
+
+def _string_end(buf, pos):
+    """The end offset of the JSON string starting at `pos`"""
+    # find() skips the (often huge, base64) contents much faster than a regex
+    end = pos
+    while True:
+        end = buf.find(b'"', end + 1)
+        if end < 0:
+            raise ValueError("Unterminated string at byte %d" % pos)
+        escape = end - 1
+        while buf[escape] == _BACKSLASH:
+            escape -= 1
+        if (end - escape) % 2:
+            return end + 1
+
+
+def _value_end(buf, pos):
+    """The end offset of the JSON value starting at `pos`"""
+    first = buf[pos]
+    if first == _QUOTE:
+        return _string_end(buf, pos)
+    if first in _OPEN:
+        depth = 0
+        search = _structural.search
+        while True:
+            m = search(buf, pos)
+            if m is None:
+                raise ValueError("Unterminated JSON value at byte %d" % pos)
+            c = buf[m.start()]
+            if c == _QUOTE:
+                pos = _string_end(buf, m.start())
+                continue
+            pos = m.end()
+            depth += 1 if c in _OPEN else -1
+            if depth == 0:
+                return pos
+    return _scalar.match(buf, pos).end()
+
+
+def _expect(buf, pos, char):
+    pos = _skip_ws(buf, pos)
+    if buf[pos:pos + 1] != char:
+        raise ValueError("Expected %r at byte %d" % (char, pos))
+    return _skip_ws(buf, pos + 1)
+
+
+def _walk_object(buf, pos, visit):
+    """Call ``visit(key, start)`` for each member of the JSON object at `pos`
+
+    `visit` returns the end offset of the member's value. Returns the end
+    offset of the object.
+    """
+    pos = _expect(buf, pos, b'{')
+    if buf[pos:pos + 1] == b'}':
+        return pos + 1
+    while True:
+        if buf[pos] != _QUOTE:
+            raise ValueError("Expected a key at byte %d" % pos)
+        key_end = _string_end(buf, pos)
+        key = json.loads(buf[pos:key_end].decode('utf-8'))
+        pos = _skip_ws(buf, visit(key, _expect(buf, key_end, b':')))
+        if buf[pos:pos + 1] == b'}':
+            return pos + 1
+        pos = _expect(buf, pos, b',')
+
+
+def _walk_array(buf, pos, visit):
+    """Call ``visit(start)`` for each item of the JSON array at `pos`, as `_walk_object`"""
+    pos = _expect(buf, pos, b'[')
+    if buf[pos:pos + 1] == b']':
+        return pos + 1
+    while True:
+        pos = _skip_ws(buf, visit(pos))
+        if buf[pos:pos + 1] == b']':
+            return pos + 1
+        pos = _expect(buf, pos, b',')
+
+
+def _load(buf, start, end):
+    return json.loads(buf[start:end].decode('utf-8'))
+
+
+def _parse_outputs(data):
+    outputs = from_dict(json.loads(data.decode('utf-8')))
+    # rejoin multiline text as nbformat.read does
+    rejoin_lines(NotebookNode(cells=[NotebookNode(cell_type='code', outputs=outputs)]))
+    return outputs
+
+
+class _SharedMap(object):
+    """The memory map of a notebook file, closed once no unloaded outputs use it"""
+
+    def __init__(self, buf):
+        self.buf = buf
+        self._users = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self._users += 1
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            if self._users == 0:
+                self.close()
+
+    def close(self):
+        # empty files are read into bytes instead of being mapped
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+
+
+class LazyOutputs(list):
+    """
+    The outputs of a code cell, kept as a byte range of the notebook file
+    and parsed the first time the list is used.
+
+    Once loaded it behaves as a plain list. Copies and pickles are plain
+    lists too, so nothing that serializes a notebook sees an unloaded
+    list; :func:`copy_notebook` copies a notebook keeping its outputs lazy.
+    The file stays mapped until every list referring to it is loaded or
+    garbage collected.
+    """
+
+    def __init__(self, buffer, start, end):
+        super(LazyOutputs, self).__init__()
+        buffer.acquire()
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+
+    @property
+    def loaded(self):
+        return self._buffer is None
+
+    @property
+    def nbytes(self):
+        """The size of the outputs in the notebook file"""
+        return self._end - self._start
+
+    def load(self):
+        if self._buffer is not None:
+            buffer, self._buffer = self._buffer, None
+            try:
+                data = buffer.buf[self._start:self._end]
+            finally:
+                buffer.release()
+            list.extend(self, _parse_outputs(data))
+        return self
+
+    def lazy_copy(self):
+        """A copy that is still unloaded if this list is"""
+        if self._buffer is None:
+            return copy.deepcopy(list(self))
+        return LazyOutputs(self._buffer, self._start, self._end)
+
+    def __copy__(self):
+        return list(self.load())
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(list(self.load()), memo)
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self.load()),)
+
+    def __bool__(self):
+        if self._buffer is not None:
+            # whether there is anything but whitespace between the brackets
+            return _skip_ws(self._buffer.buf, self._start + 1) < self._end - 1
+        return list.__len__(self) > 0
+
+    __nonzero__ = __bool__
+
+    def __del__(self):
+        if getattr(self, '_buffer', None) is not None:
+            self._buffer.release()
+
+    def __repr__(self):
+        if self._buffer is not None:
+            return '<LazyOutputs: %d bytes, not loaded>' % self.nbytes
+        return list.__repr__(self)
+
+
+def _loading(name):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self.load()
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+for _name in (
+    '__contains__', '__delitem__', '__eq__', '__ge__', '__getitem__',
+    '__gt__', '__iadd__', '__imul__', '__iter__', '__le__', '__len__',
+    '__lt__', '__mul__', '__ne__', '__reversed__', '__rmul__',
+    '__setitem__', 'append', 'clear', 'copy', 'count', 'extend',
+    'index', 'insert', 'pop', 'remove', 'reverse', 'sort',
+):
+    setattr(LazyOutputs, _name, _loading(_name))
+
+def _add(self, other):
+    return list(self.load()) + other
+
+LazyOutputs.__add__ = _add
+
+
+def _map(filename):
+    with io.open(filename, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            return f.read()
+
+
+def read_notebook(filename, as_version=4):
+    """Read a notebook file, leaving the outputs of code cells unparsed
+
+    Everything but the outputs is parsed as :func:`nbformat.read` does.
+    The outputs of each code cell are a :class:`LazyOutputs` referring to
+    a memory map of the file, and are parsed when first used; outputs that
+    are replaced or dropped (e.g. by ClearOutputPreprocessor) are never
+    parsed. The memory map is closed once all outputs are loaded or
+    dropped. The file must not be modified in place while the notebook is
+    in use. Notebooks that are not in format `as_version` are read fully.
+
+    The notebook is not validated; call :func:`materialize` before
+    writing it with :func:`json.dumps` directly.
+    """
+    buf = _map(filename)
+    top = {}
+    cells = []
+    outputs = []
+
+    def visit_cell(pos):
+        cell = {}
+
+        def visit_member(key, start):
+            end = _value_end(buf, start)
+            if key == 'outputs':
+                outputs.append((len(cells), start, end))
+            else:
+                cell[key] = _load(buf, start, end)
+            return end
+        end = _walk_object(buf, pos, visit_member)
+        cells.append(from_dict(cell))
+        return end
+
+    def visit_top(key, start):
+        if key == 'cells':
+            return _walk_array(buf, start, visit_cell)
+        end = _value_end(buf, start)
+        top[key] = _load(buf, start, end)
+        return end
+
+    shared = _SharedMap(buf)
+    try:
+        _walk_object(buf, 0, visit_top)
+    except Exception:
+        shared.close()
+        raise
+    if top.get('nbformat') != as_version or as_version != 4:
+        shared.close()
+        with io.open(filename, encoding='utf-8') as f:
+            return nbformat.read(f, as_version=as_version)
+    if not outputs:
+        shared.close()
+
+    nb = from_dict(top)
+    nb.cells = cells
+    rejoin_lines(nb)
+    strip_transient(nb)
+    for index, start, end in outputs:
+        cells[index]['outputs'] = LazyOutputs(shared, start, end)
+    return nb
+
+
+def materialize(nb):
+    """Parse all lazy outputs of `nb`, in place; returns `nb`"""
+    for cell in nb.cells:
+        outputs = cell.get('outputs')
+        if isinstance(outputs, LazyOutputs):
+            cell['outputs'] = list(outputs.load())
+    return nb
+
+
+def copy_notebook(nb):
+    """A deep copy of `nb`, sharing the file of outputs that are not loaded yet"""
+    memo = {}
+    for cell in nb.cells:
+        outputs = cell.get('outputs')
+        if isinstance(outputs, LazyOutputs) and not outputs.loaded:
+            memo[id(outputs)] = outputs.lazy_copy()
+    return copy.deepcopy(nb, memo)
+
+
+def without_unloaded(nb):
+    """A shallow copy of `nb` with unloaded outputs left out, for validation
+
+    Returns `nb` itself if none of its outputs are unloaded. Outputs that
+    were never loaded are as read from the file, so nothing changed them.
+    """
+    if not any(isinstance(cell.get('outputs'), LazyOutputs) and not cell['outputs'].loaded
+               for cell in nb.cells):
+        return nb
+    view = NotebookNode(nb)
+    view.cells = []
+    for cell in nb.cells:
+        outputs = cell.get('outputs')
+        if isinstance(outputs, LazyOutputs) and not outputs.loaded:
+            cell = NotebookNode(cell)
+            cell.outputs = []
+        view.cells.append(cell)
+    return view
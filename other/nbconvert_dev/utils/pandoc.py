@@ -4,9 +4,14 @@
 
 from __future__ import print_function, absolute_import
 
+import hashlib
+import json
 import subprocess
+import threading
+import uuid
 import warnings
 import re
+from collections import OrderedDict
 from io import TextIOWrapper, BytesIO
 
 from nbconvert.utils.version import check_version
@@ -16,6 +21,23 @@ from .exceptions import ConversionException
 
 _minimal_version = "1.12.1"
 
+#: The number of conversions kept by :func:`pandoc`
+cache_size = 1024
+
+def _cache_key(source, fmt, to, extra_args, encoding):
+    h = hashlib.sha1(u'\0'.join([fmt, to, encoding] + list(extra_args or ())).encode('utf-8'))
+    h.update(b'\0')
+    h.update(source.encode('utf-8'))
+    return h.hexdigest()
+
+
+def _cache_put(key, out):
+    with _cache_lock:
+        _results[key] = out
+        while len(_results) > cache_size:
+            _results.popitem(last=False)
+
+
 def pandoc(source, fmt, to, extra_args=None, encoding='utf-8'):
     """Convert an input string using pandoc.
 
@@ -42,21 +64,188 @@ def pandoc(source, fmt, to, extra_args=None, encoding='utf-8'):
     
     Any error messages generated by pandoc are printed to stderr.
 
-    """
-    cmd = ['pandoc', '-f', fmt, '-t', to]
-    if extra_args:
-        cmd.extend(extra_args)
+    The last `cache_size` results are cached, keyed by a hash of the
+    source, the formats, the extra arguments and the encoding.
 
+    """
     # this will raise an exception that will pop us out of here
     check_pandoc_version()
-    
+
+    key = _cache_key(source, fmt, to, extra_args, encoding)
+    with _cache_lock:
+        out = _results.get(key)
+        if out is not None:
+            _results.move_to_end(key)
+            return out
+
     # we can safely continue
+    out = _run_pandoc(source, fmt, to, extra_args, encoding)
+    _cache_put(key, out)
+    return out
+
+
+def _run_pandoc(source, fmt, to, extra_args=None, encoding='utf-8'):
+    cmd = ['pandoc', '-f', fmt, '-t', to]
+    if extra_args:
+        cmd.extend(extra_args)
     p = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
     out, _ = p.communicate(cast_bytes(source, encoding))
     out = TextIOWrapper(BytesIO(out), encoding, 'replace').read()
     return out.rstrip('\n')
 
 
+def pandoc_batch(sources, fmt, to, extra_args=None, encoding='utf-8'):
+    """Convert several input strings with as few pandoc runs as possible.
+
+    The sources are joined with unique separator paragraphs, converted
+    in one pandoc invocation and split apart again. Sources that could
+    interact once joined are converted in separate runs: the ones that
+    define footnotes or link references, and ones whose headings would
+    get the same identifier as a heading in another source of the run.
+    If the output does not split into as many pieces as there were
+    sources, each source is converted on its own instead.
+
+    Results are returned in the order of `sources` and are cached like
+    the results of :func:`pandoc`, so later calls of :func:`pandoc` with
+    the same arguments are served from the cache.
+
+    Parameters
+    ----------
+    sources : list of strings
+      Input strings, assumed to be valid format `fmt`.
+    fmt : string
+      The name of the input format (markdown, json, etc.)
+    to : string
+      The name of the output format (latex, json, etc.)
+
+    Returns
+    -------
+    out : list of unicode
+      The output for each source, as :func:`pandoc` would return it.
+    """
+    check_pandoc_version()
+
+    results = [None] * len(sources)
+    pending = OrderedDict()
+    with _cache_lock:
+        for index, source in enumerate(sources):
+            key = _cache_key(source, fmt, to, extra_args, encoding)
+            if key in _results:
+                results[index] = _results[key]
+            else:
+                pending.setdefault(key, (source, []))[1].append(index)
+
+    pending = list(pending.items())
+    for group in _batch_groups([source for _, (source, _) in pending], fmt):
+        entries = [pending[i] for i in group]
+        outputs = None
+        if len(entries) > 1:
+            outputs = _convert_joined([source for _, (source, _) in entries],
+                                      fmt, to, extra_args, encoding)
+        if outputs is None:
+            outputs = [_run_pandoc(source, fmt, to, extra_args, encoding)
+                       for _, (source, _) in entries]
+        for (key, (_, indices)), out in zip(entries, outputs):
+            _cache_put(key, out)
+            for index in indices:
+                results[index] = out
+    return results
+
+
+# Sources with footnotes, link reference definitions, metadata blocks
+# (or rules that look like one) and title blocks are never joined with others
+_ISOLATE_RE = re.compile(r'\[\^|^ {0,3}\[[^\]]+\]:|^---[ \t]*$|\A%', re.MULTILINE)
+_HEADING_RE = re.compile(r'^ {0,3}#{1,6}[ \t]+(.*?)[ \t#]*$|^(.+)\n(?:=+|-+)[ \t]*$', re.MULTILINE)
+
+
+def _heading_ids(source):
+    """Approximate the identifiers pandoc gives to the headings of `source`"""
+    ids = set()
+    for m in _HEADING_RE.finditer(source):
+        text = (m.group(1) or m.group(2) or '').lower()
+        text = re.sub(r'[^\w\s.-]', '', text, flags=re.UNICODE)
+        ids.add(re.sub(r'\s+', '-', text.strip()))
+    return ids
+
+
+def _batch_groups(sources, fmt):
+    """Split the indices of `sources` into groups that are safe to join"""
+    if fmt.split('+')[0].split('-')[0] != 'markdown':
+        # only markdown sources are inspected; json carries its identifiers
+        return [list(range(len(sources)))] if fmt == 'json' else [[i] for i in range(len(sources))]
+    groups = []
+    joined, seen = [], set()
+    for index, source in enumerate(sources):
+        if _ISOLATE_RE.search(source):
+            groups.append([index])
+            continue
+        ids = _heading_ids(source)
+        if ids & seen:
+            groups.append(joined)
+            joined, seen = [], set()
+        joined.append(index)
+        seen |= ids
+    if joined:
+        groups.append(joined)
+    return groups
+
+
+def _convert_joined(sources, fmt, to, extra_args, encoding):
+    """Convert `sources` in one pandoc run; None if the output does not split"""
+    token = 'nbconvertseparator' + uuid.uuid4().hex
+    if any(token in source for source in sources):
+        return None
+    separator = {'t': 'Para', 'c': [{'t': 'Str', 'c': token}]}
+
+    if fmt == 'json':
+        try:
+            docs = [json.loads(source) for source in sources]
+        except ValueError:
+            return None
+        blocks = []
+        for doc in docs:
+            if blocks:
+                blocks.append(separator)
+            blocks.extend(_json_blocks(doc))
+        source = json.dumps(_json_with_blocks(docs[0], blocks))
+    else:
+        source = (u'\n\n%s\n\n' % token).join(sources)
+
+    out = _run_pandoc(source, fmt, to, extra_args, encoding)
+
+    if to == 'json':
+        try:
+            doc = json.loads(out)
+        except ValueError:
+            return None
+        pieces = [[]]
+        for block in _json_blocks(doc):
+            if block == separator:
+                pieces.append([])
+            else:
+                pieces[-1].append(block)
+        outputs = [json.dumps(_json_with_blocks(doc, piece)) for piece in pieces]
+    else:
+        outputs = [piece.strip('\n') for piece in
+                   re.split(r'^[^\n]*%s[^\n]*$' % token, out, flags=re.MULTILINE)]
+    if len(outputs) != len(sources):
+        return None
+    return outputs
+
+
+def _json_blocks(doc):
+    # pandoc < 1.18 writes [meta, blocks], later versions an object
+    return doc['blocks'] if isinstance(doc, dict) else doc[1]
+
+
+def _json_with_blocks(doc, blocks):
+    if isinstance(doc, dict):
+        doc = dict(doc, blocks=blocks)
+    else:
+        doc = [doc[0], blocks]
+    return doc
+
+
 def get_pandoc_version():
     """Gets the Pandoc version if Pandoc is installed.
     
@@ -93,12 +282,16 @@ def check_pandoc_version():
     PandocMissing
       If pandoc is unavailable.
     """
+    global __version_checked
     v = get_pandoc_version()
+    if __version_checked is not None and __version_checked[:2] == (v, _minimal_version):
+        return __version_checked[2]
     if v is None:
         warnings.warn("Sorry, we cannot determine the version of pandoc.\n"
                       "Please consider reporting this issue and include the"
                       "output of pandoc --version.\nContinuing...",
                       RuntimeWarning, stacklevel=2)
+        __version_checked = (v, _minimal_version, False)
         return False
     ok = check_version(v , _minimal_version )
     if not ok:
@@ -106,6 +299,7 @@ def check_pandoc_version():
                        "Recommended version is %s.\nTry updating." % _minimal_version + 
                        "http://pandoc.org/installing.html.\nContinuing with doubts...",
                        RuntimeWarning, stacklevel=2)
+    __version_checked = (v, _minimal_version, ok)
     return ok
 
 #-----------------------------------------------------------------------------
@@ -122,7 +316,13 @@ class PandocMissing(ConversionException):
 # Internal state management
 #-----------------------------------------------------------------------------
 def clean_cache():
-    global __version
+    global __version, __version_checked
     __version = None
+    __version_checked = None
+    with _cache_lock:
+        _results.clear()
 
 __version = None
+__version_checked = None
+_results = OrderedDict()
+_cache_lock = threading.Lock()
@@ -0,0 +1,96 @@
+# encoding: utf-8
+"""Tests for utils.lazynb"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import copy
+import io
+import os
+import pickle
+
+import nbformat
+from nbformat import v4
+from testpath.tempdir import TemporaryDirectory
+
+from ..lazynb import LazyOutputs, copy_notebook, materialize, read_notebook
+from ...preprocessors.clearoutput import ClearOutputPreprocessor
+
+files = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                     'preprocessors', 'tests', 'files')
+
+
+def _read(filename):
+    with io.open(filename, encoding='utf-8') as f:
+        return nbformat.read(f, as_version=4)
+
+
+def test_same_as_nbformat():
+    for name in os.listdir(files):
+        if name.endswith('.ipynb'):
+            filename = os.path.join(files, name)
+            assert read_notebook(filename) == _read(filename), name
+
+
+def test_outputs_parsed_on_use():
+    with TemporaryDirectory() as tmpdir:
+        nb = v4.new_notebook(cells=[
+            v4.new_markdown_cell(u'# ł ["]'),
+            v4.new_code_cell('1', outputs=[
+                v4.new_output('stream', text=u'a [{"\n'),
+                v4.new_output('display_data', data={'image/png': 'iVBOR' * 1000}),
+            ]),
+            v4.new_code_cell('2'),
+        ])
+        filename = os.path.join(tmpdir, 'lazy.ipynb')
+        with io.open(filename, 'w', encoding='utf-8') as f:
+            nbformat.write(nb, f)
+
+        lazy = read_notebook(filename)
+        outputs = lazy.cells[1].outputs
+        assert isinstance(outputs, LazyOutputs) and not outputs.loaded
+        assert lazy.cells[0].source == u'# ł ["]'
+        # truth values are known without parsing
+        assert outputs and not lazy.cells[2].outputs
+        assert not outputs.loaded
+
+        cleared, _ = ClearOutputPreprocessor(enabled=True)(copy_notebook(lazy), {})
+        assert cleared.cells[1].outputs == []
+        assert not outputs.loaded
+
+        copied = copy_notebook(lazy)
+        assert not copied.cells[1].outputs.loaded
+        assert copied.cells[1].outputs is not outputs
+
+        assert outputs[0].text == u'a [{"\n'
+        assert outputs.loaded
+        assert lazy == nb
+
+        # plain copies never carry unloaded outputs
+        fresh = read_notebook(filename)
+        assert type(copy.deepcopy(fresh).cells[1].outputs) is list
+        assert pickle.loads(pickle.dumps(read_notebook(filename))) == nb
+        assert nbformat.writes(fresh) == nbformat.writes(nb)
+        assert type(materialize(read_notebook(filename)).cells[2].outputs) is list
+
+
+def test_file_closed_when_loaded():
+    with TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'lazy.ipynb')
+        nb = v4.new_notebook(cells=[
+            v4.new_code_cell('1', outputs=[v4.new_output('stream', text=u'1\n')]),
+            v4.new_code_cell('2', outputs=[v4.new_output('stream', text=u'2\n')]),
+        ])
+        with io.open(filename, 'w', encoding='utf-8') as f:
+            nbformat.write(nb, f)
+
+        lazy = read_notebook(filename)
+        mapped = lazy.cells[0].outputs._buffer.buf
+        copied = copy_notebook(lazy)
+        materialize(lazy)
+        assert not mapped.closed
+        # the copy still needs the file, until it is loaded or dropped
+        assert copied.cells[1].outputs[0].text == u'2\n'
+        assert not mapped.closed
+        del copied
+        assert mapped.closed
@@ -60,6 +60,47 @@ class TestPandoc(TestsBase):
         pandoc._minimal_version = pandoc.get_pandoc_version()
         assert pandoc.check_pandoc_version()
 
+    @dec.onlyif_cmds_exist('pandoc')
+    def test_pandoc_batch(self):
+        """Does a batch convert like one pandoc run per source?"""
+        pandoc.clean_cache()
+        sources = [
+            "# Title\n\nSome *text*.",
+            "* a list\n* with `code`",
+            "# Title\n\nThe same heading again.",
+            "A footnote[^1].\n\n[^1]: The note.",
+            "$$x^2$$",
+        ]
+        batched = pandoc.pandoc_batch(sources, 'markdown', 'latex')
+        single = [pandoc._run_pandoc(source, 'markdown', 'latex') for source in sources]
+        self.assertEqual(batched, single)
+        # the results are cached
+        self.assertEqual(pandoc.pandoc(sources[1], 'markdown', 'latex'), single[1])
+
+        docs = pandoc.pandoc_batch(sources, 'markdown', 'json')
+        self.assertEqual(pandoc.pandoc_batch(docs, 'json', 'latex'), single)
+
+    def test_cache_key(self):
+        """Are results decoded with other encodings cached apart?"""
+        key = pandoc._cache_key(u'é', 'markdown', 'latex', None, 'utf-8')
+        self.assertEqual(key, pandoc._cache_key(u'é', 'markdown', 'latex', [], 'utf-8'))
+        self.assertNotEqual(key, pandoc._cache_key(u'é', 'markdown', 'latex', None, 'latin-1'))
+
+    def test_batch_groups(self):
+        """Are sources that would interact converted apart?"""
+        sources = [
+            "# Intro\ntext",
+            "more text",
+            "Intro\n=====",
+            "a note[^1]",
+            "[link]: http://example.com",
+            "## Other",
+        ]
+        self.assertEqual(pandoc._batch_groups(sources, 'markdown+tex_math_double_backslash'),
+                         [[0, 1], [3], [4], [2, 5]])
+        self.assertEqual(pandoc._batch_groups(sources, 'html'),
+                         [[0], [1], [2], [3], [4], [5]])
+
 
 def pandoc_function_raised_missing(f, *args, **kwargs):
     try:
@@ -11,6 +11,7 @@ from traitlets import Unicode, observe
 from ipython_genutils.path import link_or_copy, ensure_dir_exists
 from ipython_genutils.py3compat import unicode_type
 
+from ..utils.io import SpilledOutput
 from .base import WriterBase
 
 
@@ -76,6 +77,7 @@ class FilesWriter(WriterBase):
             # PREPROCESSOR SHOULD HANDLE UNIX/WINDOWS LINE ENDINGS...
 
             items = resources.get('outputs', {}).items()
+            digests = resources.get('output_digests', {})
             if items:
                 self.log.info("Support files will be in %s", os.path.join(resources.get('output_files_dir',''), ''))
             for filename, data in items:
@@ -85,8 +87,18 @@ class FilesWriter(WriterBase):
                 path = os.path.dirname(dest)
                 self._makedir(path)
 
+                # Files named by the digest of their contents are never rewritten
+                if filename in digests and os.path.isfile(dest) \
+                        and os.path.getsize(dest) == len(data):
+                    self.log.debug("Support file %s is up to date", dest)
+                    continue
+
                 # Write file
                 self.log.debug("Writing %i bytes to support file %s", len(data), dest)
+                if isinstance(data, SpilledOutput):
+                    # Already on disk; link it into place instead of copying it through memory
+                    link_or_copy(data.path, dest)
+                    continue
                 with io.open(dest, 'wb') as f:
                     f.write(data)
 
@@ -121,12 +133,20 @@ class FilesWriter(WriterBase):
             dest = os.path.join(build_directory, dest)
 
             # Write conversion results.
-            self.log.info("Writing %i bytes to %s", len(output), dest)
-            if isinstance(output, unicode_type):
-                with io.open(dest, 'w', encoding='utf-8') as f:
-                    f.write(output)
+            if isinstance(output, (unicode_type, bytes)):
+                self.log.info("Writing %i bytes to %s", len(output), dest)
+                if isinstance(output, unicode_type):
+                    with io.open(dest, 'w', encoding='utf-8') as f:
+                        f.write(output)
+                else:
+                    with io.open(dest, 'wb') as f:
+                        f.write(output)
             else:
-                with io.open(dest, 'wb') as f:
-                    f.write(output)
-                
+                # A streamed render (see TemplateExporter.stream_output):
+                # write the chunks as the template produces them.
+                self.log.info("Writing to %s", dest)
+                with io.open(dest, 'w', encoding='utf-8') as f:
+                    for chunk in output:
+                        f.write(chunk)
+
             return dest
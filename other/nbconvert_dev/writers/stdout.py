@@ -5,6 +5,8 @@ Contains Stdout writer
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+from ipython_genutils.py3compat import unicode_type
+
 from nbconvert.utils import io
 from .base import WriterBase
 
@@ -20,4 +22,10 @@ class StdoutWriter(WriterBase):
 
         See base for more...
         """
-        io.unicode_std_stream().write(output)
+        stream = io.unicode_std_stream()
+        if isinstance(output, (unicode_type, bytes)):
+            stream.write(output)
+        else:
+            # a streamed render, see TemplateExporter.stream_output
+            for chunk in output:
+                stream.write(chunk)
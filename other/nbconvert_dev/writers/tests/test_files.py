@@ -5,9 +5,12 @@ Module with tests for files
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import io
 import os
+import stat
 
 from ...tests.base import TestsBase
+from ...utils.io import SpilledOutput
 from ..files import FilesWriter
 
 
@@ -299,3 +302,59 @@ class Testfiles(TestsBase):
             with open(dest, 'r') as f:
                 output = f.read()
                 self.assertEqual(output, 'd')
+
+    def test_spilled_output(self):
+        """Does the FilesWriter move spilled outputs into place?"""
+
+        # Work in a temporary directory.
+        with self.create_temp_cwd():
+
+            spilled = SpilledOutput.from_bytes(b'g', '.')
+            res = {'outputs': {os.path.join('z_files', 'a'): spilled}}
+
+            writer = FilesWriter()
+            writer.write(u'y', res, notebook_name="z")
+
+            dest = os.path.join('z_files', 'a')
+            assert os.path.isfile(dest)
+            with open(dest, 'rb') as f:
+                self.assertEqual(f.read(), b'g')
+
+            # as readable as the files the writer creates itself
+            self.assertEqual(stat.S_IMODE(os.stat(dest).st_mode),
+                             stat.S_IMODE(os.stat('z').st_mode))
+
+    def test_streamed_output(self):
+        """Can FilesWriter write output that arrives in chunks?"""
+
+        # Work in a temporary directory.
+        with self.create_temp_cwd():
+
+            writer = FilesWriter()
+            writer.write(iter([u'y', u'é', u'z']), {}, notebook_name="z")
+
+            with io.open('z', encoding='utf-8') as f:
+                self.assertEqual(f.read(), u'yéz')
+
+    def test_content_addressed_output(self):
+        """Does the FilesWriter leave existing content addressed files alone?"""
+
+        # Work in a temporary directory.
+        with self.create_temp_cwd():
+
+            os.mkdir('z_files')
+            existing = os.path.join('z_files', 'abc.png')
+            with open(existing, 'wb') as f:
+                f.write(b'x')
+            res = {
+                'outputs': {existing: b'g', os.path.join('z_files', 'def.png'): b'h'},
+                'output_digests': {existing: 'abc', os.path.join('z_files', 'def.png'): 'def'},
+            }
+
+            writer = FilesWriter()
+            writer.write(u'y', res, notebook_name="z")
+
+            with open(existing, 'rb') as f:
+                self.assertEqual(f.read(), b'x')
+            with open(os.path.join('z_files', 'def.png'), 'rb') as f:
+                self.assertEqual(f.read(), b'h')
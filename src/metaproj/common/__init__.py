@@ -4,9 +4,14 @@ from __future__ import annotations
 
 __all__ = ['autofix',
            'base',
+           'budget',
            'config',
+           'daemon',
            'exceptions',
            'full_repo_metadata',
            'report',
+           'resourceobserver',
+           'taskhandle',
            'testing',
-           'utils']
+           'utils',
+           'watch']
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-file lint budgets and the slow-file quarantine.
+
+A single pathological file (a giant generated table, a deeply nested expression) can stall a
+whole lint job. A :class:`LintBudget` bounds the wall time and memory growth allowed for
+parsing one file and for visiting it with the rules; :meth:`LintBudget.start` returns a
+:class:`BudgetMeter` that guards each of these phases and raises
+:class:`~.exceptions.LintBudgetExceededError` once a limit is crossed.
+
+Files that blew their budget are recorded in a :class:`Quarantine` together with the digest of
+their contents. Later runs skip them, or lint them last with a relaxed budget, until the contents
+change. :func:`lint_file_within_budget` lints one file this way; the daemon applies the same
+phases to the modules it keeps parsed.
+
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import libcst as cst
+from attr import dataclass, evolve
+from fixit.rule_lint_engine import lint_file
+from libcst.metadata import MetadataWrapper
+from loguru import logger
+
+from .config import LintConfig
+from .exceptions import LintBudgetExceededError
+from .report import BaseLintRuleReport, LintBudgetFailureReport
+from .utils import LintRuleCollectionT
+
+try:
+	import resource
+except ImportError:  # pragma: no cover - not available on windows
+	resource = None
+
+QUARANTINE_FILE_NAME: Path = Path(".fixit.quarantine.json")
+DEFAULT_TIME_BUDGET: float = 10.0
+DEFAULT_MEMORY_BUDGET: int = 1024 * 1024 * 1024
+#: Budgets are multiplied by this factor when quarantined files are retried on the slow lane.
+QUARANTINE_BUDGET_FACTOR: int = 4
+
+def source_digest(source: bytes) -> str:
+	return hashlib.blake2b(source, digest_size=16).hexdigest()
+
+def _rss() -> int:
+	"""The resident set size of this process in bytes, or 0 if it cannot be read."""
+	try:
+		with open("/proc/self/statm", "rb") as f:
+			return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+	except (OSError, ValueError, IndexError):
+		pass
+	if resource is None:
+		return 0
+	# Peak rather than current usage, but still good enough to catch runaway growth.
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return peak if sys.platform == "darwin" else peak * 1024
+
+@dataclass(frozen=True)
+class LintBudget:
+	"""
+	Limits for linting a single file. ``None`` disables a limit.
+
+	:param float seconds: wall time allowed for parsing and visiting one file
+	:param int memory: bytes the process may grow by while one file is processed
+	"""
+	seconds: Optional[float] = DEFAULT_TIME_BUDGET
+	memory: Optional[int] = DEFAULT_MEMORY_BUDGET
+
+	def start(self, path: str) -> BudgetMeter:
+		return BudgetMeter(self, path)
+
+	def relaxed(self, factor: int = QUARANTINE_BUDGET_FACTOR) -> LintBudget:
+		"""The budget for the low-priority lane of quarantined files."""
+		return evolve(
+				self,
+				seconds=None if self.seconds is None else self.seconds * factor,
+				memory=None if self.memory is None else self.memory * factor,
+		)
+
+class BudgetMeter:
+	"""
+	Tracks the time and memory one file has used against a :class:`LintBudget`.
+
+	Enforcement is per phase. The rules are visited by ``fixit``'s engine, which offers no hook
+	into its visit, so the time budget interrupts a phase through ``SIGALRM``, which :meth:`guard`
+	arms when it runs on the main thread (as the daemon does). Memory is checked when a phase
+	ends, and so is time off the main thread. The native parser cannot be interrupted at all; an
+	overrun parse is noticed once it returns, and the file is quarantined all the same.
+	"""
+
+	def __init__(self, budget: LintBudget, path: str) -> None:
+		self.budget = budget
+		self.path = path
+		self.started = time.monotonic()
+		self.deadline = None if budget.seconds is None else self.started + budget.seconds
+		self.baseline_rss = _rss() if budget.memory is not None else 0
+		self.phase = "parse"
+
+	@property
+	def elapsed(self) -> float:
+		return time.monotonic() - self.started
+
+	def _exceeded(self, kind: str, used: float, limit: float) -> LintBudgetExceededError:
+		return LintBudgetExceededError(path=self.path, phase=self.phase, kind=kind, used=used, limit=limit)
+
+	def check(self) -> None:
+		if self.deadline is not None and time.monotonic() > self.deadline:
+			raise self._exceeded("time", round(self.elapsed, 3), self.budget.seconds)
+		if self.budget.memory is not None:
+			grown = _rss() - self.baseline_rss
+			if grown > self.budget.memory:
+				raise self._exceeded("memory", grown, self.budget.memory)
+
+	@contextlib.contextmanager
+	def guard(self, phase: str) -> Iterator[BudgetMeter]:
+		"""Run ``phase`` under this meter and check it once more when the phase ends."""
+		self.phase = phase
+		armed = (
+				self.deadline is not None
+				and hasattr(signal, "setitimer")
+				and threading.current_thread() is threading.main_thread()
+		)
+		if armed:
+			def on_alarm(signum: int, frame: Any) -> None:
+				raise self._exceeded("time", round(self.elapsed, 3), self.budget.seconds)
+
+			previous = signal.signal(signal.SIGALRM, on_alarm)
+			signal.setitimer(signal.ITIMER_REAL, max(self.deadline - time.monotonic(), 1e-3))
+		try:
+			yield self
+		finally:
+			if armed:
+				signal.setitimer(signal.ITIMER_REAL, 0)
+				signal.signal(signal.SIGALRM, previous)
+		self.check()
+
+class Quarantine:
+	"""
+	Paths whose contents blew their :class:`LintBudget`, keyed by a digest of those contents.
+
+	An entry only applies while the file still has the recorded digest; any edit releases it.
+
+	:param Path path: the JSON file entries are persisted to, or ``None`` to keep them in memory
+	"""
+
+	def __init__(self, path: Optional[Path] = None) -> None:
+		self.path = path
+		self.entries: Dict[str, Dict[str, Any]] = {}
+		if path is not None and path.is_file():
+			try:
+				self.entries = json.loads(path.read_text())
+			except (OSError, ValueError) as e:
+				logger.warning("Ignoring unreadable quarantine file {}: {}", path, e)
+
+	@classmethod
+	def for_repo(cls, repo_root: str) -> Quarantine:
+		return cls(Path(repo_root) / QUARANTINE_FILE_NAME)
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+	def __contains__(self, path: str) -> bool:
+		return path in self.entries
+
+	def is_quarantined(self, path: str, digest: str) -> bool:
+		entry = self.entries.get(path)
+		if entry is None:
+			return False
+		if entry["digest"] != digest:
+			self.release(path)
+			return False
+		return True
+
+	def add(self, path: str, digest: str, error: LintBudgetExceededError) -> None:
+		self.entries[path] = {
+				"digest": digest,
+				"phase": error.phase,
+				"kind": error.kind,
+				"used": error.used,
+				"limit": error.limit,
+		}
+		self.save()
+
+	def release(self, path: str) -> None:
+		if self.entries.pop(path, None) is not None:
+			self.save()
+
+	def partition(self, files: Iterable[Tuple[str, str]]) -> Tuple[List[str], List[str]]:
+		"""Split ``(path, digest)`` pairs into paths to lint now and quarantined paths."""
+		regular, quarantined = [], []
+		for path, digest in files:
+			(quarantined if self.is_quarantined(path, digest) else regular).append(path)
+		return regular, quarantined
+
+	def save(self) -> None:
+		if self.path is None:
+			return
+		tmp = self.path.with_name(self.path.name + ".tmp")
+		tmp.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+		os.replace(tmp, self.path)
+
+def lint_file_within_budget(
+		file_path: Path,
+		source: bytes,
+		*,
+		rules: LintRuleCollectionT,
+		config: LintConfig,
+		budget: Optional[LintBudget] = None,
+		quarantine: Optional[Quarantine] = None,
+		retry_quarantined: bool = False,
+		metadata_cache: Optional[Mapping[Any, object]] = None,
+		**kwargs: Any,
+) -> Collection[BaseLintRuleReport]:
+	"""
+	``fixit``'s ``lint_file`` within a per-file ``budget``: ``source`` is parsed in the ``parse``
+	phase and the rules are visited (by ``_visit_cst_rules_with_context``) in the ``lint`` phase.
+
+	A file that runs past the budget is added to ``quarantine`` and reported as a single
+	:class:`~.report.LintBudgetFailureReport`. While its contents stay the same, later calls return
+	that report without linting, or lint it with a relaxed budget if ``retry_quarantined`` is set.
+	Other keyword arguments are passed on to ``lint_file``.
+	"""
+	path = str(file_path)
+	digest = source_digest(source)
+	quarantined = quarantine is not None and quarantine.is_quarantined(path, digest)
+	if quarantined and not retry_quarantined:
+		return LintBudgetFailureReport.create_reports(Path(path), "quarantined", **quarantine.entries[path])
+	budget = budget or LintBudget()
+	meter = (budget.relaxed() if quarantined else budget).start(path)
+	try:
+		with meter.guard("parse"):
+			module = cst.parse_module(source)
+		wrapper = MetadataWrapper(module, unsafe_skip_copy=True, cache=metadata_cache or {})
+		with meter.guard("lint"):
+			reports = lint_file(Path(file_path), source, rules=rules, config=config, cst_wrapper=wrapper, **kwargs)
+	except LintBudgetExceededError as e:
+		if quarantine is not None:
+			quarantine.add(path, digest, e)
+		logger.warning("Quarantined {}", e)
+		return [LintBudgetFailureReport.from_error(e, digest)]
+	if quarantined:
+		quarantine.release(path)
+	return reports
+
+
+__all__ = sorted(
+		[getattr(v, '__name__', k)
+		 for k, v in list(globals().items())  # export
+		 if ((callable(v) and getattr(v, "__module__", "") == __name__  # callables from this module
+		      or k.isupper()) and  # or CONSTANTS
+		     not str(getattr(v, '__name__', k)).startswith('__'))]
+)  # neither marked internal
+
+if __name__ == '__main__':
+	print(__file__)
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Long-lived lint daemon for editors.
+
+Running the CLI on every save re-imports every rule and re-parses every file. The
+:class:`LintDaemon` keeps the rule set from :func:`~.config.get_rules_from_config`, the parsed
+modules and their resolved metadata in memory, and only re-lints the files it is told about.
+
+Requests and replies are newline-delimited JSON objects, read from stdin or a local unix socket::
+
+	{"method": "lint", "path": "pkg/mod.py"}
+	{"method": "lint", "path": "pkg/mod.py", "source": "<unsaved editor buffer>"}
+	{"method": "changed", "paths": ["pkg/a.py", "pkg/b.py"]}
+	{"method": "stats"}
+	{"method": "shutdown"}
+
+Parsed modules are kept in a :class:`ModuleCache`, an LRU bounded by an estimated memory budget.
+Each file is parsed and linted within a per-file :class:`~.budget.LintBudget`; files that run past it
+are quarantined until their contents change, see :mod:`~.budget`.
+With ``--watch DIR`` the daemon instead re-lints files under ``DIR`` as they change, see :func:`watch`.
+
+"""
+from __future__ import annotations
+
+import json
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+import click
+import libcst as cst
+from attr import dataclass
+from fixit.rule_lint_engine import lint_file
+from libcst.metadata import MetadataWrapper
+from loguru import logger
+
+from .autofix import LintPatch
+from .budget import DEFAULT_TIME_BUDGET, BudgetMeter, LintBudget, Quarantine, source_digest
+from .config import LINT_CONFIG_FILE_NAME, LintConfig, get_lint_config, get_rules_from_config
+from .exceptions import LintBudgetExceededError
+from .full_repo_metadata import get_metadata_caches, rules_require_metadata_cache
+from .report import BaseLintRuleReport, LintBudgetFailureReport
+from .taskhandle import TaskHandle
+from .watch import Watcher
+
+#: A parsed ``libcst`` module with resolved positions costs roughly this many bytes per byte of source.
+PARSED_MODULE_COST_FACTOR: int = 100
+DEFAULT_MEMORY_BUDGET: int = 512 * 1024 * 1024
+DEFAULT_CACHE_TIMEOUT: int = 10
+
+@dataclass(frozen=False)
+class ParsedModule:
+	"""
+	A parsed module together with the findings of the last lint run over it.
+
+	:param str digest: hash of the source the module was parsed from
+	:param MetadataWrapper wrapper: the wrapper, reused so resolved metadata survives across runs
+	:param int cost: estimated memory footprint, in bytes
+	:param list results: serialized findings for ``digest``, or ``None`` if not linted yet
+	"""
+	digest: str
+	wrapper: MetadataWrapper
+	cost: int
+	results: Optional[List[Dict[str, Any]]] = None
+
+class ModuleCache:
+	"""
+	An LRU of :class:`ParsedModule` keyed by path and bounded by ``max_bytes``.
+
+	The most recently used module is always kept, even when it alone exceeds the budget.
+	"""
+
+	def __init__(self, max_bytes: int = DEFAULT_MEMORY_BUDGET) -> None:
+		self.max_bytes = max_bytes
+		self.used_bytes = 0
+		self._entries: OrderedDict[str, ParsedModule] = OrderedDict()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __contains__(self, path: str) -> bool:
+		return path in self._entries
+
+	def __iter__(self) -> Iterator[str]:
+		return iter(list(self._entries))
+
+	def peek(self, path: str) -> Optional[ParsedModule]:
+		"""Return the entry for ``path`` without touching its recency."""
+		return self._entries.get(path)
+
+	def get(self, path: str, digest: str) -> Optional[ParsedModule]:
+		"""Return the entry for ``path`` if it was parsed from a source hashing to ``digest``."""
+		entry = self._entries.get(path)
+		if entry is None:
+			return None
+		if entry.digest != digest:
+			self.discard(path)
+			return None
+		self._entries.move_to_end(path)
+		return entry
+
+	def put(self, path: str, entry: ParsedModule) -> None:
+		self.discard(path)
+		self._entries[path] = entry
+		self.used_bytes += entry.cost
+		self._evict()
+
+	def discard(self, path: str) -> None:
+		entry = self._entries.pop(path, None)
+		if entry is not None:
+			self.used_bytes -= entry.cost
+
+	def _evict(self) -> None:
+		while self.used_bytes > self.max_bytes and len(self._entries) > 1:
+			path, entry = self._entries.popitem(last=False)
+			self.used_bytes -= entry.cost
+			logger.debug("Evicted {} ({} bytes)", path, entry.cost)
+
+def patch_to_dict(patch: Optional[LintPatch]) -> Optional[Dict[str, Any]]:
+	if patch is None:
+		return None
+	return {
+			"start_offset": patch.start_offset,
+			"line": patch.start_position.line,
+			"column": patch.start_position.column,
+			"original": patch.original_diff_str,
+			"replacement": patch.patched_diff_str,
+	}
+
+def report_to_dict(report: BaseLintRuleReport) -> Dict[str, Any]:
+	"""
+	Extract the JSON-serializable fields of a report. Reports themselves hold the whole syntax
+	tree and must not leave the daemon.
+	"""
+	return {
+			"code": report.code,
+			"message": report.message,
+			"line": report.line,
+			"column": report.column,
+			"patch": patch_to_dict(report.patch),
+	}
+
+class LintDaemon:
+	"""
+	Lints files against a rule set that is imported once and kept warm.
+
+	:param LintConfig config: the lint config; defaults to :func:`~.config.get_lint_config`
+	:param int memory_budget: the estimated number of bytes parsed modules may occupy
+	:param int cache_timeout: timeout for the pyre query of cache-dependent rules
+	:param LintBudget budget: the time and memory allowed for parsing and linting one file
+	:param Quarantine quarantine: files that ran past ``budget``; defaults to the one in the repo root
+	:param bool retry_quarantined: lint quarantined files after all others with a relaxed budget,
+		instead of skipping them
+	"""
+
+	def __init__(
+			self,
+			config: Optional[LintConfig] = None,
+			memory_budget: int = DEFAULT_MEMORY_BUDGET,
+			cache_timeout: int = DEFAULT_CACHE_TIMEOUT,
+			budget: Optional[LintBudget] = None,
+			quarantine: Optional[Quarantine] = None,
+			retry_quarantined: bool = False,
+	) -> None:
+		self._explicit_config = config
+		self.cache_timeout = cache_timeout
+		self.modules = ModuleCache(memory_budget)
+		self.budget = budget or LintBudget()
+		self.retry_quarantined = retry_quarantined
+		self.running = True
+		self._load_rules()
+		self.quarantine = quarantine if quarantine is not None else Quarantine.for_repo(self.config.repo_root)
+
+	def _load_rules(self) -> None:
+		self.config: LintConfig = self._explicit_config or get_lint_config()
+		self.rules = get_rules_from_config(self.config)
+		self.requires_metadata_caches: bool = rules_require_metadata_cache(self.rules)
+
+	def reload(self) -> List[Dict[str, Any]]:
+		"""
+		Re-read the lint config and rule set, then re-run the rules over every cached module.
+
+		Parsed modules are kept: only the findings depend on the rules.
+		"""
+		get_lint_config.cache_clear()
+		self._load_rules()
+		paths = list(self.modules)
+		for path in paths:
+			self.modules.peek(path).results = None
+		return [self.lint(path) for path in paths if Path(path).is_file()]
+
+	def _parse(self, path: str, source: bytes, digest: str, meter: BudgetMeter) -> ParsedModule:
+		with meter.guard("parse"):
+			module = cst.parse_module(source)
+		if self.requires_metadata_caches:
+			cache = get_metadata_caches(self.cache_timeout, [path]).get(path, {})
+			wrapper = MetadataWrapper(module, cache=cache, unsafe_skip_copy=True)
+		else:
+			wrapper = MetadataWrapper(module, unsafe_skip_copy=True)
+		return ParsedModule(digest=digest, wrapper=wrapper, cost=len(source) * PARSED_MODULE_COST_FACTOR)
+
+	def lint(self, path: str, source: Optional[bytes] = None) -> Dict[str, Any]:
+		"""
+		Lint ``path``, or ``source`` as the unsaved contents of ``path``.
+
+		Unchanged sources are answered from the cache without visiting the tree again. Quarantined
+		sources are skipped, or linted with a relaxed budget when ``retry_quarantined`` is set.
+		"""
+		started = time.perf_counter()
+		try:
+			if source is None:
+				source = Path(path).read_bytes()
+			digest = source_digest(source)
+			quarantined = self.quarantine.is_quarantined(path, digest)
+			if quarantined and not self.retry_quarantined:
+				return {"path": path, "failure": LintBudgetFailureReport.KIND, "quarantined": True, "skipped": True}
+			meter = (self.budget.relaxed() if quarantined else self.budget).start(path)
+			entry = self.modules.get(path, digest)
+			cached = entry is not None and entry.results is not None
+			if entry is None:
+				entry = self._parse(path, source, digest, meter)
+				self.modules.put(path, entry)
+			if entry.results is None:
+				with meter.guard("lint"):
+					reports = lint_file(Path(path), source, rules=self.rules, cst_wrapper=entry.wrapper, config=self.config)
+				entry.results = [report_to_dict(r) for r in reports]
+			if quarantined:
+				self.quarantine.release(path)
+		except LintBudgetExceededError as e:
+			self.modules.discard(path)
+			self.quarantine.add(path, digest, e)
+			logger.warning("Quarantined {}", e)
+			return {**LintBudgetFailureReport.from_error(e, digest).to_dict(), "quarantined": True}
+		except Exception:
+			return {"path": path, "error": traceback.format_exc()}
+		return {
+				"path": path,
+				"reports": entry.results,
+				"cached": cached,
+				"elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+		}
+
+	def changed(self, paths: Iterable[str]) -> List[Dict[str, Any]]:
+		"""
+		Drop the cached state of ``paths`` and re-lint the ones that still exist.
+
+		Quarantined paths go last, so a slow file cannot hold up the replies for the others.
+		"""
+		results = []
+		slow_lane = []
+		for path in paths:
+			self.modules.discard(path)
+			if not Path(path).is_file():
+				self.quarantine.release(path)
+				results.append({"path": path, "removed": True})
+			elif path in self.quarantine:
+				slow_lane.append(path)
+			else:
+				results.append(self.lint(path))
+		results.extend(self.lint(path) for path in slow_lane)
+		return results
+
+	def stats(self) -> Dict[str, Any]:
+		return {
+				"rules": len(self.rules),
+				"modules": len(self.modules),
+				"used_bytes": self.modules.used_bytes,
+				"max_bytes": self.modules.max_bytes,
+				"quarantined": len(self.quarantine),
+		}
+
+	def handle(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+		"""Dispatch a single decoded request and return the reply."""
+		method = request.get("method")
+		if method == "lint":
+			source = request.get("source")
+			return self.lint(request["path"], source.encode("utf-8") if source is not None else None)
+		if method == "changed":
+			return {"results": self.changed(request.get("paths", ()))}
+		if method == "stats":
+			return self.stats()
+		if method == "shutdown":
+			self.running = False
+			return {"shutdown": True}
+		return {"error": f"Unknown method {method!r}"}
+
+	def handle_line(self, line: str) -> str:
+		try:
+			request = json.loads(line)
+		except json.JSONDecodeError as e:
+			reply = {"error": f"Invalid request: {e}"}
+		else:
+			reply = self.handle(request)
+			if "id" in request:
+				reply["id"] = request["id"]
+		return json.dumps(reply)
+
+def serve_stdio(daemon: LintDaemon, stdin: IO[str] = sys.stdin, stdout: IO[str] = sys.stdout) -> None:
+	for line in stdin:
+		if not line.strip():
+			continue
+		stdout.write(daemon.handle_line(line) + "\n")
+		stdout.flush()
+		if not daemon.running:
+			break
+
+def serve_socket(daemon: LintDaemon, socket_path: str) -> None:
+	class _Handler(socketserver.StreamRequestHandler):
+		def handle(self) -> None:
+			for raw in self.rfile:
+				line = raw.decode("utf-8")
+				if not line.strip():
+					continue
+				self.wfile.write((daemon.handle_line(line) + "\n").encode("utf-8"))
+				if not daemon.running:
+					# `shutdown` blocks until `serve_forever` returns, so it cannot run on this thread.
+					threading.Thread(target=self.server.shutdown, daemon=True).start()
+					break
+
+	Path(socket_path).unlink(missing_ok=True)
+	with socketserver.UnixStreamServer(socket_path, _Handler) as server:
+		logger.info("Lint daemon listening on {}", socket_path)
+		server.serve_forever()
+	Path(socket_path).unlink(missing_ok=True)
+
+def watch(daemon: LintDaemon, root: str, stdout: IO[str] = sys.stdout, use_polling: bool = False) -> None:
+	"""
+	Re-lint python files under ``root`` as they change, writing one JSON reply per file.
+
+	Bursts of events are coalesced into batches by a :class:`~.watch.Watcher`. Each file of a batch
+	is a job of its :class:`~.taskhandle.TaskHandle`, so a batch that goes stale while it is being
+	linted is dropped at the next file and only the newest contents get linted. A change to the lint config reloads the rule set and
+	re-runs it over the cached modules, without re-parsing.
+	"""
+	def emit(reply: Dict[str, Any]) -> None:
+		stdout.write(json.dumps(reply) + "\n")
+		stdout.flush()
+
+	def lint_batch(changed: Set[str], removed: Set[str], task_handle: TaskHandle) -> None:
+		config_changed = any(Path(path).name == LINT_CONFIG_FILE_NAME.name for path in changed)
+		paths = sorted(str(Path(root, path)) for path in changed if path.endswith(".py"))
+		for path in sorted(removed):
+			daemon.modules.discard(str(Path(root, path)))
+			emit({"path": str(Path(root, path)), "removed": True})
+		job_set = task_handle.create_jobset("lint", count=len(paths) + config_changed)
+		if config_changed:
+			job_set.started_job(LINT_CONFIG_FILE_NAME.name)
+			for reply in daemon.reload():
+				emit(reply)
+			job_set.finished_job()
+		for path in paths:
+			job_set.started_job(path)
+			emit(daemon.changed([path])[0])
+			job_set.finished_job()
+
+	watcher = Watcher(root, lint_batch, patterns=("*.py", LINT_CONFIG_FILE_NAME.name), use_polling=use_polling)
+	try:
+		watcher.run()
+	except KeyboardInterrupt:
+		watcher.stop()
+
+@click.command(short_help="Run a long-lived lint daemon for editor integrations.")
+@click.option("--socket", "socket_path", default=None, type=click.Path(dir_okay=False),
+              help="Listen on this unix socket instead of stdin/stdout.")
+@click.option("--memory-budget", "memory_budget", default=DEFAULT_MEMORY_BUDGET, type=int, show_default=True,
+              help="Estimated bytes of parsed modules to keep before evicting the least recently used.")
+@click.option("--cache-timeout", "cache_timeout", default=DEFAULT_CACHE_TIMEOUT, type=int, show_default=True,
+              help="Timeout in seconds for metadata cache resolution of type-dependent rules.")
+@click.option("--watch", "watch_root", default=None, type=click.Path(exists=True, file_okay=False),
+              help="Watch this directory and re-lint changed files instead of serving requests.")
+@click.option("--poll", "use_polling", is_flag=True, default=False,
+              help="With --watch, poll for changes even when watchdog is installed.")
+@click.option("--file-time-budget", "file_time_budget", default=DEFAULT_TIME_BUDGET, type=float, show_default=True,
+              help="Seconds allowed for parsing and linting a single file before it is quarantined.")
+@click.option("--retry-quarantined", "retry_quarantined", is_flag=True, default=False,
+              help="Lint quarantined files last with a relaxed budget instead of skipping them.")
+def main(socket_path: Optional[str], memory_budget: int, cache_timeout: int,
+         watch_root: Optional[str], use_polling: bool, file_time_budget: float, retry_quarantined: bool) -> None:
+	daemon = LintDaemon(
+			memory_budget=memory_budget,
+			cache_timeout=cache_timeout,
+			budget=LintBudget(seconds=file_time_budget),
+			retry_quarantined=retry_quarantined,
+	)
+	if watch_root is not None:
+		watch(daemon, watch_root, use_polling=use_polling)
+	elif socket_path is None:
+		serve_stdio(daemon)
+	else:
+		serve_socket(daemon, socket_path)
+
+
+__all__ = sorted(
+		[getattr(v, '__name__', k)
+		 for k, v in list(globals().items())  # export
+		 if ((callable(v) and getattr(v, "__module__", "") == __name__  # callables from this module
+		      or k.isupper()) and  # or CONSTANTS
+		     not str(getattr(v, '__name__', k)).startswith('__'))]
+)  # neither marked internal
+
+if __name__ == '__main__':
+	main()
@@ -71,6 +71,25 @@ class RuleTypeError(Error):
 	"""
 	pass
 
+class ConfigInterpolationError(Error):
+	"""
+	from utils.collection
+	"""
+	pass
+
+class LintBudgetExceededError(ErrorMixin, Error):
+	"""
+	from budget
+	"""
+	code = "budget_exceeded"
+	msg_template = "{path}: {phase} exceeded the {kind} budget ({used} > {limit})"
+
+class InterruptedTaskError(Error):
+	"""
+	from taskhandle: the task has been interrupted
+	"""
+	pass
+
 class PyreQueryError(Error):
 	"""
 	from generate_pyre_fixtures.py
@@ -11,11 +11,13 @@ import abc
 import ast
 from pathlib import Path
 from pickle import PicklingError
-from typing import Any, Collection, Dict, Optional, Sequence, Union
+from typing import Any, ClassVar, Collection, Dict, Optional, Sequence, Union
 
 import libcst as cst
+from attr import dataclass
 
 from .autofix import LintPatch
+from .exceptions import LintBudgetExceededError
 
 
 class BaseLintRuleReport(abc.ABC):
@@ -166,12 +168,62 @@ class LintSuccessReportBase(abc.ABC):
 
 class LintFailureReport(LintFailureReportBase):
 	#  `LintSuccessReportBase` inconsistently.
+	KIND: str = "exception"
+	
 	@staticmethod
 	#  `LintFailureReportBase` inconsistently.
 	def create_reports(path: Path, exception_traceback: str, **kwargs: object) -> Path:
 		return path
 
 
+@dataclass(frozen=True)
+class LintBudgetFailureReport(LintFailureReport):
+	"""
+	A file that ran past its per-file `LintBudget` and was quarantined instead of linted.
+	
+	:param str phase: ``parse`` or ``lint``
+	:param str resource: ``time`` or ``memory``
+	"""
+	
+	KIND: ClassVar[str] = "budget_exceeded"
+	
+	path: Path
+	phase: str
+	resource: str
+	used: float
+	limit: float
+	digest: Optional[str] = None
+	
+	@staticmethod
+	def create_reports(path: Path, exception_traceback: str, **kwargs: object) -> Sequence[LintBudgetFailureReport]:
+		return [
+				LintBudgetFailureReport(
+						path=path,
+						phase=kwargs["phase"],
+						resource=kwargs["kind"],
+						used=kwargs["used"],
+						limit=kwargs["limit"],
+						digest=kwargs.get("digest"),
+				)
+		]
+	
+	@classmethod
+	def from_error(cls, error: LintBudgetExceededError, digest: Optional[str] = None) -> LintBudgetFailureReport:
+		details = {k: v for k, v in error.__dict__.items() if k != "path"}
+		return cls.create_reports(Path(error.path), str(error), digest=digest, **details)[0]
+	
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+				"path": str(self.path),
+				"failure": self.KIND,
+				"phase": self.phase,
+				"resource": self.resource,
+				"used": self.used,
+				"limit": self.limit,
+				"digest": self.digest,
+		}
+
+
 class LintSuccessReport(LintSuccessReportBase):
 	"""An implementation needs to be a dataclass."""
 	
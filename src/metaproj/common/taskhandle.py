@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Handles for long-running tasks that can be stopped from another thread.
+
+A :class:`TaskHandle` groups the work of a task into :class:`JobSet` objects. Every job started
+or finished checks the handle, so once :meth:`TaskHandle.stop` is called the task raises
+:class:`~.exceptions.InterruptedTaskError` at its next job boundary.
+
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, List, Optional
+
+from . import exceptions
+
+
+class TaskHandle:
+	def __init__(self, name: str = "Task", interrupts: bool = True) -> None:
+		"""Construct a TaskHandle
+
+		If `interrupts` is `False` the task won't be interrupted by
+		calling `TaskHandle.stop()`.
+
+		"""
+		self.name = name
+		self.interrupts = interrupts
+		self.stopped = False
+		self.job_sets: List[JobSet] = []
+		self.observers: List[Callable[[], None]] = []
+
+	def stop(self) -> None:
+		"""Interrupts the task"""
+		if self.interrupts:
+			self.stopped = True
+			self._inform_observers()
+
+	def current_jobset(self) -> Optional[JobSet]:
+		"""Return the current `JobSet`"""
+		if self.job_sets:
+			return self.job_sets[-1]
+		return None
+
+	def add_observer(self, observer: Callable[[], None]) -> None:
+		"""Register an observer for this task handle
+
+		The observer is notified whenever the task is stopped or
+		a job gets finished.
+
+		"""
+		self.observers.append(observer)
+
+	def is_stopped(self) -> bool:
+		return self.stopped
+
+	def get_jobsets(self) -> List[JobSet]:
+		return self.job_sets
+
+	def create_jobset(self, name: str = "JobSet", count: Optional[int] = None) -> JobSet:
+		result = JobSet(self, name=name, count=count)
+		self.job_sets.append(result)
+		self._inform_observers()
+		return result
+
+	def _inform_observers(self) -> None:
+		for observer in list(self.observers):
+			observer()
+
+
+class JobSet:
+
+	handle: TaskHandle
+	name: str
+
+	def __init__(self, handle: TaskHandle, name: str, count: Optional[int]) -> None:
+		self.handle = handle
+		self.name = name
+		self.count = count
+		self.done = 0
+		self.job_name: Optional[str] = None
+
+	def started_job(self, name: str) -> None:
+		self.check_status()
+		self.job_name = name
+		self.handle._inform_observers()
+
+	def finished_job(self) -> None:
+		self.check_status()
+		self.done += 1
+		self.handle._inform_observers()
+		self.job_name = None
+
+	def check_status(self) -> None:
+		if self.handle.is_stopped():
+			raise exceptions.InterruptedTaskError()
+
+	def get_active_job_name(self) -> Optional[str]:
+		return self.job_name
+
+	def get_percent_done(self) -> Optional[int]:
+		if self.count is not None and self.count > 0:
+			percent = self.done * 100 // self.count
+			return min(percent, 100)
+		return None
+
+	def get_name(self) -> str:
+		return self.name
+
+
+class NullTaskHandle:
+	def __init__(self) -> None:
+		pass
+
+	def is_stopped(self) -> bool:
+		return False
+
+	def stop(self) -> None:
+		pass
+
+	def create_jobset(self, *args: Any, **kwds: Any) -> NullJobSet:
+		return NullJobSet()
+
+	def get_jobsets(self) -> List[JobSet]:
+		return []
+
+	def add_observer(self, observer: Callable[[], None]) -> None:
+		pass
+
+
+class NullJobSet:
+	def started_job(self, name: str) -> None:
+		pass
+
+	def finished_job(self) -> None:
+		pass
+
+	def check_status(self) -> None:
+		pass
+
+	def get_active_job_name(self) -> None:
+		pass
+
+	def get_percent_done(self) -> None:
+		pass
+
+	def get_name(self) -> None:
+		pass
+
+
+__all__ = sorted(
+		[getattr(v, '__name__', k)
+		 for k, v in list(globals().items())  # export
+		 if ((callable(v) and getattr(v, "__module__", "") == __name__  # callables from this module
+		      or k.isupper()) and  # or CONSTANTS
+		     not str(getattr(v, '__name__', k)).startswith('__'))]
+)  # neither marked internal
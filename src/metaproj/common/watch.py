@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Watch a folder and report batches of changed files.
+
+A :class:`Watcher` tracks every interesting file under a root folder with a
+:class:`~.resourceobserver.FilteredResourceObserver`, which compares each file against its
+:class:`~.resourceobserver.ChangeIndicator` (mtime and size) and reports created, changed and
+removed files to a :class:`~.resourceobserver.ResourceObserver`. Those reports are coalesced into
+batches of changed and removed paths. Events come from ``watchdog`` when it is installed;
+otherwise the folder is polled and rescanned.
+
+Each batch is handed to a callback together with a fresh :class:`~.taskhandle.TaskHandle`. When
+new events arrive while a batch is still being processed, that handle is stopped; the next job the
+callback starts on it raises :class:`~.exceptions.InterruptedTaskError`, and the batch's paths are
+merged into the next batch.
+
+"""
+from __future__ import annotations
+
+import fnmatch
+import os
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional, Set, Tuple
+
+from .exceptions import InterruptedTaskError
+from .resourceobserver import FilteredResourceObserver, Resource, ResourceObserver
+from .taskhandle import TaskHandle
+
+try:
+	from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional dependency
+	Observer = None
+
+DEFAULT_PATTERNS: Tuple[str, ...] = ("*.py",)
+IGNORED_FOLDERS: Tuple[str, ...] = (".git", ".hg", ".svn", "__pycache__", ".ropeproject", ".tox", ".venv")
+
+class WatchedResource:
+	"""
+	A file or folder below the root of a :class:`Watcher`, as the resource observers see it.
+
+	:param Watcher project: the watcher the resource belongs to
+	:param str path: the path relative to the root, using ``/`` as separator; ``""`` is the root
+	"""
+
+	def __init__(self, project: Watcher, path: str) -> None:
+		self.project = project
+		self.path = path
+
+	@property
+	def real_path(self) -> str:
+		return os.path.join(self.project.root, *self.path.split("/"))
+
+	@property
+	def parent(self) -> WatchedResource:
+		return WatchedResource(self.project, self.path.rpartition("/")[0])
+
+	def exists(self) -> bool:
+		return os.path.exists(self.real_path)
+
+	def is_folder(self) -> bool:
+		return self.path == "" or os.path.isdir(self.real_path)
+
+	def contains(self, resource: Resource) -> bool:
+		if self.path == "":
+			return resource.path != ""
+		return resource.path.startswith(self.path + "/")
+
+	def __eq__(self, other: object) -> bool:
+		return isinstance(other, WatchedResource) and other.project is self.project and other.path == self.path
+
+	def __hash__(self) -> int:
+		return hash(self.path)
+
+	def __repr__(self) -> str:
+		return f"<WatchedResource {self.path!r}>"
+
+BatchCallback = Callable[[Set[str], Set[str], TaskHandle], None]
+
+class _EventForwarder:
+	"""Hands the files named by ``watchdog`` events to the watcher's resource observer."""
+
+	def __init__(self, watcher: Watcher) -> None:
+		self.watcher = watcher
+
+	def dispatch(self, event: Any) -> None:
+		if event.is_directory:
+			return
+		paths = [event.src_path] + ([event.dest_path] if event.event_type == "moved" else [])
+		for real_path in paths:
+			path = self.watcher.relative(real_path)
+			if path is not None and self.watcher.is_interesting(path):
+				self.watcher.validate(self.watcher.get_resource(path))
+
+class Watcher:
+	"""
+	Report coalesced batches of changed files under ``root``.
+
+	``callback(changed, removed, handle)`` receives two sets of paths relative to ``root``, using
+	``/`` as separator. It runs on the thread that called :meth:`run`, one batch at a time.
+
+	:param float debounce: seconds without events before a batch is flushed
+	:param float poll_interval: seconds between polls when ``watchdog`` is not available
+		(or ``use_polling`` is true)
+	"""
+
+	def __init__(
+			self,
+			root: str,
+			callback: BatchCallback,
+			patterns: Iterable[str] = DEFAULT_PATTERNS,
+			debounce: float = 0.2,
+			poll_interval: float = 1.0,
+			use_polling: bool = False,
+	) -> None:
+		self.root = os.path.realpath(root)
+		self.callback = callback
+		self.patterns = tuple(patterns)
+		self.debounce = debounce
+		self.poll_interval = poll_interval
+		self.use_polling = use_polling or Observer is None
+		self._lock = threading.Condition()
+		self._changed: Set[str] = set()
+		self._removed: Set[str] = set()
+		self._last_event: Optional[float] = None
+		self._current: Optional[TaskHandle] = None
+		self._stopped = False
+		self.observer = FilteredResourceObserver(
+				ResourceObserver(changed=self._on_changed, created=self._on_changed, removed=self._on_removed),
+				initial_resources=self.scan(),
+		)
+
+	def get_resource(self, path: str) -> WatchedResource:
+		return WatchedResource(self, path)
+
+	def relative(self, real_path: str) -> Optional[str]:
+		"""The path of ``real_path`` relative to the root, or ``None`` if it is outside of it."""
+		path = os.path.relpath(os.path.realpath(real_path), self.root)
+		if path == os.curdir or path.startswith(os.pardir):
+			return None
+		return path.replace(os.path.sep, "/")
+
+	def is_interesting(self, path: str) -> bool:
+		parts = path.split("/")
+		if any(part in IGNORED_FOLDERS for part in parts[:-1]):
+			return False
+		return any(fnmatch.fnmatch(parts[-1], pattern) for pattern in self.patterns)
+
+	def scan(self) -> List[WatchedResource]:
+		"""Return all interesting files below the root."""
+		result = []
+		for dirpath, dirnames, filenames in os.walk(self.root):
+			dirnames[:] = [name for name in dirnames if name not in IGNORED_FOLDERS]
+			for name in filenames:
+				path = self.relative(os.path.join(dirpath, name))
+				if path is not None and self.is_interesting(path):
+					result.append(self.get_resource(path))
+		return result
+
+	def _on_changed(self, resource: WatchedResource) -> None:
+		self._record(changed=(resource.path,))
+
+	def _on_removed(self, resource: WatchedResource) -> None:
+		self.observer.remove_resource(resource)
+		self._record(removed=(resource.path,))
+
+	def validate(self, resource: WatchedResource) -> None:
+		"""
+		Report how ``resource`` (a file, or a folder and the files in it) changed since it was last
+		seen. Files the observer does not know yet are reported as created once they exist.
+		"""
+		with self._lock:
+			if not resource.is_folder():
+				self.observer.resources.setdefault(resource, None)
+			self.observer.validate(resource)
+
+	def _record(self, changed: Iterable[str] = (), removed: Iterable[str] = ()) -> None:
+		with self._lock:
+			self._changed.difference_update(removed)
+			self._changed.update(changed)
+			self._removed.difference_update(changed)
+			self._removed.update(removed)
+			self._last_event = time.monotonic()
+			if self._current is not None:
+				# The running batch is stale now; drop it as soon as it checks its handle.
+				self._current.stop()
+			self._lock.notify_all()
+
+	def poll(self) -> None:
+		"""Rescan the tree and validate it against the last known change indicators once."""
+		with self._lock:
+			for resource in self.scan():
+				self.observer.resources.setdefault(resource, None)
+			self.observer.validate(self.get_resource(""))
+
+	def _take_batch(self, timeout: float) -> Optional[Tuple[Set[str], Set[str], TaskHandle]]:
+		with self._lock:
+			deadline = time.monotonic() + timeout
+			while not self._stopped:
+				if self._last_event is not None:
+					quiet = time.monotonic() - self._last_event
+					if quiet >= self.debounce:
+						changed, removed = self._changed, self._removed
+						self._changed, self._removed = set(), set()
+						self._last_event = None
+						self._current = TaskHandle("watch batch")
+						return changed, removed, self._current
+					self._lock.wait(self.debounce - quiet)
+				else:
+					remaining = deadline - time.monotonic()
+					if remaining <= 0:
+						return None
+					self._lock.wait(remaining)
+			return None
+
+	def run_once(self, timeout: Optional[float] = None) -> bool:
+		"""Wait for and process a single batch; return whether one ran."""
+		batch = self._take_batch(self.poll_interval if timeout is None else timeout)
+		if batch is None:
+			return False
+		changed, removed, handle = batch
+		try:
+			self.callback(changed, removed, handle)
+		except InterruptedTaskError:
+			# Reschedule what the stale batch did not get to; newer events take precedence.
+			self._requeue(changed, removed)
+		finally:
+			with self._lock:
+				self._current = None
+		return True
+
+	def _requeue(self, changed: Set[str], removed: Set[str]) -> None:
+		with self._lock:
+			self._changed.update(changed - self._removed)
+			self._removed.update(removed - self._changed)
+			if self._last_event is None:
+				self._last_event = time.monotonic()
+
+	def _poll_loop(self) -> None:
+		while not self._stopped:
+			self.poll()
+			with self._lock:
+				self._lock.wait(self.poll_interval)
+
+	def run(self) -> None:
+		"""
+		Process batches until :meth:`stop` is called.
+
+		Changes are detected on a separate thread, so a batch that goes stale while the callback
+		is still running gets interrupted.
+		"""
+		notifier: Any
+		if self.use_polling:
+			notifier = threading.Thread(target=self._poll_loop, name="watch-poll", daemon=True)
+		else:
+			notifier = Observer()
+			notifier.schedule(_EventForwarder(self), self.root, recursive=True)
+		notifier.start()
+		try:
+			while not self._stopped:
+				self.run_once()
+		finally:
+			self.stop()
+			if not self.use_polling:
+				notifier.stop()
+			notifier.join()
+
+	def stop(self) -> None:
+		with self._lock:
+			self._stopped = True
+			if self._current is not None:
+				self._current.stop()
+			self._lock.notify_all()
@@ -2,19 +2,23 @@ from __future__ import annotations
 
 import collections
 import contextlib
+import functools
 import os
 import re
 import threading
 from ast import literal_eval
+from collections.abc import Mapping
 from collections.abc import MutableMapping
 from contextlib import contextmanager
 from typing import Any
+from typing import Dict
 from typing import Generator
 from typing import Iterable
 from typing import Iterator
 from typing import MutableMapping as T_MutableMapping
 from typing import Optional
 from typing import Pattern
+from typing import Tuple
 from typing import Type
 from typing import TypeVar
 from typing import Union
@@ -26,6 +30,7 @@ from dotenv import dotenv_values
 from dotenv import find_dotenv
 
 from ..common import config as fixit_config
+from ..common import exceptions
 
 appdirs.system = "linux2"
 
@@ -250,6 +255,151 @@ class Config(Box):
             new_config[key] = value
         return new_config
 
+_MISSING = object()
+
+@functools.lru_cache(maxsize=None)
+def _frozen_config_class(keys: Tuple[str, ...]) -> Type[FrozenConfig]:
+    """
+    Returns a `FrozenConfig` subclass with one slot per key in `keys`, shared by every view
+    with the same shape.
+    """
+    namespace = {"__slots__": keys, "__module__": __name__, "__qualname__": FrozenConfig.__qualname__}
+    return cast(Type["FrozenConfig"], type("FrozenConfig", (FrozenConfig,), namespace))
+
+def _is_slot_key(key: Any) -> bool:
+    return isinstance(key, str) and key.isidentifier() and not key.startswith("_") and not hasattr(FrozenConfig, key)
+
+class FrozenConfig(Mapping):
+    """
+    An immutable, read-optimized view of a (nested) configuration mapping.
+
+    Nested mappings are converted to views once, up front, and every key that is a valid
+    identifier becomes a slot on a class generated for that shape of view, so `view.a.b.c`
+    costs three slot reads instead of going through `__getattr__` and `__getitem__` at each
+    level. Keys that shadow `Mapping` methods, or are not identifiers, are only available by
+    item access. Dotted paths resolve with a single lookup through `get_path`.
+
+    Views are never modified in place: `merged` returns a new view that shares every subtree
+    it does not touch with the original, so overlays cost O(changed keys) instead of a copy.
+
+    :param Mapping mapping: the mapping to freeze
+
+    .. :code-block: python
+    >>> view = FrozenConfig({'a': {'b': 1}})
+    >>> view.a.b
+    1
+    >>> view.get_path('a.b')
+    1
+    """
+
+    __slots__ = ("_items", "_paths")
+
+    def __new__(cls, mapping: Optional[Mapping] = None, **kwargs: Any) -> FrozenConfig:
+        items = dict(mapping or {}, **kwargs)
+        for key, value in items.items():
+            if isinstance(value, Mapping) and not isinstance(value, FrozenConfig):
+                items[key] = FrozenConfig(value)
+        return FrozenConfig._from_items(items)
+
+    @staticmethod
+    def _from_items(items: dict) -> FrozenConfig:
+        """Builds a view from `items`, whose nested mappings must already be frozen."""
+        view_class = _frozen_config_class(tuple(key for key in items if _is_slot_key(key)))
+        view = object.__new__(view_class)
+        setattr_ = object.__setattr__
+        setattr_(view, "_items", items)
+        setattr_(view, "_paths", None)
+        for key in view_class.__slots__:
+            setattr_(view, key, items[key])
+        return view
+
+    def __getitem__(self, key: str) -> Any:
+        return self._items[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._items
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only; use `merged` to derive a new view")
+
+    def __delattr__(self, attr: str) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def __reduce__(self) -> tuple:
+        return FrozenConfig, (self.to_dict(),)
+
+    def __repr__(self) -> str:
+        if len(self) > 0:
+            return "<{}: {}>".format(type(self).__name__, ", ".join(sorted(repr(k) for k in self.keys())))
+        else:
+            return "<{}>".format(type(self).__name__)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._items.get(key, default)
+
+    @property
+    def paths(self) -> dict:
+        """
+        Every value in the view keyed by its `.`-delimited path, including intermediate views.
+        Computed on first use and kept for the lifetime of the view.
+        """
+        paths = self._paths
+        if paths is None:
+            paths = {}
+            for key, value in self._items.items():
+                paths[key] = value
+                if isinstance(value, FrozenConfig):
+                    for subpath, subvalue in value.paths.items():
+                        paths[f"{key}.{subpath}"] = subvalue
+            object.__setattr__(self, "_paths", paths)
+        return paths
+
+    def get_path(self, path: str, default: Any = None) -> Any:
+        """
+        Returns the value at the `.`-delimited `path`, or `default` if there is none.
+        """
+        paths = self._paths
+        if paths is None:
+            paths = self.paths
+        return paths.get(path, default)
+
+    def merged(self, other: Mapping) -> FrozenConfig:
+        """
+        Returns a new view with `other` merged in, like `merge_dicts`, sharing every subtree
+        that `other` does not touch. Keys of `other` may be `.`-delimited paths.
+        """
+        updates: dict = {}
+        for key, value in other.items():
+            *parents, leaf = key.split(".") if isinstance(key, str) else (key,)
+            target = updates
+            for parent in parents:
+                nested = target.get(parent)
+                # copy, so the caller's nested mappings are never written to
+                target[parent] = dict(nested) if isinstance(nested, Mapping) else {}
+                target = target[parent]
+            target[leaf] = value
+        items = dict(self._items)
+        for key, value in updates.items():
+            current = items.get(key)
+            if isinstance(value, Mapping) and not isinstance(value, FrozenConfig):
+                base = current if isinstance(current, FrozenConfig) else FrozenConfig._from_items({})
+                items[key] = base.merged(value)
+            else:
+                items[key] = value
+        return FrozenConfig._from_items(items)
+
+    def to_dict(self) -> dict:
+        """
+        Converts the view (and any views contained within) to a nested dictionary.
+        """
+        return {k: v.to_dict() if isinstance(v, FrozenConfig) else v for k, v in self._items.items()}
+
 def validate_config(config: Config) -> None:
     """
     Validates that the configuration file is valid.
@@ -313,6 +463,9 @@ def interpolate_env_vars(
     """
     if not env_var or not isinstance(env_var, str):
         return env_var
+    if "$" not in env_var and not env_var.startswith("~"):
+        # nothing to expand
+        return env_var
     counter = 0
     while counter < 10:
         interpolated = os.path.expanduser(os.path.expandvars(str(env_var)))
@@ -328,6 +481,62 @@ def interpolate_env_vars(
         counter += 1
     return None
 
+def _references(value: Any) -> Iterator[CompoundKey]:
+    if isinstance(value, str) and "${" in value:
+        for match in INTERPOLATION_REGEX.finditer(value):
+            yield CompoundKey(match.group(1).split("."))
+
+def _substitute_references(value: str, flat_config: dict) -> Any:
+    # if the reference is the entire value, replace it with the referenced value (keeping its type)
+    match = INTERPOLATION_REGEX.fullmatch(value)
+    if match:
+        return flat_config.get(CompoundKey(match.group(1).split(".")), "")
+    # otherwise drop the referenced values into the string
+    return INTERPOLATION_REGEX.sub(
+        lambda m: str(flat_config.get(CompoundKey(m.group(1).split(".")), "")), value)
+
+def resolve_references(flat_config: dict) -> None:
+    """
+    Resolves `${section.key}` references between the values of a flat config, in place.
+
+    Each value is resolved once, after everything it references (depth first, in
+    topological order), so chains of references cost time linear in the size of the config.
+    References to missing keys resolve to `""`.
+
+    :param dict flat_config: a config flattened by `dict_to_flatdict`
+    :raises exceptions.ConfigInterpolationError: if references form a cycle
+    """
+    resolved: set = set()
+    for root in flat_config:
+        if root in resolved:
+            continue
+        # an explicit stack of (key, pending references) so long chains don't hit the recursion limit
+        stack = [(root, _references(flat_config[root]))]
+        on_stack = {root}
+        while stack:
+            key, pending = stack[-1]
+            for ref in pending:
+                if ref in on_stack:
+                    chain = [k for k, _ in stack]
+                    cycle = chain[chain.index(ref):] + [ref]
+                    raise exceptions.ConfigInterpolationError(
+                        "Config references form a cycle: " + " -> ".join(".".join(k) for k in cycle))
+                if ref in flat_config and ref not in resolved:
+                    stack.append((ref, _references(flat_config[ref])))
+                    on_stack.add(ref)
+                    break
+            else:
+                value = flat_config[key]
+                if isinstance(value, str) and "${" in value:
+                    value = flat_config[key] = _substitute_references(value, flat_config)
+                    # substituted values can assemble new references, as in "${a.${b}}"
+                    if isinstance(value, str) and INTERPOLATION_REGEX.search(value):
+                        stack[-1] = (key, _references(value))
+                        continue
+                resolved.add(key)
+                on_stack.discard(key)
+                stack.pop()
+
 def interpolate_config(config: dict,
                        env_var_prefix: str = None
                        ) -> Config:
@@ -335,6 +544,7 @@ def interpolate_config(config: dict,
     Processes a config dictionary, such as the one loaded from `load_toml`.
     :param dict config:
     :param str env_var_prefix:
+    :raises exceptions.ConfigInterpolationError: if `${...}` references form a cycle
 
     # check if any env var sets a configuration value with the format:
         [ENV_VAR_PREFIX]__[Section]__[Optional Sub-Sections...]__[Key] = Value
@@ -373,52 +583,22 @@ def interpolate_config(config: dict,
                 flat_config[config_option] = string_to_type(
                     cast(str, interpolate_env_vars(env_var_value)))
     
-    # interpolate any env vars referenced
-    for k, v in list(flat_config.items()):
-        val = interpolate_env_vars(v)
+    # interpolate any env vars referenced; identical strings are only expanded once
+    expanded_env: Dict[str, Any] = {}
+    for k, v in flat_config.items():
+        if isinstance(v, str):
+            val = expanded_env.get(v, _MISSING)
+            if val is _MISSING:
+                val = expanded_env[v] = interpolate_env_vars(v)
+        else:
+            val = interpolate_env_vars(v)
         if isinstance(val, str):
             val = string_to_type(val)
         flat_config[k] = val
     
     # --------------------- Interpolate other config keys -----------------
     # TOML doesn't support references to other keys... but we do!
-    # This has the potential to lead to nasty recursions, so we check at most 10 times.
-    # we use a set called "keys_to_check" to track only the ones of interest, so we aren't
-    # checking every key every time.
-    
-    keys_to_check = set(flat_config.keys())
-    for _ in range(10):
-        
-        # iterate over every key and value to check if the value uses interpolation
-        for k in list(keys_to_check):
-            
-            # if the value isn't a string, it can't be a reference, so we exit
-            if not isinstance(flat_config[k], str):
-                keys_to_check.remove(k)
-                continue
-            
-            # see if the ${...} syntax was used in the value and exit if it wasn't
-            match = INTERPOLATION_REGEX.search(flat_config[k])
-            if not match:
-                keys_to_check.remove(k)
-                continue
-            
-            # the matched_string includes "${}"; the matched_key is just the inner value
-            matched_string = match.group(0)
-            matched_key = match.group(1)
-            
-            # get the referenced key from the config value
-            ref_key = CompoundKey(matched_key.split("."))
-            # get the value corresponding to the referenced key
-            ref_value = flat_config.get(ref_key, "")
-            
-            # if the matched was the entire value, replace it with the interpolated value
-            if flat_config[k] == matched_string:
-                flat_config[k] = ref_value
-            # if it was a partial match, then drop the interpolated value into the string
-            else:
-                flat_config[k] = flat_config[k].replace(
-                    matched_string, str(ref_value), 1)
+    resolve_references(flat_config)
     return cast(Config, flatdict_to_dict(flat_config, dct_class=Config))
 
 
@@ -481,6 +661,11 @@ class Context(DotDict, threading.local):
         - *args (Any): arguments to provide to the `DotDict` constructor (e.g.,
             an initial dictionary)
         - **kwargs (Any): any key / value pairs to initialize this context with
+
+    `context.config` is a read-only `FrozenConfig`: assigning to it, or to any of its keys,
+    raises `TypeError`. Override config values for a block with `context(config={...})`, or
+    replace the whole view with `context.config = FrozenConfig(...)`.
+
     # Initialize with config context
     init = {}
     init.update(config.get("context", {}))
@@ -490,16 +675,49 @@ class Context(DotDict, threading.local):
 
     """
     
+    # the `__call__` undo logs live outside the items: a slot shared by every thread, holding
+    # a `threading.local` so each thread sees only the blocks it entered
+    __slots__ = ("_overlay_stacks",)
+    
     def __init__(self, *args: Any, **kwargs: Any) -> None:
+        # `threading.local` runs `__init__` again on first use in each thread; keep the one slot value
+        try:
+            self._overlay_stacks
+        except AttributeError:
+            threading.local.__setattr__(self, "_overlay_stacks", threading.local())
         init = {}
         # Initialize with config context
         init.update(config.get("context", {}))
         # Overwrite with explicit args
         init.update(dict(*args, **kwargs))
-        # Merge in config (with explicit args overwriting)
-        init["config"] = merge_dicts(config, init.get("config", {}))
+        # Merge in config (with explicit args overwriting), frozen for fast reads
+        init["config"] = FrozenConfig(merge_dicts(config, init.get("config", {})))
         super().__init__(init)
     
+    def _overlays(self) -> list:
+        """
+        The stack of undo logs of the `__call__` blocks entered on this thread, innermost last.
+        """
+        stacks = self._overlay_stacks
+        try:
+            return stacks.stack
+        except AttributeError:
+            stacks.stack = []
+            return stacks.stack
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        overlays = self._overlays()
+        if overlays and key not in overlays[-1]:
+            # copy-on-write: remember the value this key had when the innermost block was entered
+            overlays[-1][key] = self.__dict__.get(key, _MISSING)
+        self.__dict__[key] = value
+    
+    def __delitem__(self, key: str) -> None:
+        overlays = self._overlays()
+        if overlays and key not in overlays[-1]:
+            overlays[-1][key] = self.__dict__[key]
+        del self.__dict__[key]
+    
     def __getstate__(self) -> None:
         """
         Because we dynamically update context during runs, we don't ever want to pickle
@@ -521,17 +739,26 @@ class Context(DotDict, threading.local):
             with prefect.context(dict(a=1, b=2), c=3):
                 print(prefect.context.a) # 1
         """
-        # Avoid creating new `Context` object, copy as `dict` instead.
-        previous_context = self.__dict__.copy()
+        # Avoid copying the whole context: only keys written inside the block are
+        # recorded (see `__setitem__`) and put back when it exits.
+        new_context = dict(*args, **kwargs)
+        if "config" in new_context:
+            current_config = self.get("config")
+            if isinstance(current_config, FrozenConfig):
+                new_context["config"] = current_config.merged(new_context["config"])
+            else:
+                new_context["config"] = merge_dicts(current_config or {}, new_context["config"])
+        overlays = self._overlays()
+        overlays.append({})
         try:
-            new_context = dict(*args, **kwargs)
-            if "config" in new_context:
-                new_context["config"] = merge_dicts(self.get("config", {}), new_context["config"])
             self.update(new_context)  # type: ignore
             yield self
         finally:
-            self.clear()
-            self.update(previous_context)
+            for key, value in overlays.pop().items():
+                if value is _MISSING:
+                    self.__dict__.pop(key, None)
+                else:
+                    self.__dict__[key] = value
 
 context = Context()
 
@@ -549,21 +776,29 @@ def set_temporary_config(temp_config: dict) -> Iterator:
         assert config.nested.setting == 2
 
     """
+    # Only the touched keys are recorded and restored, instead of copying the whole config.
+    undo = []
     try:
-        old_config = config.copy()
         for key, value in temp_config.items():
             # the `key` might be a dot-delimited string, so we split on "." and set the value
             cfg = config
             subkeys = key.split(".")
             for subkey in subkeys[:-1]:
-                cfg = cfg.setdefault(subkey, Config())
+                if subkey not in cfg:
+                    undo.append((cfg, subkey, _MISSING))
+                    cfg[subkey] = Config()
+                cfg = cfg[subkey]
+            undo.append((cfg, subkeys[-1], cfg.get(subkeys[-1], _MISSING)))
             cfg[subkeys[-1]] = value
         # ensure the new config is available in context
-        with prefect.context(config=config):
+        with context(config=temp_config):
             yield config
     finally:
-        config.clear()
-        config.update(old_config)
+        for cfg, subkey, value in reversed(undo):
+            if value is _MISSING:
+                cfg.pop(subkey, None)
+            else:
+                cfg[subkey] = value
 
 
 
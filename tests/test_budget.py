@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import pickle
+import tempfile
+from pathlib import Path
+
+from unittest import mock
+
+import libcst as cst
+import pytest
+from fixit import CstLintRule
+from libcst.testing.utils import UnitTest
+
+from metaproj.common.budget import LintBudget, Quarantine, lint_file_within_budget, source_digest
+from metaproj.common.config import LintConfig
+from metaproj.common.exceptions import LintBudgetExceededError
+from metaproj.common.report import LintBudgetFailureReport
+
+
+def _exceeded(path: str = "slow.py") -> LintBudgetExceededError:
+    return LintBudgetExceededError(path=path, phase="lint", kind="time", used=2.0, limit=1.0)
+
+
+class SpinRule(CstLintRule):
+    def visit_Module(self, node: cst.Module) -> None:
+        while True:
+            pass
+
+
+class LintBudgetTest(UnitTest):
+    def test_guard_interrupts_python_code(self) -> None:
+        meter = LintBudget(seconds=0.05, memory=None).start("slow.py")
+        with pytest.raises(LintBudgetExceededError) as excinfo:
+            with meter.guard("lint"):
+                while True:
+                    pass
+        assert excinfo.value.phase == "lint"
+        assert excinfo.value.kind == "time"
+
+    def test_within_budget(self) -> None:
+        meter = LintBudget().start("fast.py")
+        with meter.guard("parse"):
+            sum(range(10_000))
+        meter.check()
+
+    def test_checked_when_phase_ends(self) -> None:
+        meter = LintBudget(seconds=None, memory=None).start("slow.py")
+        with pytest.raises(LintBudgetExceededError) as excinfo:
+            with meter.guard("parse"):
+                # past the deadline, with no alarm armed to interrupt the phase
+                meter.deadline = meter.started - 1
+        assert excinfo.value.phase == "parse"
+
+    def test_relaxed(self) -> None:
+        budget = LintBudget(seconds=1.0, memory=None).relaxed(3)
+        assert budget.seconds == 3.0
+        assert budget.memory is None
+
+    def test_error_pickles(self) -> None:
+        error = pickle.loads(pickle.dumps(_exceeded()))
+        assert str(error) == "slow.py: lint exceeded the time budget (2.0 > 1.0)"
+
+
+class QuarantineTest(UnitTest):
+    def test_released_when_contents_change(self) -> None:
+        quarantine = Quarantine()
+        quarantine.add("slow.py", "abc", _exceeded())
+        assert quarantine.partition([("slow.py", "abc"), ("fast.py", "def")]) == (["fast.py"], ["slow.py"])
+        assert not quarantine.is_quarantined("slow.py", "changed")
+        assert "slow.py" not in quarantine
+
+    def test_persisted(self) -> None:
+        with tempfile.TemporaryDirectory() as root:
+            Quarantine.for_repo(root).add("slow.py", "abc", _exceeded())
+            assert Quarantine.for_repo(root).is_quarantined("slow.py", "abc")
+
+    def test_failure_report(self) -> None:
+        report = LintBudgetFailureReport.from_error(_exceeded(), digest="abc")
+        assert report.path == Path("slow.py")
+        assert report.to_dict()["failure"] == LintBudgetFailureReport.KIND == "budget_exceeded"
+
+
+class LintFileWithinBudgetTest(UnitTest):
+    def test_overrun_is_quarantined_until_changed(self) -> None:
+        quarantine = Quarantine()
+        budget = LintBudget(seconds=0.05, memory=None)
+        config = LintConfig(packages=[])
+        [report] = lint_file_within_budget(
+            Path("slow.py"), b"x = 1\n", rules={SpinRule}, config=config, budget=budget, quarantine=quarantine,
+        )
+        assert isinstance(report, LintBudgetFailureReport)
+        assert report.phase == "lint"
+        assert quarantine.is_quarantined("slow.py", source_digest(b"x = 1\n"))
+
+        with mock.patch("libcst.parse_module", side_effect=AssertionError("linted again")):
+            [skipped] = lint_file_within_budget(
+                Path("slow.py"), b"x = 1\n", rules={SpinRule}, config=config, quarantine=quarantine,
+            )
+        assert skipped.to_dict() == report.to_dict()
+
+        assert lint_file_within_budget(Path("slow.py"), b"x = 2\n", rules=set(), config=config, quarantine=quarantine) == []
+        assert "slow.py" not in quarantine
+
+    def test_retry_quarantined(self) -> None:
+        quarantine = Quarantine()
+        quarantine.add("slow.py", source_digest(b"x = 1\n"), _exceeded())
+        reports = lint_file_within_budget(
+            Path("slow.py"), b"x = 1\n", rules=set(), config=LintConfig(packages=[]),
+            quarantine=quarantine, retry_quarantined=True,
+        )
+        assert reports == []
+        assert "slow.py" not in quarantine
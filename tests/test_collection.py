@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import pickle
+import threading
+
+import pytest
+from libcst.testing.utils import UnitTest
+
+from metaproj.common.exceptions import ConfigInterpolationError
+from metaproj.utils.collection import Context, FrozenConfig, interpolate_config
+
+
+class FrozenConfigTest(UnitTest):
+    def test_nested_attribute_access(self) -> None:
+        view = FrozenConfig({"a": {"b": {"c": 1}}, "d": 2})
+        assert view.a.b.c == 1
+        assert view.d == 2
+        assert view["a"]["b"]["c"] == 1
+        assert view.get_path("a.b.c") == 1
+        assert view.get_path("a.missing", "default") == "default"
+
+    def test_non_identifier_and_shadowing_keys(self) -> None:
+        view = FrozenConfig({"my-key": 1, "keys": 2})
+        assert view["my-key"] == 1
+        assert view["keys"] == 2
+        assert callable(view.keys)
+
+    def test_views_are_read_only(self) -> None:
+        view = FrozenConfig({"a": 1})
+        with pytest.raises(TypeError):
+            view.a = 2
+        with pytest.raises(TypeError):
+            del view.a
+
+    def test_merged_shares_untouched_subtrees(self) -> None:
+        view = FrozenConfig({"a": {"b": 1}, "c": {"d": 2}})
+        merged = view.merged({"a.e": 3})
+        assert merged.a.b == 1
+        assert merged.a.e == 3
+        assert merged.c is view.c
+        assert "e" not in view.a
+
+    def test_pickle_roundtrip(self) -> None:
+        view = FrozenConfig({"a": {"b": 1}})
+        assert pickle.loads(pickle.dumps(view)).to_dict() == {"a": {"b": 1}}
+
+
+class ContextTest(UnitTest):
+    def test_call_restores_only_touched_keys(self) -> None:
+        context = Context(a=1)
+        with context(a=2, b=3):
+            assert context.a == 2
+            context.c = 4
+            with context(a=5):
+                assert context.a == 5
+            assert context.a == 2
+        assert context.a == 1
+        assert "b" not in context
+        assert "c" not in context
+
+    def test_call_overlays_config(self) -> None:
+        context = Context(config={"nested": {"setting": 1}})
+        with context(config={"nested.other": 2}):
+            assert context.config.nested.setting == 1
+            assert context.config.nested.other == 2
+        assert "other" not in context.config.nested
+
+    def test_config_is_read_only(self) -> None:
+        context = Context(config={"setting": 1})
+        with pytest.raises(TypeError):
+            context.config.setting = 2
+        with pytest.raises(TypeError):
+            context.config.other = 2
+        context.config = FrozenConfig({"setting": 2})
+        assert context.config.setting == 2
+
+    def test_overlays_are_per_context_and_thread(self) -> None:
+        first, second = Context(a=1), Context(a=1)
+        seen = []
+        with first(a=2):
+            second.a = 3
+            thread = threading.Thread(target=lambda: seen.append(first._overlays()))
+            thread.start()
+            thread.join()
+        assert first.a == 1
+        assert second.a == 3
+        assert "_overlay_stacks" not in first
+        assert seen == [[]]
+
+
+class InterpolateConfigTest(UnitTest):
+    def test_chained_references(self) -> None:
+        config = interpolate_config({"a": {"b": "${c.d}/x"}, "c": {"d": "${e}"}, "e": 5})
+        assert config["a"]["b"] == "5/x"
+        assert config["c"]["d"] == 5
+
+    def test_missing_reference_is_empty(self) -> None:
+        assert interpolate_config({"a": "${missing}!"})["a"] == "!"
+
+    def test_nested_reference(self) -> None:
+        config = interpolate_config({"a": "${b.${c}}", "b": {"z": "Z"}, "c": "z"})
+        assert config["a"] == "Z"
+
+    def test_long_chain(self) -> None:
+        length = 5000
+        raw = {f"k{i}": f"${{k{i + 1}}}" for i in range(length)}
+        raw[f"k{length}"] = "end"
+        assert interpolate_config(raw)["k0"] == "end"
+
+    def test_cycle_is_an_error(self) -> None:
+        with pytest.raises(ConfigInterpolationError, match="a -> b -> a"):
+            interpolate_config({"a": "${b}", "b": "${a}"})
+
+    def test_env_vars(self) -> None:
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setenv("METAPROJ_TEST_HOME", "/home/test")
+            config = interpolate_config({"a": "$METAPROJ_TEST_HOME/x", "b": "$METAPROJ_TEST_HOME/x"})
+        assert config["a"] == config["b"] == "/home/test/x"
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from libcst.testing.utils import UnitTest
+
+from metaproj.common.budget import Quarantine
+from metaproj.common.config import LintConfig
+from metaproj.common.daemon import LintDaemon, ModuleCache, ParsedModule, serve_stdio
+
+
+def _entry(cost: int, digest: str = "abc") -> ParsedModule:
+    return ParsedModule(digest=digest, wrapper=None, cost=cost)
+
+
+class ModuleCacheTest(UnitTest):
+    def test_least_recently_used_is_evicted(self) -> None:
+        cache = ModuleCache(max_bytes=250)
+        cache.put("a.py", _entry(100))
+        cache.put("b.py", _entry(100))
+        assert cache.get("a.py", "abc") is not None
+        cache.put("c.py", _entry(100))
+        assert list(cache) == ["a.py", "c.py"]
+        assert cache.used_bytes == 200
+
+    def test_most_recent_kept_over_budget(self) -> None:
+        cache = ModuleCache(max_bytes=50)
+        cache.put("a.py", _entry(100))
+        assert list(cache) == ["a.py"]
+        cache.put("b.py", _entry(100))
+        assert list(cache) == ["b.py"]
+        assert cache.used_bytes == 100
+
+    def test_stale_digest_is_discarded(self) -> None:
+        cache = ModuleCache()
+        cache.put("a.py", _entry(100))
+        assert cache.get("a.py", "changed") is None
+        assert "a.py" not in cache
+        assert cache.used_bytes == 0
+
+
+class LintDaemonTest(UnitTest):
+    def setUp(self) -> None:
+        self._root = tempfile.TemporaryDirectory()
+        self.root = Path(self._root.name)
+        self.daemon = LintDaemon(config=LintConfig(packages=[], repo_root=str(self.root)), quarantine=Quarantine())
+
+    def tearDown(self) -> None:
+        self._root.cleanup()
+
+    def test_unchanged_file_served_from_cache(self) -> None:
+        path = self.root / "mod.py"
+        path.write_text("x = 1\n")
+        first = self.daemon.lint(str(path))
+        assert first["cached"] is False
+        with mock.patch("libcst.parse_module", side_effect=AssertionError("parsed again")):
+            second = self.daemon.lint(str(path))
+        assert second["cached"] is True
+        assert second["reports"] == first["reports"]
+
+        path.write_text("x = 2\n")
+        assert self.daemon.lint(str(path))["cached"] is False
+        assert len(self.daemon.modules) == 1
+
+    def test_serve_stdio(self) -> None:
+        path = self.root / "mod.py"
+        path.write_text("x = 1\n")
+        requests = [
+            json.dumps({"method": "lint", "path": str(path), "id": 1}),
+            "",
+            "not json",
+            json.dumps({"method": "bogus"}),
+            json.dumps({"method": "stats", "id": "s"}),
+            json.dumps({"method": "shutdown"}),
+            json.dumps({"method": "stats"}),
+        ]
+        stdout = io.StringIO()
+        serve_stdio(self.daemon, io.StringIO("\n".join(requests) + "\n"), stdout)
+        replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert len(replies) == 5
+        assert replies[0]["id"] == 1
+        assert replies[0]["reports"] == []
+        assert replies[1]["error"].startswith("Invalid request")
+        assert replies[2] == {"error": "Unknown method 'bogus'"}
+        assert replies[3]["id"] == "s"
+        assert replies[3]["modules"] == 1
+        assert replies[4] == {"shutdown": True}
+        assert not self.daemon.running
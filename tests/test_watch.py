@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Set, Tuple
+
+from libcst.testing.utils import UnitTest
+
+from metaproj.common.taskhandle import TaskHandle
+from metaproj.common.watch import Watcher, _EventForwarder
+
+
+class WatcherTest(UnitTest):
+    def test_poll_batches_changes(self) -> None:
+        batches: List[Tuple[Set[str], Set[str]]] = []
+        with tempfile.TemporaryDirectory() as root:
+            Path(root, "a.py").write_text("a = 1\n")
+            Path(root, "notes.txt").write_text("ignored\n")
+            os.mkdir(os.path.join(root, "__pycache__"))
+            Path(root, "__pycache__", "a.py").write_text("ignored\n")
+            watcher = Watcher(
+                root, lambda changed, removed, handle: batches.append((changed, removed)),
+                debounce=0, use_polling=True,
+            )
+            self.assertFalse(watcher.run_once(timeout=0))
+
+            Path(root, "a.py").write_text("a = 22\n")
+            Path(root, "b.py").write_text("b = 1\n")
+            Path(root, "notes.txt").write_text("still ignored\n")
+            watcher.poll()
+            self.assertTrue(watcher.run_once(timeout=0))
+
+            os.remove(os.path.join(root, "b.py"))
+            watcher.poll()
+            self.assertTrue(watcher.run_once(timeout=0))
+        self.assertEqual(batches, [({"a.py", "b.py"}, set()), (set(), {"b.py"})])
+
+    def test_stale_batch_is_requeued(self) -> None:
+        batches: List[Set[str]] = []
+        with tempfile.TemporaryDirectory() as root:
+            def callback(changed: Set[str], removed: Set[str], handle: TaskHandle) -> None:
+                batches.append(changed)
+                if len(batches) == 1:
+                    Path(root, "b.py").write_text("b = 1\n")
+                    watcher.poll()
+                    self.assertTrue(handle.is_stopped())
+                    handle.create_jobset("lint").started_job("a.py")
+
+            watcher = Watcher(root, callback, debounce=0, use_polling=True)
+            Path(root, "a.py").write_text("a = 1\n")
+            watcher.poll()
+            self.assertTrue(watcher.run_once(timeout=0))
+            self.assertTrue(watcher.run_once(timeout=0))
+        self.assertEqual(batches, [{"a.py"}, {"a.py", "b.py"}])
+
+    def test_events_are_validated(self) -> None:
+        batches: List[Tuple[Set[str], Set[str]]] = []
+        with tempfile.TemporaryDirectory() as root:
+            Path(root, "a.py").write_text("a = 1\n")
+            watcher = Watcher(
+                root, lambda changed, removed, handle: batches.append((changed, removed)),
+                debounce=0, use_polling=True,
+            )
+            forwarder = _EventForwarder(watcher)
+
+            def event(event_type: str, *paths: str) -> SimpleNamespace:
+                real_paths = [os.path.join(root, path) for path in paths]
+                return SimpleNamespace(
+                    event_type=event_type, is_directory=False, src_path=real_paths[0], dest_path=real_paths[-1],
+                )
+
+            # an event that did not change the file is not reported
+            forwarder.dispatch(event("modified", "a.py"))
+            self.assertFalse(watcher.run_once(timeout=0))
+
+            Path(root, "b.py").write_text("b = 1\n")
+            forwarder.dispatch(event("created", "b.py"))
+            self.assertTrue(watcher.run_once(timeout=0))
+
+            os.rename(os.path.join(root, "a.py"), os.path.join(root, "c.py"))
+            forwarder.dispatch(event("moved", "a.py", "c.py"))
+            self.assertTrue(watcher.run_once(timeout=0))
+        self.assertEqual(batches, [({"b.py"}, set()), ({"c.py"}, {"a.py"})])
@@ -6,7 +6,9 @@ import os
 import time
 from functools import lru_cache
 
-from . import exceptions, fscommands, taskhandle
+from metaproj.common import taskhandle
+
+from . import exceptions, fscommands
 
 
 class Change:
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from . import change, exceptions, taskhandle
+from metaproj.common import taskhandle
+
+from . import change, exceptions
 
 
 class History:
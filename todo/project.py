@@ -18,7 +18,9 @@ import warnings
 
 from rope.base import pycore
 
-from . import exceptions, fscommands, history, resourceobserver, taskhandle
+from metaproj.common import resourceobserver, taskhandle
+
+from . import exceptions, fscommands, history
 from .exceptions import ModuleNotFoundError
 from .resources import File, Folder, _ResourceMatcher
 